@@ -6,7 +6,17 @@ import argparse
 from pathlib import Path
 
 from tts_mcp.core.auth import create_tts_client
-from tts_mcp.core.synth import SynthesisRequest, read_text_input, sanitize_filename, synthesize_to_file
+from tts_mcp.core.cache import open_cache
+from tts_mcp.core.profile import DEFAULT_CACHE_MAX_MB, default_cache_dir, default_rate_limit_file
+from tts_mcp.core.ratelimit import DEFAULT_RATE_LIMIT_WAIT_S, RateLimiter
+from tts_mcp.core.retry import Retrier
+from tts_mcp.core.synth import (
+    DEFAULT_CHUNK_BYTES,
+    SynthesisRequest,
+    read_text_input,
+    sanitize_filename,
+    synthesize_to_file,
+)
 from tts_mcp.core.voices import list_voices
 
 AUDIO_FORMATS = ["mp3", "wav", "ogg"]
@@ -29,6 +39,31 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--speaking-rate", type=float, default=1.0)
     parser.add_argument("--pitch", type=float, default=0.0)
     parser.add_argument("--limit", type=int, default=0, help="Optional max voices (0 means all)")
+    parser.add_argument("--cache-dir", default=str(default_cache_dir()), help="Directory for cached audio")
+    parser.add_argument(
+        "--cache-max-mb",
+        type=int,
+        default=DEFAULT_CACHE_MAX_MB,
+        help="Size cap for the audio cache in megabytes (0 disables caching)",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Always call the API, bypassing the audio cache")
+    parser.add_argument(
+        "--requests-per-min", type=int, default=0, help="Client-side limit on API requests per minute (0 is unlimited)"
+    )
+    parser.add_argument(
+        "--chars-per-min", type=int, default=0, help="Client-side limit on characters sent per minute (0 is unlimited)"
+    )
+    parser.add_argument(
+        "--rate-limit-file",
+        default=str(default_rate_limit_file()),
+        help="Rate limiter state file, shared with tts-mcp servers using the same file",
+    )
+    parser.add_argument(
+        "--rate-limit-wait",
+        type=float,
+        default=DEFAULT_RATE_LIMIT_WAIT_S,
+        help="Longest a request waits for the rate limiter before failing, in seconds",
+    )
     return parser.parse_args()
 
 
@@ -65,9 +100,17 @@ def main() -> None:
 
     out_dir = Path(args.out_dir).expanduser().resolve()
     out_dir.mkdir(parents=True, exist_ok=True)
+    cache = None if args.no_cache else open_cache(Path(args.cache_dir).expanduser().resolve(), args.cache_max_mb)
 
     print(f"Generating {len(selected)} files in {out_dir}")
     failures = 0
+    limiter = RateLimiter(
+        Path(args.rate_limit_file).expanduser().resolve(),
+        requests_per_min=args.requests_per_min,
+        chars_per_min=args.chars_per_min,
+        max_wait_s=args.rate_limit_wait,
+    )
+    retrier = Retrier(limiter=limiter)
 
     for voice in selected:
         tag, model_name = model_tag_and_name(voice.name)
@@ -75,7 +118,7 @@ def main() -> None:
         output_path = out_dir / filename
 
         try:
-            synthesize_to_file(
+            result = synthesize_to_file(
                 client,
                 SynthesisRequest(
                     text=text,
@@ -88,8 +131,12 @@ def main() -> None:
                     pitch=args.pitch,
                     output_file=output_path,
                 ),
+                cache=cache,
+                max_chunk_bytes=DEFAULT_CHUNK_BYTES,
+                retrier=retrier,
             )
-            print(f"ok   {output_path.name}")
+            status = "hit " if result.cache_hit else "ok  "
+            print(f"{status} {output_path.name}")
         except Exception as exc:  # noqa: BLE001
             failures += 1
             print(f"fail {voice.name}: {exc}")
@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import struct
+
+# -- wav --
+
+
+def _riff_chunks(data: bytes) -> list[tuple[bytes, bytes]]:
+    if len(data) < 12 or data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        raise ValueError("Audio part is not a RIFF/WAVE file")
+    chunks: list[tuple[bytes, bytes]] = []
+    pos = 12
+    while pos + 8 <= len(data):
+        chunk_id = data[pos : pos + 4]
+        (size,) = struct.unpack_from("<I", data, pos + 4)
+        body_start = pos + 8
+        body_end = min(body_start + size, len(data))
+        chunks.append((chunk_id, data[body_start:body_end]))
+        pos = body_end + (size & 1)
+    return chunks
+
+
+def concat_wav(parts: list[bytes]) -> bytes:
+    """Join WAV files that share a format into one file with a rewritten RIFF header."""
+    fmt: bytes | None = None
+    samples: list[bytes] = []
+    for part in parts:
+        part_fmt, data = wav_samples(part)
+        if fmt is None:
+            fmt = part_fmt
+        elif part_fmt != fmt:
+            raise ValueError("WAV parts use different sample formats")
+        samples.append(data)
+    if fmt is None:
+        raise ValueError("No audio parts to join")
+    return wav_header(fmt, sum(len(chunk) for chunk in samples)) + b"".join(samples)
+
+
+def wav_samples(data: bytes) -> tuple[bytes, bytes]:
+    """Split one WAV file into its ``fmt `` chunk body and its sample data."""
+    chunks = dict(_riff_chunks(data))
+    if b"fmt " not in chunks or b"data" not in chunks:
+        raise ValueError("WAV part is missing its fmt or data chunk")
+    return chunks[b"fmt "], chunks[b"data"]
+
+
+def pcm_wav_fmt(sample_rate: int, *, channels: int = 1, bits_per_sample: int = 16) -> bytes:
+    """Build the body of a ``fmt `` chunk for uncompressed little-endian PCM."""
+    block_align = channels * bits_per_sample // 8
+    return struct.pack("<HHIIHH", 1, channels, sample_rate, sample_rate * block_align, block_align, bits_per_sample)
+
+
+def wav_header(fmt: bytes, data_size: int) -> bytes:
+    """Build a canonical RIFF/WAVE header for ``data_size`` bytes of samples."""
+    riff_size = 4 + (8 + len(fmt)) + (8 + data_size)
+    return (
+        b"RIFF"
+        + struct.pack("<I", riff_size)
+        + b"WAVE"
+        + b"fmt "
+        + struct.pack("<I", len(fmt))
+        + fmt
+        + b"data"
+        + struct.pack("<I", data_size)
+    )
+
+
+# -- mp3 --
+
+_MP3_BITRATES_KBPS = {
+    # (MPEG-1, Layer III)
+    1: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 0),
+    # (MPEG-2 / 2.5, Layer III)
+    2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160, 0),
+}
+_MP3_SAMPLE_RATES = {
+    3: (44100, 48000, 32000),  # MPEG-1
+    2: (22050, 24000, 16000),  # MPEG-2
+    0: (11025, 12000, 8000),  # MPEG-2.5
+}
+
+
+def _skip_id3v2(data: bytes) -> int:
+    if len(data) < 10 or data[:3] != b"ID3":
+        return 0
+    size = 0
+    for byte in data[6:10]:
+        size = (size << 7) | (byte & 0x7F)
+    footer = 10 if data[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def _mp3_frame_length(data: bytes, pos: int) -> int:
+    if pos + 4 > len(data) or data[pos] != 0xFF or (data[pos + 1] & 0xE0) != 0xE0:
+        return 0
+    version = (data[pos + 1] >> 3) & 0x03
+    layer = (data[pos + 1] >> 1) & 0x03
+    bitrate_index = data[pos + 2] >> 4
+    rate_index = (data[pos + 2] >> 2) & 0x03
+    padding = (data[pos + 2] >> 1) & 0x01
+    if version == 1 or layer != 1 or rate_index == 3:
+        return 0
+    bitrate = _MP3_BITRATES_KBPS[1 if version == 3 else 2][bitrate_index] * 1000
+    sample_rate = _MP3_SAMPLE_RATES[version][rate_index]
+    if not bitrate:
+        return 0
+    coefficient = 144 if version == 3 else 72
+    return coefficient * bitrate // sample_rate + padding
+
+
+def _mp3_frames(part: bytes) -> bytes:
+    """Return the MPEG audio frames of one file, minus ID3 tags and any Xing/Info header frame."""
+    start = _skip_id3v2(part)
+    end = len(part) - 128 if part[-128:-125] == b"TAG" else len(part)
+    length = _mp3_frame_length(part, start)
+    if length and any(tag in part[start : start + length] for tag in (b"Xing", b"Info", b"VBRI")):
+        start += length
+    return part[start:end]
+
+
+def concat_mp3(parts: list[bytes]) -> bytes:
+    """Join MP3 files by concatenating their MPEG frames."""
+    if not parts:
+        raise ValueError("No audio parts to join")
+    return b"".join(_mp3_frames(part) for part in parts)
+
+
+# -- ogg --
+
+
+def _ogg_crc_table() -> list[int]:
+    table = []
+    for index in range(256):
+        crc = index << 24
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x04C11DB7) if crc & 0x80000000 else (crc << 1)
+        table.append(crc & 0xFFFFFFFF)
+    return table
+
+
+_OGG_CRC_TABLE = _ogg_crc_table()
+_OGG_HEADER = struct.Struct("<4sBBqIII B")
+
+
+def _ogg_crc(page: bytes) -> int:
+    crc = 0
+    for byte in page:
+        crc = ((crc << 8) & 0xFFFFFFFF) ^ _OGG_CRC_TABLE[((crc >> 24) & 0xFF) ^ byte]
+    return crc
+
+
+def _ogg_pages(data: bytes) -> list[tuple[int, int, bytes, bytes]]:
+    """Split an Ogg stream into (header_type, granule, segment_table, body) tuples."""
+    pages = []
+    pos = 0
+    while pos < len(data):
+        if pos + _OGG_HEADER.size > len(data):
+            raise ValueError("Truncated Ogg page header")
+        capture, _version, header_type, granule, _serial, _seq, _crc, count = _OGG_HEADER.unpack_from(data, pos)
+        if capture != b"OggS":
+            raise ValueError("Audio part is not an Ogg stream")
+        table_start = pos + _OGG_HEADER.size
+        segments = data[table_start : table_start + count]
+        body_start = table_start + count
+        body_end = body_start + sum(segments)
+        pages.append((header_type, granule, segments, data[body_start:body_end]))
+        pos = body_end
+    return pages
+
+
+def _ogg_page(header_type: int, granule: int, serial: int, sequence: int, segments: bytes, body: bytes) -> bytes:
+    header = _OGG_HEADER.pack(b"OggS", 0, header_type, granule, serial, sequence, 0, len(segments))
+    page = header + segments + body
+    crc = _ogg_crc(page)
+    return page[:22] + struct.pack("<I", crc) + page[26:]
+
+
+def concat_ogg(parts: list[bytes]) -> bytes:
+    """Join Ogg Opus files into a single logical stream.
+
+    The first part keeps its OpusHead/OpusTags header pages; later parts contribute only
+    their audio pages. Every page is re-serialized with the first stream's serial number,
+    a continuous sequence number and granule positions offset by the preceding audio.
+    """
+    if not parts:
+        raise ValueError("No audio parts to join")
+
+    first = _OGG_HEADER.unpack_from(parts[0], 0) if len(parts[0]) >= _OGG_HEADER.size else None
+    if first is None or first[0] != b"OggS":
+        raise ValueError("Audio part is not an Ogg stream")
+    serial = first[4]
+
+    out: list[bytes] = []
+    sequence = 0
+    granule_offset = 0
+    for index, part in enumerate(parts):
+        pages = _ogg_pages(part)
+        packets_done = 0
+        last_granule = 0
+        for header_type, granule, segments, body in pages:
+            in_header = packets_done < 2
+            packets_done += sum(1 for lace in segments if lace < 255)
+            if in_header and index > 0:
+                continue
+            if granule >= 0 and not in_header:
+                last_granule = granule
+                granule += granule_offset
+            header_type &= ~0x04  # clear EOS; re-added on the final page
+            if index > 0:
+                header_type &= ~0x02  # only the first page of the stream is BOS
+            out.append(_ogg_page(header_type, granule, serial, sequence, segments, body))
+            sequence += 1
+        granule_offset += last_granule
+
+    # Mark the final page as end-of-stream.
+    final = bytearray(out[-1])
+    final[5] |= 0x04
+    final[22:26] = b"\x00\x00\x00\x00"
+    final[22:26] = struct.pack("<I", _ogg_crc(bytes(final)))
+    out[-1] = bytes(final)
+    return b"".join(out)
+
+
+_CONCATENATORS = {
+    "mp3": concat_mp3,
+    "wav": concat_wav,
+    "ogg": concat_ogg,
+}
+
+
+def concat_audio(audio_format: str, parts: list[bytes]) -> bytes:
+    """Stitch audio parts of the same format into one valid file."""
+    if len(parts) == 1:
+        return parts[0]
+    try:
+        join = _CONCATENATORS[audio_format]
+    except KeyError:
+        raise ValueError(f"Unsupported format: {audio_format}") from None
+    return join(parts)
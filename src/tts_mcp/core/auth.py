@@ -1,14 +1,77 @@
 from __future__ import annotations
 
-from google.auth.exceptions import DefaultCredentialsError
-from google.cloud import texttospeech
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Any
 
+if TYPE_CHECKING:
+    from google.cloud import texttospeech
 
-def create_tts_client() -> texttospeech.TextToSpeechClient:
+_MISSING_CREDENTIALS = (
+    "Google credentials were not found. "
+    "Run 'gcloud auth application-default login' or set GOOGLE_APPLICATION_CREDENTIALS."
+)
+
+# How long a keepalive ping may go unanswered before the connection is considered dead.
+KEEPALIVE_TIMEOUT_MS = 20_000
+
+
+def channel_options(*, keepalive_ms: int = 0, idle_timeout_ms: int = 0) -> list[tuple[str, int]]:
+    """gRPC channel arguments for the profile's transport settings; 0 keeps gRPC's default.
+
+    keepalive_ms pings the connection at that interval even with no call in progress, so
+    NAT and load balancer mappings stay open while the server sits idle. idle_timeout_ms
+    is how long the channel may go without calls before gRPC closes its connection.
+    """
+    options: list[tuple[str, int]] = []
+    if keepalive_ms:
+        options += [
+            ("grpc.keepalive_time_ms", keepalive_ms),
+            ("grpc.keepalive_timeout_ms", min(keepalive_ms, KEEPALIVE_TIMEOUT_MS)),
+            ("grpc.keepalive_permit_without_calls", 1),
+            ("grpc.http2.max_pings_without_data", 0),
+        ]
+    if idle_timeout_ms:
+        options.append(("grpc.client_idle_timeout_ms", idle_timeout_ms))
+    return options
+
+
+def _transport(transport_cls: Any, options: list[tuple[str, int]]) -> Callable[..., Any]:
+    """A transport factory for the client whose channel also gets the given options."""
+
+    def _create_channel(*args: Any, **kwargs: Any) -> Any:
+        kwargs["options"] = [*kwargs.get("options", ()), *options]
+        return transport_cls.create_channel(*args, **kwargs)
+
+    def _init(**kwargs: Any) -> Any:
+        return transport_cls(channel=_create_channel, **kwargs)
+
+    return _init
+
+
+def create_tts_client(*, keepalive_ms: int = 0, idle_timeout_ms: int = 0) -> texttospeech.TextToSpeechClient:
+    from google.auth.exceptions import DefaultCredentialsError
+    from google.cloud import texttospeech
+    from google.cloud.texttospeech_v1.services.text_to_speech.transports import TextToSpeechGrpcTransport
+
+    options = channel_options(keepalive_ms=keepalive_ms, idle_timeout_ms=idle_timeout_ms)
+    try:
+        if not options:
+            return texttospeech.TextToSpeechClient()
+        return texttospeech.TextToSpeechClient(transport=_transport(TextToSpeechGrpcTransport, options))
+    except DefaultCredentialsError as exc:
+        raise RuntimeError(_MISSING_CREDENTIALS) from exc
+
+
+def create_tts_async_client(*, keepalive_ms: int = 0, idle_timeout_ms: int = 0) -> texttospeech.TextToSpeechAsyncClient:
+    """Build the asyncio client; call it from inside the event loop that will use it."""
+    from google.auth.exceptions import DefaultCredentialsError
+    from google.cloud import texttospeech
+    from google.cloud.texttospeech_v1.services.text_to_speech.transports import TextToSpeechGrpcAsyncIOTransport
+
+    options = channel_options(keepalive_ms=keepalive_ms, idle_timeout_ms=idle_timeout_ms)
     try:
-        return texttospeech.TextToSpeechClient()
+        if not options:
+            return texttospeech.TextToSpeechAsyncClient()
+        return texttospeech.TextToSpeechAsyncClient(transport=_transport(TextToSpeechGrpcAsyncIOTransport, options))
     except DefaultCredentialsError as exc:
-        raise RuntimeError(
-            "Google credentials were not found. "
-            "Run 'gcloud auth application-default login' or set GOOGLE_APPLICATION_CREDENTIALS."
-        ) from exc
+        raise RuntimeError(_MISSING_CREDENTIALS) from exc
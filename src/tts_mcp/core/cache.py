@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import fcntl
+import hashlib
+import json
+import os
+import tempfile
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+LOCK_FILENAME = ".lock"
+TEMP_PREFIX = ".tmp-"
+STALE_TEMP_SECONDS = 3600
+
+
+def cache_key(
+    *,
+    text: str,
+    ssml: bool,
+    voice: str,
+    language: str,
+    model: str,
+    audio_format: str,
+    speaking_rate: float,
+    pitch: float,
+) -> str:
+    """Return a stable content hash for every input that affects the synthesized audio."""
+    payload = json.dumps(
+        [text, ssml, voice, language, model, audio_format, float(speaking_rate), float(pitch)],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@contextmanager
+def _flock(path: Path, operation: int) -> Iterator[None]:
+    with path.open("a+b") as handle:
+        fcntl.flock(handle, operation)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+class SynthesisCache:
+    """Content-addressed store of synthesized audio with a size cap and LRU eviction.
+
+    Each entry is a single file named ``<key>.<format>``. The file mtime doubles as the
+    last-used timestamp: hits touch it, and eviction removes the oldest entries first.
+
+    The directory can be shared by several processes at once. Entries are published by
+    writing a temp file and renaming it into place, so readers never see partial audio.
+    Eviction passes are serialized through an exclusive lock on ``.lock``, and readers
+    hold a shared lock on the entry they are reading so eviction skips it.
+    """
+
+    def __init__(self, directory: Path, *, max_bytes: int) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def entry_path(self, key: str, audio_format: str) -> Path:
+        return self.directory / f"{key}.{audio_format}"
+
+    def get(self, key: str, audio_format: str) -> bytes | None:
+        path = self.entry_path(key, audio_format)
+        try:
+            with path.open("rb") as handle:
+                fcntl.flock(handle, fcntl.LOCK_SH)
+                audio = handle.read()
+                os.utime(handle.fileno())
+        except OSError:
+            return None
+        return audio
+
+    def put(self, key: str, audio_format: str, audio: bytes) -> None:
+        if len(audio) > self.max_bytes:
+            return
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            fd, temp_name = tempfile.mkstemp(dir=self.directory, prefix=TEMP_PREFIX, suffix=f".{audio_format}")
+            try:
+                with os.fdopen(fd, "wb") as handle:
+                    handle.write(audio)
+                os.replace(temp_name, self.entry_path(key, audio_format))
+            except BaseException:
+                Path(temp_name).unlink(missing_ok=True)
+                raise
+        except OSError:
+            return
+        self.evict()
+
+    def evict(self) -> int:
+        """Remove least recently used entries until the cache fits in max_bytes.
+
+        Entries that another process is currently reading are skipped. Temp files left
+        behind by a crashed writer are removed once they are older than an hour.
+        Returns the number of entries removed.
+        """
+        try:
+            with _flock(self.directory / LOCK_FILENAME, fcntl.LOCK_EX):
+                return self._evict_locked()
+        except OSError:
+            return 0
+
+    def _evict_locked(self) -> int:
+        now = time.time()
+        entries: list[tuple[float, int, Path]] = []
+        with os.scandir(self.directory) as it:
+            for item in it:
+                if not item.is_file() or item.name == LOCK_FILENAME:
+                    continue
+                stat = item.stat()
+                if item.name.startswith(TEMP_PREFIX):
+                    if now - stat.st_mtime > STALE_TEMP_SECONDS:
+                        Path(item.path).unlink(missing_ok=True)
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, Path(item.path)))
+
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if not self._unlink_unless_reading(path):
+                continue
+            total -= size
+            removed += 1
+        return removed
+
+    @staticmethod
+    def _unlink_unless_reading(path: Path) -> bool:
+        try:
+            with path.open("rb") as handle:
+                try:
+                    fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    return False
+                path.unlink()
+        except OSError:
+            return False
+        return True
+
+
+def open_cache(directory: Path | None, max_mb: int) -> SynthesisCache | None:
+    """Build a cache from profile/CLI settings, or None when caching is disabled."""
+    if directory is None or max_mb <= 0:
+        return None
+    return SynthesisCache(directory, max_bytes=max_mb * 1024 * 1024)
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import cProfile
+import threading
+import tracemalloc
+from pathlib import Path
+from types import TracebackType
+
+from tts_mcp.core.synth import timestamped_output_path
+
+PROFILE_CALLS_ENV = "TTS_MCP_PROFILE_CALLS"
+DEFAULT_ALLOC_TOP = 25
+
+
+def diagnostics_dir(output_dir: Path) -> Path:
+    """Where profiling reports for a profile go: a ``diagnostics`` directory next to its output_dir."""
+    return output_dir.parent / "diagnostics"
+
+
+class ProfileRun:
+    """One profiled tool call: cProfile stats plus a tracemalloc top-N report, written on exit.
+
+    Use as a context manager around the call. A run that is never entered must be
+    released, so the profiler can hand out the next one.
+    """
+
+    def __init__(self, profiler: CallProfiler, prof_path: Path, top: int) -> None:
+        self.prof_path = prof_path
+        self.alloc_path = prof_path.with_name(f"{prof_path.stem}-alloc.txt")
+        self._profiler = profiler
+        self._top = top
+        self._cprofile = cProfile.Profile()
+        self._started_tracemalloc = False
+        self.started = False
+
+    def paths(self) -> dict[str, str]:
+        return {"profile": str(self.prof_path), "allocations": str(self.alloc_path)}
+
+    def release(self) -> None:
+        if not self.started:
+            self._profiler._release(self)
+
+    def __enter__(self) -> ProfileRun:
+        self.started = True
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        tracemalloc.reset_peak()
+        self._cprofile.enable()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self._cprofile.disable()
+        try:
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+            self.prof_path.parent.mkdir(parents=True, exist_ok=True)
+            self._cprofile.dump_stats(self.prof_path)
+            stats = snapshot.filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)]).statistics("lineno")
+            lines = [f"# traced memory: current {current:,} B, peak {peak:,} B", f"# top {self._top} by size"]
+            lines += [str(stat) for stat in stats[: self._top]]
+            self.alloc_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        finally:
+            self._profiler._release(self)
+
+
+class CallProfiler:
+    """Hand out ProfileRuns for the next N tool calls, one at a time.
+
+    cProfile and tracemalloc are process-wide, so only one call is profiled at once;
+    a call that arrives while another is being profiled runs normally and leaves the
+    count untouched. Work handed to worker threads shows up as time spent waiting.
+    """
+
+    def __init__(self, directory: Path, *, calls: int = 0, top: int = DEFAULT_ALLOC_TOP, prefix: str = "") -> None:
+        self.directory = directory
+        self.top = top
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._remaining = max(0, calls)
+        self._active: ProfileRun | None = None
+
+    @property
+    def remaining(self) -> int:
+        with self._lock:
+            return self._remaining
+
+    def arm(self, calls: int) -> None:
+        """Profile the next `calls` tool calls, replacing any count still pending."""
+        if calls < 0:
+            raise ValueError("profile_calls must be 0 or greater")
+        with self._lock:
+            self._remaining = calls
+
+    def claim(self, name: str) -> ProfileRun | None:
+        """A run for this call if one is due and none is in progress, otherwise None."""
+        with self._lock:
+            if not self._remaining or self._active is not None:
+                return None
+            self._remaining -= 1
+            prefix = f"{self.prefix}-{name}" if self.prefix else name
+            path = timestamped_output_path(audio_format="prof", output_dir=self.directory, prefix=prefix)
+            self._active = ProfileRun(self, path, self.top)
+            return self._active
+
+    def _release(self, run: ProfileRun) -> None:
+        with self._lock:
+            if self._active is run:
+                self._active = None
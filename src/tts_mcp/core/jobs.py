@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import asyncio
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+DEFAULT_JOB_WORKERS = 2
+MAX_FINISHED_JOBS = 200
+
+
+@dataclass
+class Job:
+    id: str
+    state: str = "queued"
+    created_at: float = field(default_factory=time.time)
+    finished_at: float | None = None
+    result: dict[str, Any] | None = None
+    error: str = ""
+
+    @property
+    def finished(self) -> bool:
+        return self.state in {"done", "failed"}
+
+
+JobWork = Callable[[Job], Awaitable[dict[str, Any]]]
+
+
+class JobQueue:
+    """Run submitted work on a small pool of asyncio worker tasks and keep its outcome.
+
+    Work receives its Job so it can advance job.state as it goes; the queue sets the
+    final done/failed state and stores the returned payload or the error message.
+    Only the most recent max_finished finished jobs are kept for status lookups.
+    Workers are started on the first submit, inside the caller's running event loop.
+    """
+
+    def __init__(self, *, workers: int = DEFAULT_JOB_WORKERS, max_finished: int = MAX_FINISHED_JOBS) -> None:
+        self.workers = workers
+        self.max_finished = max_finished
+        self._jobs: dict[str, Job] = {}
+        self._queue: asyncio.Queue[tuple[Job, JobWork]] | None = None
+        self._tasks: list[asyncio.Task[None]] = []
+
+    def submit(self, work: JobWork) -> Job:
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+            self._tasks = [asyncio.create_task(self._worker(self._queue)) for _ in range(self.workers)]
+        job = Job(id=uuid.uuid4().hex)
+        self._jobs[job.id] = job
+        self._queue.put_nowait((job, work))
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        return self._jobs.get(job_id)
+
+    async def _worker(self, queue: asyncio.Queue[tuple[Job, JobWork]]) -> None:
+        while True:
+            job, work = await queue.get()
+            try:
+                job.result = await work(job)
+                job.state = "done"
+            except Exception as exc:  # noqa: BLE001
+                job.error = str(exc)
+                job.state = "failed"
+            finally:
+                job.finished_at = time.time()
+                queue.task_done()
+                self._prune()
+
+    def _prune(self) -> None:
+        finished = [job for job in self._jobs.values() if job.finished]
+        for job in finished[: max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job.id]
@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import bisect
+import os
+import tempfile
+import threading
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+LATENCY_BUCKETS_MS = (1.0, 5.0, 10.0, 25.0, 50.0, 100.0, 250.0, 500.0, 1000.0, 2500.0, 5000.0, 10000.0)
+
+COUNTERS = {
+    "tts_requests_total": "tts_speak requests that produced audio.",
+    "tts_chars_total": "Characters in those requests, including cache hits.",
+    "tts_audio_bytes_total": "Audio bytes written.",
+    "tts_cache_hits_total": "Requests served from the audio cache.",
+    "tts_cache_misses_total": "Requests that called the synthesis API.",
+    "tts_retries_total": "Synthesis calls retried after a transient error.",
+    "tts_hedges_total": "Duplicate synthesis calls sent because the first was slower than the hedge threshold.",
+    "tts_errors_total": "Failed synthesis requests, by gRPC status.",
+}
+# Counters that are always reported per value of one label.
+LABELLED_COUNTERS = {"tts_errors_total": "status"}
+HISTOGRAMS = {
+    "tts_api_latency_ms": "Synthesis API time per request in milliseconds, cache misses only.",
+    "tts_request_latency_ms": "End-to-end tts_speak time in milliseconds.",
+    "tts_player_spawn_ms": "Time to start an audio player process in milliseconds.",
+}
+
+Labels = tuple[tuple[str, str], ...]
+
+
+@dataclass
+class Histogram:
+    buckets: tuple[float, ...] = LATENCY_BUCKETS_MS
+    # One count per bucket plus a last one for values above every bucket.
+    counts: list[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS_MS) + 1))
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def quantile(self, fraction: float) -> float | None:
+        """Upper bound of the bucket holding the given fraction of observations."""
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts, strict=False):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+
+class MetricsRegistry:
+    """Counters and latency histograms for this process, safe to update from any thread.
+
+    Unlabelled counters and every histogram are reported from zero, so a scraper sees
+    the same series from the first scrape on. Counters in LABELLED_COUNTERS gain one
+    series per label value as they are first incremented.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: dict[tuple[str, Labels], float] = {
+            (name, ()): 0 for name in COUNTERS if name not in LABELLED_COUNTERS
+        }
+        self._histograms = {name: Histogram() for name in HISTOGRAMS}
+
+    def inc(self, name: str, value: float = 1, **labels: str) -> None:
+        if name not in COUNTERS:
+            raise ValueError(f"Unknown counter: {name}")
+        label = LABELLED_COUNTERS.get(name)
+        if list(labels) != ([label] if label else []):
+            raise ValueError(f"Counter {name} takes labels: {label or 'none'}")
+        key = (name, tuple(labels.items()))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float) -> None:
+        if name not in HISTOGRAMS:
+            raise ValueError(f"Unknown histogram: {name}")
+        with self._lock:
+            self._histograms[name].observe(value)
+
+    def snapshot(self) -> dict[str, Any]:
+        """Current values as plain JSON-friendly data, with approximate p50/p95/p99."""
+        with self._lock:
+            counters: dict[str, Any] = {name: {} if name in LABELLED_COUNTERS else 0 for name in COUNTERS}
+            for (name, labels), value in sorted(self._counters.items()):
+                if labels:
+                    counters[name][labels[0][1]] = value
+                else:
+                    counters[name] = value
+            histograms = {
+                name: {
+                    "count": histogram.count,
+                    "sum": round(histogram.total, 1),
+                    "max": round(histogram.max, 1),
+                    "p50": histogram.quantile(0.50),
+                    "p95": histogram.quantile(0.95),
+                    "p99": histogram.quantile(0.99),
+                }
+                for name, histogram in self._histograms.items()
+            }
+        return {"counters": counters, "histograms": histograms}
+
+    def render_prometheus(self, labels: dict[str, str] | None = None) -> str:
+        """The registry in the Prometheus text exposition format."""
+        common = tuple(sorted((labels or {}).items()))
+        lines: list[str] = []
+        with self._lock:
+            for name, help_text in COUNTERS.items():
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+                series = sorted((key[1], value) for key, value in self._counters.items() if key[0] == name)
+                for series_labels, value in series:
+                    lines.append(f"{name}{_labels(common + series_labels)} {value:g}")
+            for name, help_text in HISTOGRAMS.items():
+                histogram = self._histograms[name]
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+                cumulative = 0
+                for bound, count in zip([*histogram.buckets, float("inf")], histogram.counts, strict=True):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                    lines.append(f"{name}_bucket{_labels((*common, ('le', le)))} {cumulative}")
+                lines.append(f"{name}_sum{_labels(common)} {histogram.total:g}")
+                lines.append(f"{name}_count{_labels(common)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: Path, labels: dict[str, str] | None = None) -> None:
+        """Atomically replace path with the current exposition, for a node_exporter textfile collector."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}-")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                handle.write(self.render_prometheus(labels))
+            os.replace(temp_name, path)
+        except BaseException:
+            Path(temp_name).unlink(missing_ok=True)
+            raise
+
+
+def _labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def error_status(exc: BaseException) -> str:
+    """gRPC status name for an API error (e.g. UNAVAILABLE), or the exception type otherwise."""
+    name = getattr(getattr(exc, "grpc_status_code", None), "name", None)
+    return name if isinstance(name, str) else type(exc).__name__
+
+
+def start_metrics_server(
+    registry: MetricsRegistry, port: int, labels: dict[str, str] | None = None, host: str = "127.0.0.1"
+) -> ThreadingHTTPServer:
+    """Serve the registry at http://host:port/metrics from a daemon thread."""
+
+    class _Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path.split("?", 1)[0] not in {"/", "/metrics"}:
+                self.send_error(404)
+                return
+            body = registry.render_prometheus(labels).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+            # stdout and stderr belong to the MCP stdio transport and the client's logs.
+            return
+
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="tts-metrics-http", daemon=True).start()
+    return server
+
+
+METRICS = MetricsRegistry()
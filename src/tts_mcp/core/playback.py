@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import collections
+import functools
+import queue
+import shutil
+import tempfile
+import threading
+from collections.abc import Callable
+from pathlib import Path
+
+from tts_mcp.core.audio import concat_audio
+from tts_mcp.core.players import create_player
+from tts_mcp.core.profile import DEFAULT_PLAYBACK_QUEUE_DEPTH, TTSProfile
+
+PlayFile = Callable[[Path], None]
+
+
+class QueuedFile:
+    """A finished audio file waiting for its turn in the playback queue."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._cancelled = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    def play(self, play_file: PlayFile) -> None:
+        play_file(self.path)
+
+
+class PlaybackStream:
+    """Audio parts that play back to back, in order, while later parts are still arriving.
+
+    Parts are written to a private temp directory and handed to the player one at a time.
+    When several parts are already waiting, they are stitched into a single file first so
+    the player is spawned once for all of them. Streams are created by PlaybackQueue.stream
+    and played when they reach the front of the queue.
+    """
+
+    def __init__(self, audio_format: str) -> None:
+        self.audio_format = audio_format
+        self._parts: queue.Queue[bytes | None] = queue.Queue()
+        self._cancelled = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def add(self, audio: bytes) -> None:
+        """Queue the next part for playback."""
+        self._parts.put(audio)
+
+    def close(self) -> None:
+        """Signal that no more parts will arrive; queued parts still play."""
+        self._parts.put(None)
+
+    def cancel(self) -> None:
+        """Drop queued parts; the playback queue stops the part that is currently playing."""
+        self._cancelled.set()
+        self._parts.put(None)
+
+    def _next_batch(self) -> tuple[list[bytes], bool]:
+        batch = [self._parts.get()]
+        while True:
+            try:
+                batch.append(self._parts.get_nowait())
+            except queue.Empty:
+                break
+        finished = None in batch
+        return [part for part in batch if part is not None], finished
+
+    def play(self, play_file: PlayFile) -> None:
+        workdir = Path(tempfile.mkdtemp(prefix="tts-mcp-parts-"))
+        index = 0
+        try:
+            finished = False
+            while not finished and not self.cancelled:
+                batch, finished = self._next_batch()
+                if not batch or self.cancelled:
+                    continue
+                path = workdir / f"part-{index:03d}.{self.audio_format}"
+                path.write_bytes(concat_audio(self.audio_format, batch))
+                index += 1
+                play_file(path)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+PlaybackItem = QueuedFile | PlaybackStream
+
+
+class PlaybackQueue:
+    """Play finished files and progressive streams one at a time, in the order they arrive.
+
+    A single scheduler thread starts the next item when the profile's player finishes the
+    previous one, so overlapping tts_speak calls never talk over each other. Urgent items
+    go in a priority lane that is drained before the regular one. When more than max_depth
+    items are waiting, the oldest regular items are dropped first, as they are the most stale.
+    """
+
+    def __init__(self, profile: TTSProfile, *, max_depth: int = DEFAULT_PLAYBACK_QUEUE_DEPTH) -> None:
+        self.profile = profile
+        self.max_depth = max_depth
+        self._cond = threading.Condition()
+        self._urgent: collections.deque[PlaybackItem] = collections.deque()
+        self._regular: collections.deque[PlaybackItem] = collections.deque()
+        self._current: PlaybackItem | None = None
+        self._player = create_player(profile)
+        self._thread: threading.Thread | None = None
+
+    def enqueue_file(self, path: Path, *, urgent: bool = False) -> QueuedFile:
+        """Queue a finished audio file for playback."""
+        item = QueuedFile(path)
+        self._put(item, urgent)
+        return item
+
+    def stream(self, audio_format: str, *, urgent: bool = False) -> PlaybackStream:
+        """Queue a stream whose parts are added while it waits or plays."""
+        item = PlaybackStream(audio_format)
+        self._put(item, urgent)
+        return item
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._urgent) + len(self._regular)
+
+    def clear(self) -> int:
+        """Drop every waiting item and stop the one playing; return how many were removed."""
+        with self._cond:
+            dropped = [*self._urgent, *self._regular]
+            self._urgent.clear()
+            self._regular.clear()
+            if self._current is not None:
+                dropped.append(self._current)
+            for item in dropped:
+                item.cancel()
+        self._player.stop()
+        return len(dropped)
+
+    def close(self) -> None:
+        """Drop everything queued and end the player, including a persistent one; run at exit."""
+        self.clear()
+        self._player.close()
+
+    def join(self, timeout: float | None = None) -> None:
+        """Wait until everything queued so far has finished playing."""
+        with self._cond:
+            self._cond.wait_for(lambda: not self._urgent and not self._regular and self._current is None, timeout)
+
+    def _check_player(self) -> None:
+        if not self.profile.player_command:
+            raise RuntimeError("Profile has no player_command configured")
+        if shutil.which(self.profile.player_command[0]) is None:
+            raise RuntimeError(f"Audio player not found: {self.profile.player_command[0]}")
+
+    def _put(self, item: PlaybackItem, urgent: bool) -> None:
+        self._check_player()
+        with self._cond:
+            (self._urgent if urgent else self._regular).append(item)
+            while len(self._urgent) + len(self._regular) > self.max_depth:
+                stale = self._regular.popleft() if self._regular else self._urgent.popleft()
+                stale.cancel()
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="tts-playback-queue", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._urgent or self._regular)
+                item = self._urgent.popleft() if self._urgent else self._regular.popleft()
+                self._current = item
+            try:
+                item.play(functools.partial(self._play_file, item))
+            except (OSError, ValueError, RuntimeError):
+                pass
+            finally:
+                with self._cond:
+                    self._current = None
+                    self._cond.notify_all()
+
+    def _play_file(self, item: PlaybackItem, path: Path) -> None:
+        self._player.play(path, lambda: item.cancelled)
@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import contextlib
+import json
+import shutil
+import socket
+import struct
+import subprocess
+import tempfile
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import IO, Protocol, cast
+
+from tts_mcp.core.audio import wav_samples
+from tts_mcp.core.metrics import METRICS
+from tts_mcp.core.profile import PLAYERS, TTSProfile, build_player_command, expand_player_command
+
+IPC_CONNECT_TIMEOUT = 5.0
+PLAYER_EXIT_TIMEOUT = 1.0
+PCM_WRITE_BYTES = 8192
+
+Cancelled = Callable[[], bool]
+
+
+class Player(Protocol):
+    def play(self, path: Path, cancelled: Cancelled) -> None:
+        """Play one file, returning when it is done or has been stopped."""
+
+    def stop(self) -> None:
+        """Stop whatever is playing; a later play() still works."""
+
+    def close(self) -> None:
+        """Stop playing and end any player process kept alive between files."""
+
+
+class SpawnPlayer:
+    """Start the profile's player_command once per file."""
+
+    def __init__(self, profile: TTSProfile) -> None:
+        self.profile = profile
+        self._lock = threading.Lock()
+        self._process: subprocess.Popen[bytes] | None = None
+
+    def play(self, path: Path, cancelled: Cancelled) -> None:
+        command = build_player_command(self.profile, path)
+        with self._lock:
+            if cancelled():
+                return
+            process = PLAYERS.spawn(command)
+            self._process = process
+        PLAYERS.wait(process)
+        with self._lock:
+            self._process = None
+
+    def stop(self) -> None:
+        with self._lock:
+            process = self._process
+        if process is not None:
+            PLAYERS.terminate(process)
+
+    def close(self) -> None:
+        self.stop()
+
+
+class MpvIpcPlayer:
+    """Keep one ``mpv --idle`` process alive and load each file through its JSON IPC socket.
+
+    player_command must contain an ``{ipc}`` placeholder, e.g.
+    ``["mpv", "--idle=yes", "--no-video", "--input-ipc-server={ipc}"]``. The process is
+    started on first use and restarted if it exits; its socket lives in a private temp
+    directory. The process stays in the server's session, so it gets the same hangup
+    signal, and close() ends it and removes the socket directory.
+    """
+
+    def __init__(self, profile: TTSProfile) -> None:
+        self.profile = profile
+        self.socket_path: Path | None = None
+        self._lock = threading.Lock()
+        self._process: subprocess.Popen[bytes] | None = None
+        self._socket: socket.socket | None = None
+        self._events: IO[bytes] | None = None
+
+    def play(self, path: Path, cancelled: Cancelled) -> None:
+        with self._lock:
+            if cancelled():
+                return
+            client, events = self._connect()
+            _send(client, ["loadfile", str(path), "replace"])
+        while True:
+            try:
+                line = events.readline()
+            except (OSError, ValueError):
+                return
+            if not line:
+                self._reset()
+                return
+            try:
+                message = json.loads(line)
+            except ValueError:
+                continue
+            if message.get("event") == "end-file":
+                return
+
+    def stop(self) -> None:
+        with self._lock:
+            if self._socket is not None:
+                try:
+                    _send(self._socket, ["stop"])
+                except OSError:
+                    self._reset_locked()
+
+    def close(self) -> None:
+        with self._lock:
+            self._reset_locked()
+            if self.socket_path is not None:
+                shutil.rmtree(self.socket_path.parent, ignore_errors=True)
+                self.socket_path = None
+
+    def _connect(self) -> tuple[socket.socket, IO[bytes]]:
+        if (
+            self._socket is not None
+            and self._events is not None
+            and self._process is not None
+            and self._process.poll() is None
+        ):
+            return self._socket, self._events
+        self._reset_locked()
+        if self.socket_path is None:
+            self.socket_path = Path(tempfile.mkdtemp(prefix="tts-mcp-mpv-")) / "mpv.sock"
+        self.socket_path.unlink(missing_ok=True)
+        command = expand_player_command(self.profile, ipc=str(self.socket_path))
+        start = time.perf_counter()
+        self._process = subprocess.Popen(
+            command,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        deadline = time.monotonic() + IPC_CONNECT_TIMEOUT
+        while True:
+            client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                client.connect(str(self.socket_path))
+                break
+            except OSError:
+                client.close()
+                if self._process.poll() is not None or time.monotonic() > deadline:
+                    self._reset_locked()
+                    raise RuntimeError(f"Player did not open its IPC socket: {command[0]}") from None
+                time.sleep(0.02)
+        METRICS.observe("tts_player_spawn_ms", (time.perf_counter() - start) * 1000)
+        self._socket = client
+        self._events = client.makefile("rb")
+        return client, self._events
+
+    def _reset(self) -> None:
+        with self._lock:
+            self._reset_locked()
+
+    def _reset_locked(self) -> None:
+        if self._events is not None:
+            self._events.close()
+        if self._socket is not None:
+            self._socket.close()
+        if self._process is not None:
+            if self._process.poll() is None:
+                self._process.terminate()
+            try:
+                self._process.wait(PLAYER_EXIT_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+                self._process.wait()
+        self._events = None
+        self._socket = None
+        self._process = None
+
+
+def _send(client: socket.socket, command: list[str]) -> None:
+    client.sendall(json.dumps({"command": command}).encode("utf-8") + b"\n")
+
+
+class PcmStdinPlayer:
+    """Keep one raw-PCM player alive and write each WAV file's samples to its stdin.
+
+    player_command may use ``{rate}``, ``{channels}`` and ``{bits}`` placeholders, e.g.
+    ``["aplay", "-q", "-t", "raw", "-f", "S16_LE", "-c", "{channels}", "-r", "{rate}"]``.
+    When a file with a different sample format arrives, the player is left to drain and a
+    new one is started. Stopping kills it, so audio already buffered in the pipe is
+    dropped too.
+    """
+
+    def __init__(self, profile: TTSProfile) -> None:
+        self.profile = profile
+        self._lock = threading.Lock()
+        self._process: subprocess.Popen[bytes] | None = None
+        self._fmt = b""
+
+    def play(self, path: Path, cancelled: Cancelled) -> None:
+        fmt, samples = wav_samples(path.read_bytes())
+        view = memoryview(samples)
+        for start in range(0, len(view), PCM_WRITE_BYTES):
+            with self._lock:
+                if cancelled():
+                    return
+                stdin = self._stdin(fmt)
+            try:
+                stdin.write(view[start : start + PCM_WRITE_BYTES])
+                stdin.flush()
+            except (BrokenPipeError, ValueError):
+                return
+
+    def stop(self) -> None:
+        with self._lock:
+            self._close_locked(drain=False)
+
+    def close(self) -> None:
+        self.stop()
+
+    def _stdin(self, fmt: bytes) -> IO[bytes]:
+        if self._process is not None and (self._process.poll() is not None or fmt != self._fmt):
+            self._close_locked(drain=True)
+        if self._process is None or self._process.stdin is None:
+            _format, channels, rate, _byte_rate, _align, bits = struct.unpack_from("<HHIIHH", fmt)
+            command = expand_player_command(self.profile, rate=str(rate), channels=str(channels), bits=str(bits))
+            start = time.perf_counter()
+            self._process = subprocess.Popen(
+                command,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                start_new_session=True,
+            )
+            METRICS.observe("tts_player_spawn_ms", (time.perf_counter() - start) * 1000)
+            self._fmt = fmt
+        return cast(IO[bytes], self._process.stdin)
+
+    def _close_locked(self, *, drain: bool) -> None:
+        if self._process is None:
+            return
+        if not drain and self._process.poll() is None:
+            self._process.kill()
+        if self._process.stdin is not None:
+            with contextlib.suppress(BrokenPipeError):
+                self._process.stdin.close()
+        self._process.wait()
+        self._process = None
+
+
+def create_player(profile: TTSProfile) -> Player:
+    if profile.player_mode == "mpv-ipc":
+        return MpvIpcPlayer(profile)
+    if profile.player_mode == "pcm-stdin":
+        return PcmStdinPlayer(profile)
+    return SpawnPlayer(profile)
@@ -1,15 +1,33 @@
 from __future__ import annotations
 
+import contextlib
 import json
 import os
 import shutil
+import signal
 import subprocess
+import threading
+import time
 from dataclasses import dataclass
 from pathlib import Path
-from typing import cast
+
+from tts_mcp.core.jobs import DEFAULT_JOB_WORKERS
+from tts_mcp.core.metrics import METRICS
+from tts_mcp.core.ratelimit import DEFAULT_RATE_LIMIT_WAIT_S
+from tts_mcp.core.retry import DEFAULT_MAX_RETRIES, DEFAULT_RETRY_BACKOFF_MS
+from tts_mcp.core.synth import DEFAULT_CHUNK_BYTES, DEFAULT_CHUNK_WORKERS, MAX_INPUT_BYTES, STREAMING_ENCODINGS
+from tts_mcp.core.usage import DEFAULT_USAGE_FLUSH_MS, DEFAULT_USAGE_FLUSH_ROWS, USAGE_BACKENDS
+from tts_mcp.core.warmup import WARMUP_MODES
 
 CONFIG_DIR_NAME = "tts-mcp"
 PROFILES_FILENAME = "profiles.json"
+DEFAULT_CACHE_MAX_MB = 256
+BACKENDS = ("unary", "streaming")
+DEFAULT_MAX_IN_FLIGHT = 8
+DEFAULT_PLAYBACK_QUEUE_DEPTH = 10
+PLAYER_MODES = ("spawn", "mpv-ipc", "pcm-stdin")
+# Where os.waitid is missing (macOS before Python 3.13), reapers poll for exits this often.
+REAP_POLL_S = 0.01
 
 
 @dataclass
@@ -25,6 +43,33 @@ class TTSProfile:
     usage_log: Path
     autoplay: bool
     player_command: list[str]
+    cache_dir: Path | None = None
+    cache_max_mb: int = 0
+    chunk_max_bytes: int = 0
+    chunk_workers: int = DEFAULT_CHUNK_WORKERS
+    progressive_playback: bool = False
+    backend: str = "unary"
+    max_in_flight: int = DEFAULT_MAX_IN_FLIGHT
+    job_workers: int = DEFAULT_JOB_WORKERS
+    playback_queue_depth: int = DEFAULT_PLAYBACK_QUEUE_DEPTH
+    player_mode: str = "spawn"
+    usage_backend: str = "csv"
+    usage_flush_rows: int = DEFAULT_USAGE_FLUSH_ROWS
+    usage_flush_ms: int = DEFAULT_USAGE_FLUSH_MS
+    metrics_file: Path | None = None
+    metrics_port: int = 0
+    warmup: str = "off"
+    keepalive_ms: int = 0
+    idle_timeout_ms: int = 0
+    heartbeat_s: int = 0
+    request_timeout_s: float = 0.0
+    max_retries: int = DEFAULT_MAX_RETRIES
+    retry_backoff_ms: int = DEFAULT_RETRY_BACKOFF_MS
+    hedge_percentile: float = 0.0
+    rate_limit_requests_per_min: int = 0
+    rate_limit_chars_per_min: int = 0
+    rate_limit_max_wait_s: float = DEFAULT_RATE_LIMIT_WAIT_S
+    rate_limit_file: Path | None = None
 
 
 @dataclass
@@ -44,6 +89,21 @@ def default_config_dir() -> Path:
     return base / CONFIG_DIR_NAME
 
 
+def default_cache_dir() -> Path:
+    """Return the XDG cache directory for synthesized audio.
+
+    Honors XDG_CACHE_HOME if set, otherwise defaults to ~/.cache.
+    """
+    xdg_cache = os.environ.get("XDG_CACHE_HOME", "")
+    base = Path(xdg_cache).expanduser() if xdg_cache else Path("~/.cache").expanduser()
+    return base / CONFIG_DIR_NAME / "audio"
+
+
+def default_rate_limit_file() -> Path:
+    """Return the rate limiter's state file, shared by every profile and process that uses it."""
+    return default_cache_dir().parent / "rate-limit.json"
+
+
 def resolve_profile_path(explicit: str | None = None) -> Path:
     """Find the profiles file, searching in priority order.
 
@@ -97,47 +157,250 @@ def load_profile(profile_file: Path, profile_name: str) -> TTSProfile:
     base_dir = source.parent
     output_dir = _resolve_path(base_dir, selected.get("output_dir", "./out"))
     usage_log = _resolve_path(base_dir, selected.get("usage_log", "usage_log.csv"))
+    cache_dir_value = selected.get("cache_dir", "")
+    cache_dir = _resolve_path(base_dir, cache_dir_value) if cache_dir_value else default_cache_dir()
 
     player = selected.get("player_command", ["afplay", "{file}"])
     if not isinstance(player, list) or not all(isinstance(item, str) for item in player):
         raise ValueError("profile.player_command must be a list of strings")
 
+    chunk_max_bytes = int(selected.get("chunk_max_bytes", DEFAULT_CHUNK_BYTES))
+    if not 0 <= chunk_max_bytes <= MAX_INPUT_BYTES:
+        raise ValueError(f"profile.chunk_max_bytes must be between 0 and {MAX_INPUT_BYTES}")
+    chunk_workers = int(selected.get("chunk_workers", DEFAULT_CHUNK_WORKERS))
+    if chunk_workers < 1:
+        raise ValueError("profile.chunk_workers must be at least 1")
+    max_in_flight = int(selected.get("max_in_flight", DEFAULT_MAX_IN_FLIGHT))
+    if max_in_flight < 1:
+        raise ValueError("profile.max_in_flight must be at least 1")
+    job_workers = int(selected.get("job_workers", DEFAULT_JOB_WORKERS))
+    if job_workers < 1:
+        raise ValueError("profile.job_workers must be at least 1")
+    playback_queue_depth = int(selected.get("playback_queue_depth", DEFAULT_PLAYBACK_QUEUE_DEPTH))
+    if playback_queue_depth < 1:
+        raise ValueError("profile.playback_queue_depth must be at least 1")
+
+    audio_format = str(selected.get("format", "mp3"))
+    backend = str(selected.get("backend", "unary"))
+    if backend not in BACKENDS:
+        raise ValueError(f"profile.backend must be one of: {', '.join(BACKENDS)}")
+    if backend == "streaming" and audio_format not in STREAMING_ENCODINGS:
+        raise ValueError("profile.backend 'streaming' requires format wav or ogg")
+
+    player_mode = str(selected.get("player_mode", "spawn"))
+    if player_mode not in PLAYER_MODES:
+        raise ValueError(f"profile.player_mode must be one of: {', '.join(PLAYER_MODES)}")
+    if player_mode == "mpv-ipc" and not any("{ipc}" in part for part in player):
+        raise ValueError("profile.player_mode 'mpv-ipc' requires an {ipc} placeholder in player_command")
+    if player_mode == "pcm-stdin" and audio_format != "wav":
+        raise ValueError("profile.player_mode 'pcm-stdin' requires format wav")
+
+    usage_backend = str(selected.get("usage_backend", "csv"))
+    if usage_backend not in USAGE_BACKENDS:
+        raise ValueError(f"profile.usage_backend must be one of: {', '.join(USAGE_BACKENDS)}")
+    usage_flush_rows = int(selected.get("usage_flush_rows", DEFAULT_USAGE_FLUSH_ROWS))
+    if usage_flush_rows < 1:
+        raise ValueError("profile.usage_flush_rows must be at least 1")
+    usage_flush_ms = int(selected.get("usage_flush_ms", DEFAULT_USAGE_FLUSH_MS))
+    if usage_flush_ms < 0:
+        raise ValueError("profile.usage_flush_ms must be 0 or greater")
+    metrics_file_value = selected.get("metrics_file", "")
+    metrics_file = _resolve_path(base_dir, metrics_file_value) if metrics_file_value else None
+    metrics_port = int(selected.get("metrics_port", 0))
+    if not 0 <= metrics_port <= 65535:
+        raise ValueError("profile.metrics_port must be between 0 and 65535")
+    warmup = str(selected.get("warmup", "off"))
+    if warmup not in WARMUP_MODES:
+        raise ValueError(f"profile.warmup must be one of: {', '.join(WARMUP_MODES)}")
+    keepalive_ms = int(selected.get("keepalive_ms", 0))
+    if keepalive_ms < 0:
+        raise ValueError("profile.keepalive_ms must be 0 or greater")
+    idle_timeout_ms = int(selected.get("idle_timeout_ms", 0))
+    if idle_timeout_ms < 0:
+        raise ValueError("profile.idle_timeout_ms must be 0 or greater")
+    heartbeat_s = int(selected.get("heartbeat_s", 0))
+    if heartbeat_s < 0:
+        raise ValueError("profile.heartbeat_s must be 0 or greater")
+    request_timeout_s = float(selected.get("request_timeout_s", 0.0))
+    if request_timeout_s < 0:
+        raise ValueError("profile.request_timeout_s must be 0 or greater")
+    max_retries = int(selected.get("max_retries", DEFAULT_MAX_RETRIES))
+    if max_retries < 0:
+        raise ValueError("profile.max_retries must be 0 or greater")
+    retry_backoff_ms = int(selected.get("retry_backoff_ms", DEFAULT_RETRY_BACKOFF_MS))
+    if retry_backoff_ms < 0:
+        raise ValueError("profile.retry_backoff_ms must be 0 or greater")
+    hedge_percentile = float(selected.get("hedge_percentile", 0.0))
+    if not 0 <= hedge_percentile < 1:
+        raise ValueError("profile.hedge_percentile must be 0 (off) or a fraction below 1, e.g. 0.95")
+    rate_limit_requests_per_min = int(selected.get("rate_limit_requests_per_min", 0))
+    if rate_limit_requests_per_min < 0:
+        raise ValueError("profile.rate_limit_requests_per_min must be 0 or greater")
+    rate_limit_chars_per_min = int(selected.get("rate_limit_chars_per_min", 0))
+    if rate_limit_chars_per_min < 0:
+        raise ValueError("profile.rate_limit_chars_per_min must be 0 or greater")
+    rate_limit_max_wait_s = float(selected.get("rate_limit_max_wait_s", DEFAULT_RATE_LIMIT_WAIT_S))
+    if rate_limit_max_wait_s < 0:
+        raise ValueError("profile.rate_limit_max_wait_s must be 0 or greater")
+    rate_limit_file_value = selected.get("rate_limit_file", "")
+    rate_limit_file = (
+        _resolve_path(base_dir, rate_limit_file_value) if rate_limit_file_value else default_rate_limit_file()
+    )
+
     return TTSProfile(
         name=selected_name,
         voice=str(selected.get("voice", "en-US-Chirp3-HD-Fenrir")),
         language=str(selected.get("language", "en-US")),
         model=str(selected.get("model", "")),
-        audio_format=str(selected.get("format", "mp3")),
+        audio_format=audio_format,
         speaking_rate=float(selected.get("speaking_rate", 1.0)),
         pitch=float(selected.get("pitch", 0.0)),
         output_dir=output_dir,
         usage_log=usage_log,
         autoplay=bool(selected.get("autoplay", True)),
         player_command=player,
+        cache_dir=cache_dir,
+        cache_max_mb=int(selected.get("cache_max_mb", DEFAULT_CACHE_MAX_MB)),
+        chunk_max_bytes=chunk_max_bytes,
+        chunk_workers=chunk_workers,
+        progressive_playback=bool(selected.get("progressive_playback", False)),
+        backend=backend,
+        max_in_flight=max_in_flight,
+        job_workers=job_workers,
+        playback_queue_depth=playback_queue_depth,
+        player_mode=player_mode,
+        usage_backend=usage_backend,
+        usage_flush_rows=usage_flush_rows,
+        usage_flush_ms=usage_flush_ms,
+        metrics_file=metrics_file,
+        metrics_port=metrics_port,
+        warmup=warmup,
+        keepalive_ms=keepalive_ms,
+        idle_timeout_ms=idle_timeout_ms,
+        heartbeat_s=heartbeat_s,
+        request_timeout_s=request_timeout_s,
+        max_retries=max_retries,
+        retry_backoff_ms=retry_backoff_ms,
+        hedge_percentile=hedge_percentile,
+        rate_limit_requests_per_min=rate_limit_requests_per_min,
+        rate_limit_chars_per_min=rate_limit_chars_per_min,
+        rate_limit_max_wait_s=rate_limit_max_wait_s,
+        rate_limit_file=rate_limit_file,
     )
 
 
-def play_audio(profile: TTSProfile, file_path: Path) -> bool:
+def expand_player_command(profile: TTSProfile, **placeholders: str) -> list[str]:
+    """Fill ``{name}`` placeholders in the profile's player_command, checking the player exists."""
+    command = list(profile.player_command)
+    for name, value in placeholders.items():
+        command = [part.replace(f"{{{name}}}", value) for part in command]
+    if command and shutil.which(command[0]) is None:
+        raise RuntimeError(f"Audio player not found: {command[0]}")
+    return command
+
+
+def build_player_command(profile: TTSProfile, file_path: Path) -> list[str]:
+    """Expand the profile's player_command for one file, checking the player exists."""
+    return expand_player_command(profile, file=str(file_path))
+
+
+class PlayerRegistry:
+    """Player processes started by this server, reaped as soon as they exit.
+
+    Every player is spawned in its own session and watched by a reaper thread, so finished
+    players never linger as zombies and stop requests can target exactly the process
+    groups this server started. A player is only ever reaped under the registry lock, and
+    signals are only sent under that lock to players that have not been reaped, so a
+    signal can never reach an unrelated process that has been given a recycled pid.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._processes: dict[subprocess.Popen[bytes], threading.Thread] = {}
+
+    def spawn(self, command: list[str]) -> subprocess.Popen[bytes]:
+        start = time.perf_counter()
+        process = subprocess.Popen(
+            command,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+        METRICS.observe("tts_player_spawn_ms", (time.perf_counter() - start) * 1000)
+        reaper = threading.Thread(target=self._reap, args=(process,), name="tts-player-reaper", daemon=True)
+        with self._lock:
+            self._processes[process] = reaper
+        reaper.start()
+        return process
+
+    def wait(self, process: subprocess.Popen[bytes], timeout: float | None = None) -> int | None:
+        """Wait for a player to exit; returns its exit code, or None if it is still running."""
+        with self._lock:
+            reaper = self._processes.get(process)
+        if reaper is not None:
+            reaper.join(timeout)
+        with self._lock:
+            return process.returncode
+
+    def running(self) -> list[subprocess.Popen[bytes]]:
+        with self._lock:
+            return [process for process in self._processes if process.poll() is None]
+
+    def terminate(self, process: subprocess.Popen[bytes]) -> None:
+        """Ask one player's process group to exit, including any children it started."""
+        self._signal(process, signal.SIGTERM)
+
+    def terminate_all(self, timeout: float = 1.0) -> int:
+        """Terminate every running player's process group and return how many were running."""
+        with self._lock:
+            processes = [process for process in self._processes if process.poll() is None]
+            for process in processes:
+                _signal_group(process, signal.SIGTERM)
+        for process in processes:
+            if self.wait(process, timeout) is None:
+                self._signal(process, signal.SIGKILL)
+        return len(processes)
+
+    def _signal(self, process: subprocess.Popen[bytes], signum: int) -> None:
+        with self._lock:
+            if process.poll() is None:
+                _signal_group(process, signum)
+
+    def _reap(self, process: subprocess.Popen[bytes]) -> None:
+        if hasattr(os, "waitid"):
+            # Wait for the exit without reaping, so the pid stays reserved until the lock is held.
+            with contextlib.suppress(ChildProcessError):
+                os.waitid(os.P_PID, process.pid, os.WEXITED | os.WNOWAIT)
+        while True:
+            with self._lock:
+                if process.poll() is not None:
+                    self._processes.pop(process, None)
+                    return
+            time.sleep(REAP_POLL_S)
+
+
+def _signal_group(process: subprocess.Popen[bytes], signum: int) -> None:
+    with contextlib.suppress(ProcessLookupError, PermissionError):
+        os.killpg(process.pid, signum)
+
+
+PLAYERS = PlayerRegistry()
+
+
+def play_audio(profile: TTSProfile, file_path: Path, *, registry: PlayerRegistry = PLAYERS) -> bool:
     if not profile.autoplay:
         return False
 
-    command = [part.replace("{file}", str(file_path)) for part in profile.player_command]
+    command = build_player_command(profile, file_path)
     if not command:
         return False
 
-    if shutil.which(command[0]) is None:
-        raise RuntimeError(f"Audio player not found: {command[0]}")
-
-    subprocess.Popen(
-        command,
-        stdout=subprocess.DEVNULL,
-        stderr=subprocess.DEVNULL,
-        start_new_session=True,
-    )
+    registry.spawn(command)
     return True
 
 
-def stop_audio(profile: TTSProfile) -> StopAudioResult:
+def stop_audio(profile: TTSProfile, *, registry: PlayerRegistry = PLAYERS) -> StopAudioResult:
+    """Stop the players this process started; players started by other programs are left alone."""
     if not profile.player_command:
         return StopAudioResult(attempted=False, player="", stopped_processes=0)
 
@@ -145,28 +408,4 @@ def stop_audio(profile: TTSProfile) -> StopAudioResult:
     if not player:
         return StopAudioResult(attempted=False, player="", stopped_processes=0)
 
-    pgrep_cmd = shutil.which("pgrep")
-    pkill_cmd = shutil.which("pkill")
-    killall_cmd = shutil.which("killall")
-
-    if pgrep_cmd is None or (pkill_cmd is None and killall_cmd is None):
-        raise RuntimeError("Unable to stop playback automatically: missing pgrep/pkill tools")
-
-    lookup = subprocess.run([pgrep_cmd, "-x", player], capture_output=True, text=True, check=False)
-    if lookup.returncode not in (0, 1):
-        raise RuntimeError(f"Failed to inspect running player processes for: {player}")
-
-    running = [line.strip() for line in lookup.stdout.splitlines() if line.strip()]
-    running_count = len(running)
-    if running_count == 0:
-        return StopAudioResult(attempted=True, player=player, stopped_processes=0)
-
-    if pkill_cmd is not None:
-        stop = subprocess.run([pkill_cmd, "-x", player], check=False)
-    else:
-        stop = subprocess.run([cast(str, killall_cmd), player], check=False)
-
-    if stop.returncode != 0:
-        raise RuntimeError(f"Failed to stop active playback for player: {player}")
-
-    return StopAudioResult(attempted=True, player=player, stopped_processes=running_count)
+    return StopAudioResult(attempted=True, player=player, stopped_processes=registry.terminate_all())
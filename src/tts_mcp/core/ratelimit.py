@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import fcntl
+import json
+import threading
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+DEFAULT_RATE_LIMIT_WAIT_S = 30.0
+# Buckets in the state file, each {"tokens": float, "updated": unix time}.
+_BUCKETS = ("requests", "chars")
+
+
+class RateLimitError(RuntimeError):
+    """A call would have had to wait longer than the limiter's max_wait_s."""
+
+
+class RateLimiter:
+    """Token buckets for synthesis requests and characters per minute, shared between processes.
+
+    Each bucket holds up to one minute's allowance and refills continuously, so short
+    bursts go straight through and sustained load is spread out to the limit. acquire()
+    takes one request and the call's characters, sleeping until both buckets have refilled
+    enough; a call that would have to wait more than max_wait_s raises RateLimitError
+    at once instead, so callers queue for a bounded time rather than failing together.
+
+    The buckets live in a small JSON state file, read and updated under an exclusive
+    flock on a ``.lock`` file next to it, so every tts-mcp server and tts-batch run using
+    the same file draws on one budget. A limit of 0 disables that bucket.
+    """
+
+    def __init__(
+        self,
+        state_file: Path,
+        *,
+        requests_per_min: int = 0,
+        chars_per_min: int = 0,
+        max_wait_s: float = DEFAULT_RATE_LIMIT_WAIT_S,
+    ) -> None:
+        self.state_file = state_file
+        self.limits = {"requests": requests_per_min, "chars": chars_per_min}
+        self.max_wait_s = max_wait_s
+        self._lock_path = state_file.with_name(f"{state_file.name}.lock")
+        self._stats_lock = threading.Lock()
+        self._waits = 0
+        self._waited_s = 0.0
+        self._rejected = 0
+
+    @property
+    def enabled(self) -> bool:
+        return any(self.limits.values())
+
+    def acquire(self, chars: int) -> float:
+        """Take one request and `chars` characters, waiting for them if needed; returns seconds waited."""
+        if not self.enabled:
+            return 0.0
+        # A call larger than a whole bucket could never fit; it only has to wait for a full one.
+        cost = {"requests": 1, "chars": min(chars, self.limits["chars"])}
+        start = time.monotonic()
+        waited = 0.0
+        while True:
+            with self._locked_state() as buckets:
+                wait_s = self._take(buckets, cost)
+            if wait_s <= 0:
+                if waited:
+                    with self._stats_lock:
+                        self._waits += 1
+                        self._waited_s += waited
+                return waited
+            if waited + wait_s > self.max_wait_s:
+                with self._stats_lock:
+                    self._rejected += 1
+                raise RateLimitError(
+                    f"Rate limit: the next slot is {wait_s:.1f}s away, past the {self.max_wait_s:g}s wait limit."
+                )
+            time.sleep(wait_s)
+            waited = time.monotonic() - start
+
+    async def acquire_async(self, chars: int) -> float:
+        if not self.enabled:
+            return 0.0
+        return await asyncio.to_thread(self.acquire, chars)
+
+    def state(self) -> dict[str, Any]:
+        """Limits, tokens currently available in the shared buckets, and this process's waits."""
+        available: dict[str, float | None] = dict.fromkeys(_BUCKETS)
+        if self.enabled:
+            with self._locked_state() as buckets:
+                for name in _BUCKETS:
+                    if self.limits[name]:
+                        available[name] = round(self._refill(buckets, name, time.time()), 1)
+        with self._stats_lock:
+            return {
+                "requests_per_min": self.limits["requests"],
+                "chars_per_min": self.limits["chars"],
+                "max_wait_s": self.max_wait_s,
+                "state_file": str(self.state_file),
+                "requests_available": available["requests"],
+                "chars_available": available["chars"],
+                "waits": self._waits,
+                "waited_s": round(self._waited_s, 3),
+                "rejected": self._rejected,
+            }
+
+    def _refill(self, buckets: dict[str, dict[str, float]], name: str, now: float) -> float:
+        limit = self.limits[name]
+        bucket = buckets.get(name)
+        if not isinstance(bucket, dict) or not all(
+            isinstance(bucket.get(key), float | int) for key in ("tokens", "updated")
+        ):
+            bucket = buckets[name] = {"tokens": float(limit), "updated": now}
+        elapsed = max(0.0, now - bucket["updated"])
+        bucket["tokens"] = min(float(limit), bucket["tokens"] + elapsed * limit / 60)
+        bucket["updated"] = now
+        return bucket["tokens"]
+
+    def _take(self, buckets: dict[str, dict[str, float]], cost: dict[str, int]) -> float:
+        """Deduct cost if every bucket has it and return 0, else return the seconds until they will."""
+        now = time.time()
+        wait_s = 0.0
+        for name in _BUCKETS:
+            if self.limits[name]:
+                tokens = self._refill(buckets, name, now)
+                wait_s = max(wait_s, (cost[name] - tokens) * 60 / self.limits[name])
+        if wait_s <= 0:
+            for name in _BUCKETS:
+                if self.limits[name]:
+                    buckets[name]["tokens"] -= cost[name]
+        return wait_s
+
+    @contextlib.contextmanager
+    def _locked_state(self) -> Iterator[dict[str, dict[str, float]]]:
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock_path.open("a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                buckets: dict[str, dict[str, float]] = json.loads(self.state_file.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                buckets = {}
+            if not isinstance(buckets, dict):
+                buckets = {}
+            yield buckets
+            temp = self.state_file.with_name(f".{self.state_file.name}.tmp")
+            temp.write_text(json.dumps(buckets), encoding="utf-8")
+            temp.replace(self.state_file)
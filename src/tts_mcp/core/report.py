@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+import csv
+import io
+import math
+import re
+import sqlite3
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+from tts_mcp.core.usage import VOICE_FAMILIES, detect_family, rollup_path, usage_partitions
+
+REPORT_GROUPS = ("month", "day", "profile", "family", "language")
+READ_CHUNK_BYTES = 1 << 20
+UNKNOWN_PROFILE = "unknown"
+
+# (day, voice family, language, profile) -> [requests, billed chars]
+DayTotals = dict[tuple[str, str, str, str], list[int]]
+# (day, voice family, language, profile) -> {api_ms rounded to 3 significant figures: requests}
+DayLatency = dict[tuple[str, str, str, str], Counter[float]]
+
+
+@dataclass
+class ReportRow:
+    key: str
+    requests: int
+    chars: int
+    billable_chars: int
+    estimated_cost_usd: float
+    api_ms_p50: float | None = None
+    api_ms_p95: float | None = None
+    api_ms_p99: float | None = None
+
+
+_FIELD = r"[^,\r\n]*"
+_ROLES = ("day", "chars", "voice", "language", "profile", "requests", "cache_hit")
+
+
+@dataclass
+class _Layout:
+    """Which columns of a usage CSV feed the report, and a pattern that pulls just those out."""
+
+    columns: list[int]
+    roles: list[str]
+    pattern: re.Pattern[str]
+    # Rows shorter than this predate the trailing columns and read them as empty.
+    required: int
+
+
+def _layout(header: list[str], roles: tuple[str, ...] = _ROLES) -> _Layout | None:
+    positions = {name: index for index, name in enumerate(header)}
+    day = positions.get("day", positions.get("timestamp_utc"))
+    if day is None or "chars" not in positions or "voice" not in positions:
+        return None
+    by_column = {day: "day"}
+    for role in roles[1:]:
+        if role in positions:
+            by_column[positions[role]] = role
+    columns = sorted(by_column)
+    required = max(day, positions["chars"], positions["voice"]) + 1
+    parts = []
+    for index in range(columns[-1] + 1):
+        if index == day:
+            # Keep only the date part of an ISO timestamp.
+            parts.append(rf"([^,\r\n]{{0,10}}){_FIELD}")
+        elif index in by_column:
+            parts.append(f"({_FIELD})")
+        else:
+            parts.append(_FIELD)
+    # Columns past the required ones were added later; rows written before them simply end early.
+    tail = ""
+    for part in reversed(parts[required:]):
+        tail = f"(?:,{part}{tail})?"
+    pattern = re.compile("^" + ",".join(parts[:required]) + tail, re.MULTILINE)
+    return _Layout(columns=columns, roles=[by_column[index] for index in columns], pattern=pattern, required=required)
+
+
+class DayAggregator:
+    """Fold usage logs into per-day totals without holding the rows in memory.
+
+    Files are read READ_CHUNK_BYTES at a time. Only the columns the report needs are
+    extracted from each chunk, by a single regex pass when nothing is quoted, and identical
+    rows are counted in bulk before being folded in. Memory stays bounded by the number of
+    distinct (day, family, language, profile) keys rather than the number of rows.
+
+    With latency=True the api_ms column is read as well, into a per-key histogram of
+    request latencies. Cache hits and rows written before api_ms was logged are left out.
+    """
+
+    def __init__(self, *, latency: bool = False) -> None:
+        self.totals: DayTotals = {}
+        self.latency: DayLatency = {}
+        self._roles = (*_ROLES, "api_ms") if latency else _ROLES
+        self._families: dict[str, str] = {}
+
+    def add_csv(self, path: Path) -> None:
+        with path.open("rb") as handle:
+            header = next(csv.reader([handle.readline().decode("utf-8")]), [])
+            layout = _layout(header, self._roles)
+            if layout is None:
+                return
+            rest = b""
+            while chunk := handle.read(READ_CHUNK_BYTES):
+                chunk = rest + chunk
+                cut = chunk.rfind(b"\n") + 1
+                rest = chunk[cut:]
+                self._add_chunk(chunk[:cut], layout)
+            self._add_chunk(rest, layout)
+
+    def add_sqlite(self, path: Path) -> None:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(usage)")}
+            profile = "profile" if "profile" in columns else "''"
+            billed = "CASE WHEN cache_hit = 0 THEN chars ELSE 0 END" if "cache_hit" in columns else "chars"
+            rows = conn.execute(
+                f"SELECT substr(timestamp_utc, 1, 10), family, language, {profile}, COUNT(*), SUM({billed})"  # noqa: S608
+                " FROM usage GROUP BY 1, 2, 3, 4"
+            )
+            for day, family, language, name, requests, chars in rows:
+                self._add((day, family, language, name or UNKNOWN_PROFILE), requests, chars)
+            if "api_ms" in self._roles and "api_ms" in columns:
+                rows = conn.execute(
+                    "SELECT substr(timestamp_utc, 1, 10), family, language, profile, api_ms, COUNT(*)"
+                    " FROM usage WHERE cache_hit = 0 AND api_ms > 0 GROUP BY 1, 2, 3, 4, 5"
+                )
+                for day, family, language, name, api_ms, count in rows:
+                    self._add_latency((day, family, language, name or UNKNOWN_PROFILE), api_ms, count)
+        finally:
+            conn.close()
+
+    def _add(self, key: tuple[str, str, str, str], requests: int, chars: int) -> None:
+        entry = self.totals.get(key)
+        if entry is None:
+            self.totals[key] = [requests, chars]
+        else:
+            entry[0] += requests
+            entry[1] += chars
+
+    def _add_latency(self, key: tuple[str, str, str, str], api_ms: float, count: int) -> None:
+        histogram = self.latency.get(key)
+        if histogram is None:
+            histogram = self.latency[key] = Counter()
+        histogram[float(f"{api_ms:.3g}")] += count
+
+    def _family(self, voice: str) -> str:
+        family = self._families.get(voice)
+        if family is None:
+            family = self._families[voice] = detect_family(voice)
+        return family
+
+    def _add_chunk(self, data: bytes, layout: _Layout) -> None:
+        text = data.decode("utf-8")
+        if '"' in text:
+            width = layout.columns[-1] + 1
+            rows: Iterable[tuple[str, ...]] = (
+                tuple((row + [""] * (width - len(row)))[index] for index in layout.columns)
+                for row in csv.reader(io.StringIO(text, newline=""))
+                if len(row) >= layout.required
+            )
+            counts = Counter(
+                tuple(value[:10] if role == "day" else value for value, role in zip(row, layout.roles, strict=True))
+                for row in rows
+            )
+        else:
+            counts = Counter(layout.pattern.findall(text))
+        roles = {role: index for index, role in enumerate(layout.roles)}
+        day, chars, voice = roles["day"], roles["chars"], roles["voice"]
+        language, profile, requests = roles.get("language"), roles.get("profile"), roles.get("requests")
+        cache_hit, api_ms = roles.get("cache_hit"), roles.get("api_ms")
+        for values, count in counts.items():
+            if not values[chars].isdigit():
+                continue
+            key = (
+                values[day],
+                self._family(values[voice]),
+                "" if language is None else values[language],
+                UNKNOWN_PROFILE if profile is None else values[profile] or UNKNOWN_PROFILE,
+            )
+            request_count = count if requests is None else int(values[requests]) * count
+            hit = cache_hit is not None and values[cache_hit] == "1"
+            self._add(key, request_count, 0 if hit else int(values[chars]) * count)
+            if api_ms is not None and not hit:
+                try:
+                    latency = float(values[api_ms])
+                except ValueError:
+                    continue
+                if latency > 0:
+                    self._add_latency(key, latency, count)
+
+
+def usage_log_files(log_path: Path) -> list[Path]:
+    """Every CSV holding usage for a log: the rollup, an unpartitioned log, then monthly partitions."""
+    candidates = [rollup_path(log_path), log_path, *usage_partitions(log_path).values()]
+    return [path for path in candidates if path.exists()]
+
+
+def _billed(totals: DayTotals) -> Iterator[tuple[tuple[str, str, str, str], int, int, int, float]]:
+    """Yield (key, requests, chars, billable, cost) with each family's free tier used up day by day.
+
+    The monthly free tier is consumed in date order. On the day it runs out, that day's
+    billable characters are shared between its keys in proportion to their characters.
+    """
+    days_by_month_family: dict[tuple[str, str], dict[str, list[tuple[str, str, str, str]]]] = {}
+    for key in totals:
+        day, family = key[0], key[1]
+        days_by_month_family.setdefault((day[:7], family), {}).setdefault(day, []).append(key)
+
+    for (_month, family), days in days_by_month_family.items():
+        info = VOICE_FAMILIES.get(family, {"rate_per_million": 0, "free_chars": 0})
+        free_left = info["free_chars"]
+        for day in sorted(days):
+            keys = sorted(days[day])
+            day_chars = sum(totals[key][1] for key in keys)
+            day_billable = max(0, day_chars - free_left)
+            free_left = max(0, free_left - day_chars)
+            remaining = day_billable
+            for index, key in enumerate(keys):
+                requests, chars = totals[key]
+                if not day_billable:
+                    billable = 0
+                elif index == len(keys) - 1:
+                    billable = remaining
+                else:
+                    billable = day_billable * chars // day_chars
+                remaining -= billable
+                yield key, requests, chars, billable, billable * info["rate_per_million"] / 1_000_000
+
+
+def percentile(histogram: Counter[float], fraction: float) -> float | None:
+    """Nearest-rank percentile of a {value: count} histogram, or None when it is empty."""
+    total = sum(histogram.values())
+    if not total:
+        return None
+    rank = max(1, math.ceil(fraction * total))
+    seen = 0
+    for value in sorted(histogram):
+        seen += histogram[value]
+        if seen >= rank:
+            return value
+    return None
+
+
+def summarize(
+    totals: DayTotals,
+    *,
+    group_by: str = "month",
+    month: str = "",
+    latency: DayLatency | None = None,
+) -> list[ReportRow]:
+    """Group per-day totals by one of REPORT_GROUPS, optionally limited to one YYYY-MM month.
+
+    When latency histograms are given, each row also gets its p50/p95/p99 api_ms.
+    """
+    if group_by not in REPORT_GROUPS:
+        raise ValueError(f"group_by must be one of: {', '.join(REPORT_GROUPS)}")
+    index = {"day": 0, "family": 1, "language": 2, "profile": 3}
+
+    def _group(key: tuple[str, str, str, str]) -> str:
+        return key[0][:7] if group_by == "month" else key[index[group_by]]
+
+    rows: dict[str, ReportRow] = {}
+    for key, requests, chars, billable, cost in _billed(totals):
+        if month and not key[0].startswith(month):
+            continue
+        group = _group(key)
+        row = rows.get(group)
+        if row is None:
+            rows[group] = ReportRow(group, requests, chars, billable, cost)
+        else:
+            row.requests += requests
+            row.chars += chars
+            row.billable_chars += billable
+            row.estimated_cost_usd += cost
+
+    if latency is not None:
+        histograms: dict[str, Counter[float]] = {}
+        for key, histogram in latency.items():
+            if month and not key[0].startswith(month):
+                continue
+            histograms.setdefault(_group(key), Counter()).update(histogram)
+        for group, histogram in histograms.items():
+            row = rows.get(group)
+            if row is not None:
+                row.api_ms_p50 = percentile(histogram, 0.50)
+                row.api_ms_p95 = percentile(histogram, 0.95)
+                row.api_ms_p99 = percentile(histogram, 0.99)
+    return [rows[group] for group in sorted(rows)]
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import random
+import threading
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, TypeVar
+
+from tts_mcp.core.metrics import METRICS, error_status
+from tts_mcp.core.ratelimit import RateLimiter
+
+# gRPC statuses worth another attempt: the request never ran, or ran out of time or quota.
+RETRYABLE_STATUSES = frozenset({"UNAVAILABLE", "DEADLINE_EXCEEDED", "RESOURCE_EXHAUSTED"})
+DEFAULT_MAX_RETRIES = 2
+DEFAULT_RETRY_BACKOFF_MS = 250
+MAX_RETRY_BACKOFF_MS = 8000
+# The hedge threshold is learned from this many recent successful calls, once there are enough.
+HEDGE_WINDOW = 200
+HEDGE_MIN_SAMPLES = 20
+HEDGE_WORKERS = 32
+
+T = TypeVar("T")
+
+
+@dataclass
+class RetryPolicy:
+    timeout_s: float = 0.0
+    max_retries: int = DEFAULT_MAX_RETRIES
+    backoff_ms: int = DEFAULT_RETRY_BACKOFF_MS
+    hedge_percentile: float = 0.0
+
+
+class Retrier:
+    """Bound, retry and optionally hedge synthesis API calls according to a RetryPolicy.
+
+    Each attempt gets timeout_s as its deadline (0 leaves it unbounded). An attempt that
+    fails with a status in RETRYABLE_STATUSES is retried up to max_retries times, after a
+    random backoff of up to backoff_ms doubled per retry ("full jitter"), so callers that
+    failed together do not retry together.
+
+    With hedge_percentile set, e.g. 0.95, an attempt that has not answered by that
+    percentile of recent successful call latencies gets a duplicate, and whichever answers
+    first is used. Only slow calls are duplicated, so this trims the tail without touching
+    the median, but a duplicate that reaches the API is billed like any other request.
+
+    With a limiter, every attempt, retry and hedge first takes its request and characters
+    from the limiter's buckets, waiting its turn if they are empty.
+    """
+
+    def __init__(self, policy: RetryPolicy | None = None, *, limiter: RateLimiter | None = None) -> None:
+        self.policy = policy or RetryPolicy()
+        self.limiter = limiter
+        self._lock = threading.Lock()
+        self._latencies: deque[float] = deque(maxlen=HEDGE_WINDOW)
+        self._pool: ThreadPoolExecutor | None = None
+
+    def call(self, fn: Callable[..., T], *, chars: int = 0, **kwargs: Any) -> T:
+        """Call fn(**kwargs) for `chars` characters of input, adding the policy's timeout, hedging and retries."""
+        retry = 0
+        while True:
+            try:
+                return self._attempt(fn, chars, kwargs)
+            except Exception as exc:
+                if not self._should_retry(exc, retry):
+                    raise
+            METRICS.inc("tts_retries_total")
+            time.sleep(self.backoff_s(retry))
+            retry += 1
+
+    async def call_async(self, fn: Callable[..., Awaitable[T]], *, chars: int = 0, **kwargs: Any) -> T:
+        """Async counterpart of call, for the asyncio client."""
+        retry = 0
+        while True:
+            try:
+                return await self._attempt_async(fn, chars, kwargs)
+            except Exception as exc:
+                if not self._should_retry(exc, retry):
+                    raise
+            METRICS.inc("tts_retries_total")
+            await asyncio.sleep(self.backoff_s(retry))
+            retry += 1
+
+    def limit(self, chars: int) -> None:
+        """Wait for the limiter to admit a call outside call(), e.g. a streaming RPC."""
+        if self.limiter is not None:
+            self.limiter.acquire(chars)
+
+    def backoff_s(self, retry: int) -> float:
+        cap_ms = min(MAX_RETRY_BACKOFF_MS, self.policy.backoff_ms * 2**retry)
+        return random.uniform(0, cap_ms) / 1000  # noqa: S311
+
+    def hedge_delay_s(self) -> float | None:
+        """How long an attempt may run before it is hedged, or None while hedging is off or still learning."""
+        if not self.policy.hedge_percentile:
+            return None
+        with self._lock:
+            if len(self._latencies) < HEDGE_MIN_SAMPLES:
+                return None
+            ordered = sorted(self._latencies)
+        return ordered[max(1, math.ceil(self.policy.hedge_percentile * len(ordered))) - 1]
+
+    def hedge_state(self) -> dict[str, Any]:
+        delay = self.hedge_delay_s()
+        with self._lock:
+            samples = len(self._latencies)
+        return {
+            "percentile": self.policy.hedge_percentile,
+            "delay_ms": None if delay is None else round(delay * 1000, 1),
+            "latency_samples": samples,
+        }
+
+    def _should_retry(self, exc: Exception, retry: int) -> bool:
+        return retry < self.policy.max_retries and error_status(exc) in RETRYABLE_STATUSES
+
+    def _timed(self, fn: Callable[..., T], chars: int, kwargs: dict[str, Any]) -> T:
+        self.limit(chars)
+        if self.policy.timeout_s:
+            kwargs = {**kwargs, "timeout": self.policy.timeout_s}
+        start = time.perf_counter()
+        result = fn(**kwargs)
+        self._record(start)
+        return result
+
+    async def _timed_async(self, fn: Callable[..., Awaitable[T]], chars: int, kwargs: dict[str, Any]) -> T:
+        if self.limiter is not None:
+            await self.limiter.acquire_async(chars)
+        if self.policy.timeout_s:
+            kwargs = {**kwargs, "timeout": self.policy.timeout_s}
+        start = time.perf_counter()
+        result = await fn(**kwargs)
+        self._record(start)
+        return result
+
+    def _record(self, start: float) -> None:
+        with self._lock:
+            self._latencies.append(time.perf_counter() - start)
+
+    def _attempt(self, fn: Callable[..., T], chars: int, kwargs: dict[str, Any]) -> T:
+        delay = self.hedge_delay_s()
+        if delay is None:
+            return self._timed(fn, chars, kwargs)
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=HEDGE_WORKERS, thread_name_prefix="tts-hedge")
+            pool = self._pool
+        pending = {pool.submit(self._timed, fn, chars, kwargs)}
+        done, pending = wait(pending, timeout=delay)
+        if not done:
+            METRICS.inc("tts_hedges_total")
+            # A blocking gRPC call cannot be cancelled; the slower attempt finishes in the background.
+            pending.add(pool.submit(self._timed, fn, chars, kwargs))
+        errors: list[BaseException] = []
+        while True:
+            for future in done:
+                error = future.exception()
+                if error is None:
+                    return future.result()
+                errors.append(error)
+            if not pending:
+                raise errors[-1]
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+    async def _attempt_async(self, fn: Callable[..., Awaitable[T]], chars: int, kwargs: dict[str, Any]) -> T:
+        delay = self.hedge_delay_s()
+        if delay is None:
+            return await self._timed_async(fn, chars, kwargs)
+        pending = {asyncio.ensure_future(self._timed_async(fn, chars, kwargs))}
+        errors: list[BaseException] = []
+        try:
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if not done:
+                METRICS.inc("tts_hedges_total")
+                pending.add(asyncio.ensure_future(self._timed_async(fn, chars, kwargs)))
+            while True:
+                for task in done:
+                    error = task.exception()
+                    if error is None:
+                        return task.result()
+                    errors.append(error)
+                if not pending:
+                    raise errors[-1]
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in pending:
+                task.cancel()
@@ -1,16 +1,37 @@
 from __future__ import annotations
 
+import asyncio
+import re
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
+from typing import TYPE_CHECKING, Any
 
-from google.cloud import texttospeech
+from tts_mcp.core.audio import concat_audio, pcm_wav_fmt, wav_header
+from tts_mcp.core.cache import SynthesisCache, cache_key
+from tts_mcp.core.retry import Retrier
 
+if TYPE_CHECKING:
+    from google.cloud import texttospeech
+
+# Values are texttospeech.AudioEncoding member names. google.cloud.texttospeech is only
+# imported once a request is built, so the CLIs can list formats without loading gRPC.
 AUDIO_ENCODINGS = {
-    "mp3": texttospeech.AudioEncoding.MP3,
-    "wav": texttospeech.AudioEncoding.LINEAR16,
-    "ogg": texttospeech.AudioEncoding.OGG_OPUS,
+    "mp3": "MP3",
+    "wav": "LINEAR16",
+    "ogg": "OGG_OPUS",
+}
+
+# streaming_synthesize only returns raw PCM or Ogg Opus; PCM is wrapped in a WAV header locally.
+STREAMING_ENCODINGS = {
+    "wav": "PCM",
+    "ogg": "OGG_OPUS",
 }
+STREAMING_SAMPLE_RATE = 24000
 
 MIME_TYPES = {
     "mp3": "audio/mpeg",
@@ -18,6 +39,14 @@ MIME_TYPES = {
     "ogg": "audio/ogg",
 }
 
+# The API rejects inputs above 5000 bytes; chunks stay under it with some headroom.
+MAX_INPUT_BYTES = 5000
+DEFAULT_CHUNK_BYTES = 4500
+DEFAULT_CHUNK_WORKERS = 4
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_SENTENCE_END = re.compile(r"(?<=[.!?\u2026\u3002\uff01\uff1f])\s+")
+
 
 @dataclass
 class SynthesisRequest:
@@ -42,6 +71,9 @@ class SynthesisResult:
     language: str
     model: str
     audio_format: str
+    cache_hit: bool = False
+    api_ms: float = 0.0
+    write_ms: float = 0.0
 
 
 def read_text_input(*, text: str, text_file: str) -> str:
@@ -57,9 +89,23 @@ def read_text_input(*, text: str, text_file: str) -> str:
     raise ValueError("No input text provided.")
 
 
+_stamp_lock = threading.Lock()
+_last_stamp = ("", 0)
+
+
+def _unique_stamp(stamp: str) -> str:
+    """Suffix stamps repeated within the same millisecond so concurrent calls get distinct files."""
+    global _last_stamp
+    with _stamp_lock:
+        previous, count = _last_stamp
+        count = count + 1 if stamp == previous else 0
+        _last_stamp = (stamp, count)
+    return f"{stamp}-{count}" if count else stamp
+
+
 def timestamped_output_path(*, audio_format: str, output_dir: Path, prefix: str = "speech") -> Path:
     now = datetime.now().astimezone()
-    stamp = now.strftime("%Y%m%d-%H%M%S") + f"-{now.microsecond // 1000:03d}"
+    stamp = _unique_stamp(now.strftime("%Y%m%d-%H%M%S") + f"-{now.microsecond // 1000:03d}")
     if prefix.strip():
         safe_prefix = sanitize_filename(prefix)
         return output_dir / f"{safe_prefix}-{stamp}.{audio_format}"
@@ -77,17 +123,151 @@ def sanitize_filename(value: str) -> str:
     return cleaned or "audio"
 
 
-def synthesize_to_file(
+def _utf8_len(value: str) -> int:
+    return len(value.encode("utf-8"))
+
+
+def _hard_split(value: str, max_bytes: int) -> list[str]:
+    pieces: list[str] = []
+    current = ""
+    for char in value:
+        if current and _utf8_len(current + char) > max_bytes:
+            pieces.append(current)
+            current = ""
+        current += char
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def _split_segment(segment: str, max_bytes: int) -> list[str]:
+    """Break one paragraph into pieces that fit, preferring sentence, then word boundaries."""
+    if _utf8_len(segment) <= max_bytes:
+        return [segment]
+    pieces: list[str] = []
+    for sentence in _SENTENCE_END.split(segment):
+        if _utf8_len(sentence) <= max_bytes:
+            pieces.append(sentence)
+            continue
+        for word in sentence.split():
+            pieces.extend(_hard_split(word, max_bytes) if _utf8_len(word) > max_bytes else [word])
+    return pieces
+
+
+def split_text(text: str, max_bytes: int) -> list[str]:
+    """Split text into chunks of at most max_bytes UTF-8 bytes at natural boundaries.
+
+    Paragraph breaks are preferred, then sentence ends, then whitespace. Adjacent pieces
+    are packed greedily so the number of API calls stays small.
+    """
+    if max_bytes <= 0:
+        raise ValueError("max_bytes must be positive")
+    text = text.strip()
+    if _utf8_len(text) <= max_bytes:
+        return [text] if text else []
+
+    chunks: list[str] = []
+    current = ""
+    for paragraph in _PARAGRAPH_BREAK.split(text):
+        separator = "\n\n"
+        for piece in _split_segment(paragraph.strip(), max_bytes):
+            if not piece:
+                continue
+            candidate = f"{current}{separator}{piece}" if current else piece
+            if _utf8_len(candidate) <= max_bytes:
+                current = candidate
+            else:
+                chunks.append(current)
+                current = piece
+            separator = " "
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _audio_key(request: SynthesisRequest, text: str, voice: texttospeech.VoiceSelectionParams) -> str:
+    return cache_key(
+        text=text,
+        ssml=request.ssml,
+        voice=voice.name,
+        language=voice.language_code,
+        model=voice.model_name,
+        audio_format=request.audio_format,
+        speaking_rate=request.speaking_rate,
+        pitch=request.pitch,
+    )
+
+
+def _api_request(request: SynthesisRequest, text: str, voice: texttospeech.VoiceSelectionParams) -> dict[str, Any]:
+    from google.cloud import texttospeech
+
+    synthesis_input = texttospeech.SynthesisInput(ssml=text) if request.ssml else texttospeech.SynthesisInput(text=text)
+    return {
+        "input": synthesis_input,
+        "voice": voice,
+        "audio_config": texttospeech.AudioConfig(
+            audio_encoding=texttospeech.AudioEncoding[AUDIO_ENCODINGS[request.audio_format]],
+            speaking_rate=request.speaking_rate,
+            pitch=request.pitch,
+        ),
+    }
+
+
+def _fetch_audio(
     client: texttospeech.TextToSpeechClient,
     request: SynthesisRequest,
-) -> SynthesisResult:
-    if request.audio_format not in AUDIO_ENCODINGS:
-        raise ValueError(f"Unsupported format: {request.audio_format}")
+    text: str,
+    voice: texttospeech.VoiceSelectionParams,
+    cache: SynthesisCache | None,
+    retrier: Retrier | None = None,
+) -> tuple[bytes, bool]:
+    """Return audio for one piece of text and whether it came from the cache."""
+    key = _audio_key(request, text, voice)
+    if cache is not None:
+        cached = cache.get(key, request.audio_format)
+        if cached is not None:
+            return cached, True
 
-    if request.ssml:
-        synthesis_input = texttospeech.SynthesisInput(ssml=request.text)
+    api_request = _api_request(request, text, voice)
+    if retrier is None:
+        response = client.synthesize_speech(request=api_request)
     else:
-        synthesis_input = texttospeech.SynthesisInput(text=request.text)
+        response = retrier.call(client.synthesize_speech, chars=len(text), request=api_request)
+    audio = response.audio_content
+    if cache is not None:
+        cache.put(key, request.audio_format, audio)
+    return audio, False
+
+
+async def _fetch_audio_async(
+    client: texttospeech.TextToSpeechAsyncClient,
+    request: SynthesisRequest,
+    text: str,
+    voice: texttospeech.VoiceSelectionParams,
+    cache: SynthesisCache | None,
+    retrier: Retrier | None = None,
+) -> tuple[bytes, bool]:
+    """Async counterpart of _fetch_audio; cache reads and writes stay synchronous (local disk)."""
+    key = _audio_key(request, text, voice)
+    if cache is not None:
+        cached = cache.get(key, request.audio_format)
+        if cached is not None:
+            return cached, True
+
+    api_request = _api_request(request, text, voice)
+    if retrier is None:
+        response = await client.synthesize_speech(request=api_request)
+    else:
+        response = await retrier.call_async(client.synthesize_speech, chars=len(text), request=api_request)
+    audio = response.audio_content
+    if cache is not None:
+        cache.put(key, request.audio_format, audio)
+    return audio, False
+
+
+def _voice_params(request: SynthesisRequest) -> texttospeech.VoiceSelectionParams:
+    if request.audio_format not in AUDIO_ENCODINGS:
+        raise ValueError(f"Unsupported format: {request.audio_format}")
 
     voice_name = request.voice.strip()
     language_code = request.language.strip()
@@ -95,6 +275,8 @@ def synthesize_to_file(
     if not voice_name and not language_code:
         raise ValueError("Either voice or language must be provided.")
 
+    from google.cloud import texttospeech
+
     voice = texttospeech.VoiceSelectionParams()
     if language_code:
         voice.language_code = language_code
@@ -102,29 +284,266 @@ def synthesize_to_file(
         voice.name = voice_name
     if model_name:
         voice.model_name = model_name
+    return voice
 
-    response = client.synthesize_speech(
-        request={
-            "input": synthesis_input,
-            "voice": voice,
-            "audio_config": texttospeech.AudioConfig(
-                audio_encoding=AUDIO_ENCODINGS[request.audio_format],
-                speaking_rate=request.speaking_rate,
-                pitch=request.pitch,
-            ),
-        }
-    )
 
-    request.output_file.parent.mkdir(parents=True, exist_ok=True)
-    request.output_file.write_bytes(response.audio_content)
+def _elapsed_ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 1)
 
+
+def _write_audio(path: Path, audio: bytes) -> float:
+    """Write the finished audio file and return how long it took in milliseconds."""
+    start = time.perf_counter()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(audio)
+    return _elapsed_ms(start)
+
+
+def _synthesize_chunks(
+    client: texttospeech.TextToSpeechClient,
+    request: SynthesisRequest,
+    chunks: list[str],
+    *,
+    cache: SynthesisCache | None,
+    max_workers: int,
+    on_chunk: Callable[[bytes], None] | None = None,
+    retrier: Retrier | None = None,
+) -> SynthesisResult:
+    voice = _voice_params(request)
+    start = time.perf_counter()
+
+    if len(chunks) == 1:
+        audio, cache_hit = _fetch_audio(client, request, chunks[0], voice, cache, retrier)
+        if on_chunk is not None:
+            on_chunk(audio)
+    else:
+        parts: list[bytes] = []
+        hits: list[bool] = []
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks)))) as pool:
+            futures = [pool.submit(_fetch_audio, client, request, chunk, voice, cache, retrier) for chunk in chunks]
+            for future in futures:
+                part, hit = future.result()
+                parts.append(part)
+                hits.append(hit)
+                if on_chunk is not None:
+                    on_chunk(part)
+        audio = concat_audio(request.audio_format, parts)
+        cache_hit = all(hits)
+    api_ms = 0.0 if cache_hit else _elapsed_ms(start)
+
+    write_ms = _write_audio(request.output_file, audio)
+    return _result(request, voice, len(audio), cache_hit=cache_hit, api_ms=api_ms, write_ms=write_ms)
+
+
+def _result(
+    request: SynthesisRequest,
+    voice: texttospeech.VoiceSelectionParams,
+    bytes_written: int,
+    *,
+    cache_hit: bool,
+    api_ms: float = 0.0,
+    write_ms: float = 0.0,
+) -> SynthesisResult:
     return SynthesisResult(
         output_file=request.output_file,
         mime_type=MIME_TYPES[request.audio_format],
-        bytes_written=len(response.audio_content),
+        bytes_written=bytes_written,
         chars=len(request.text),
-        voice=voice_name,
-        language=language_code,
-        model=model_name,
+        voice=voice.name,
+        language=voice.language_code,
+        model=voice.model_name,
         audio_format=request.audio_format,
+        cache_hit=cache_hit,
+        api_ms=api_ms,
+        write_ms=write_ms,
     )
+
+
+def synthesize_to_file(
+    client: texttospeech.TextToSpeechClient,
+    request: SynthesisRequest,
+    *,
+    cache: SynthesisCache | None = None,
+    max_chunk_bytes: int = 0,
+    max_workers: int = DEFAULT_CHUNK_WORKERS,
+    retrier: Retrier | None = None,
+) -> SynthesisResult:
+    """Synthesize a request and write the audio to request.output_file.
+
+    With max_chunk_bytes > 0, plain text longer than that is split at sentence and
+    paragraph boundaries, the chunks are synthesized in parallel on up to max_workers
+    threads, and the results are stitched into one file. SSML is never split.
+    With a retrier, each API call gets its deadline, retries and hedging.
+    """
+    chunks = _unary_chunks(request, max_chunk_bytes)
+    return _synthesize_chunks(client, request, chunks, cache=cache, max_workers=max_workers, retrier=retrier)
+
+
+def _unary_chunks(request: SynthesisRequest, max_chunk_bytes: int) -> list[str]:
+    if max_chunk_bytes > 0 and not request.ssml and _utf8_len(request.text) > max_chunk_bytes:
+        return split_text(request.text, max_chunk_bytes)
+    return [request.text]
+
+
+async def synthesize_to_file_async(
+    client: texttospeech.TextToSpeechAsyncClient,
+    request: SynthesisRequest,
+    *,
+    cache: SynthesisCache | None = None,
+    max_chunk_bytes: int = 0,
+    max_workers: int = DEFAULT_CHUNK_WORKERS,
+    retrier: Retrier | None = None,
+) -> SynthesisResult:
+    """Async variant of synthesize_to_file built on TextToSpeechAsyncClient.
+
+    Chunks are awaited concurrently, at most max_workers at a time, instead of on a
+    thread pool, so many requests can wait on the API from a single event loop.
+    """
+    voice = _voice_params(request)
+    chunks = _unary_chunks(request, max_chunk_bytes)
+    limit = asyncio.Semaphore(max(1, max_workers))
+
+    async def _fetch(chunk: str) -> tuple[bytes, bool]:
+        async with limit:
+            return await _fetch_audio_async(client, request, chunk, voice, cache, retrier)
+
+    start = time.perf_counter()
+    fetched = await asyncio.gather(*(_fetch(chunk) for chunk in chunks))
+    audio = concat_audio(request.audio_format, [part for part, _ in fetched])
+    cache_hit = all(hit for _, hit in fetched)
+    api_ms = 0.0 if cache_hit else _elapsed_ms(start)
+
+    write_ms = _write_audio(request.output_file, audio)
+    return _result(request, voice, len(audio), cache_hit=cache_hit, api_ms=api_ms, write_ms=write_ms)
+
+
+def split_progressive(text: str, max_bytes: int) -> list[str]:
+    """Split text so the first sentence is its own small chunk, followed by regular chunks."""
+    head, *tail = _SENTENCE_END.split(text.strip(), maxsplit=1)
+    chunks = split_text(head, max_bytes)
+    if tail:
+        chunks.extend(split_text(tail[0], max_bytes))
+    return chunks
+
+
+def synthesize_progressively(
+    client: texttospeech.TextToSpeechClient,
+    request: SynthesisRequest,
+    *,
+    on_chunk: Callable[[bytes], None],
+    cache: SynthesisCache | None = None,
+    max_chunk_bytes: int = 0,
+    max_workers: int = DEFAULT_CHUNK_WORKERS,
+    retrier: Retrier | None = None,
+) -> SynthesisResult:
+    """Synthesize like synthesize_to_file, handing each chunk's audio to on_chunk in order.
+
+    The first sentence is synthesized as its own chunk so on_chunk receives playable audio
+    quickly; the remaining chunks are synthesized in parallel behind it. The stitched file
+    is still written to request.output_file once every chunk is done.
+    """
+    chunks = [request.text]
+    if not request.ssml:
+        chunks = split_progressive(request.text, max_chunk_bytes or MAX_INPUT_BYTES) or chunks
+    return _synthesize_chunks(
+        client, request, chunks, cache=cache, max_workers=max_workers, on_chunk=on_chunk, retrier=retrier
+    )
+
+
+def synthesize_streaming_to_file(
+    client: texttospeech.TextToSpeechClient,
+    request: SynthesisRequest,
+    *,
+    on_chunk: Callable[[bytes], None] | None = None,
+    cache: SynthesisCache | None = None,
+    max_chunk_bytes: int = 0,
+    retrier: Retrier | None = None,
+) -> SynthesisResult:
+    """Synthesize through the bidirectional streaming_synthesize RPC.
+
+    Text is sent sentence by sentence and audio is appended to request.output_file as each
+    response arrives, so memory stays bounded by one response. For wav, on_chunk receives
+    every response as a standalone WAV file as soon as it arrives; Ogg pages cannot be
+    played piecemeal, so for ogg on_chunk receives the finished file once.
+
+    Streaming only supports Chirp 3: HD voices, plain text, and no pitch adjustment; the
+    cache is keyed with pitch 0 accordingly. The retrier's deadline bounds the whole stream
+    and its rate limiter admits it, but the stream is never retried, since its audio may
+    already have been played.
+    """
+    if request.ssml:
+        raise ValueError("The streaming backend does not support SSML.")
+    if request.audio_format not in STREAMING_ENCODINGS:
+        raise ValueError(f"The streaming backend supports wav and ogg, not {request.audio_format}.")
+    voice = _voice_params(request)
+
+    key = cache_key(
+        text=request.text,
+        ssml=False,
+        voice=voice.name,
+        language=voice.language_code,
+        model=voice.model_name,
+        audio_format=request.audio_format,
+        speaking_rate=request.speaking_rate,
+        pitch=0.0,
+    )
+    cached = cache.get(key, request.audio_format) if cache is not None else None
+    if cached is not None:
+        write_ms = _write_audio(request.output_file, cached)
+        if on_chunk is not None:
+            on_chunk(cached)
+        return _result(request, voice, len(cached), cache_hit=True, write_ms=write_ms)
+
+    from google.cloud import texttospeech
+
+    def _requests():
+        yield texttospeech.StreamingSynthesizeRequest(
+            streaming_config=texttospeech.StreamingSynthesizeConfig(
+                voice=voice,
+                streaming_audio_config=texttospeech.StreamingAudioConfig(
+                    audio_encoding=texttospeech.AudioEncoding[STREAMING_ENCODINGS[request.audio_format]],
+                    sample_rate_hertz=STREAMING_SAMPLE_RATE,
+                    speaking_rate=request.speaking_rate,
+                ),
+            )
+        )
+        for chunk in split_text(request.text, max_chunk_bytes or MAX_INPUT_BYTES):
+            yield texttospeech.StreamingSynthesizeRequest(input=texttospeech.StreamingSynthesisInput(text=chunk))
+
+    is_wav = request.audio_format == "wav"
+    fmt = pcm_wav_fmt(STREAMING_SAMPLE_RATE)
+    audio_bytes = 0
+    # Audio is written as it arrives, so time spent writing is subtracted from the stream's duration.
+    write_seconds = 0.0
+    start = time.perf_counter()
+    request.output_file.parent.mkdir(parents=True, exist_ok=True)
+    with request.output_file.open("wb") as handle:
+        if is_wav:
+            handle.write(wav_header(fmt, 0))
+        deadline = {}
+        if retrier is not None:
+            retrier.limit(len(request.text))
+            if retrier.policy.timeout_s:
+                deadline["timeout"] = retrier.policy.timeout_s
+        for response in client.streaming_synthesize(_requests(), **deadline):
+            audio = response.audio_content
+            if not audio:
+                continue
+            write_start = time.perf_counter()
+            handle.write(audio)
+            write_seconds += time.perf_counter() - write_start
+            audio_bytes += len(audio)
+            if is_wav and on_chunk is not None:
+                on_chunk(wav_header(fmt, len(audio)) + audio)
+        if is_wav:
+            handle.seek(0)
+            handle.write(wav_header(fmt, audio_bytes))
+    write_ms = round(write_seconds * 1000, 1)
+    api_ms = round(max(0.0, _elapsed_ms(start) - write_ms), 1)
+
+    bytes_written = request.output_file.stat().st_size
+    if cache is not None and bytes_written <= cache.max_bytes:
+        cache.put(key, request.audio_format, request.output_file.read_bytes())
+    if not is_wav and on_chunk is not None:
+        on_chunk(request.output_file.read_bytes())
+    return _result(request, voice, bytes_written, cache_hit=False, api_ms=api_ms, write_ms=write_ms)
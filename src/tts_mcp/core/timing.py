@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import contextlib
+import time
+from collections.abc import Iterator
+
+
+class StageTimer:
+    """Milliseconds spent in each named stage of one request, on the monotonic clock.
+
+    Stages are recorded in the order they first run; timing the same stage twice adds up.
+    The total runs from when the timer was created to when as_dict is called.
+    """
+
+    def __init__(self) -> None:
+        self._start = time.perf_counter()
+        self._stages: dict[str, float] = {}
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, (time.perf_counter() - start) * 1000)
+
+    def add(self, name: str, ms: float) -> None:
+        """Record a stage measured elsewhere, e.g. the API time reported by synthesis."""
+        self._stages[name] = self._stages.get(name, 0.0) + ms
+
+    def as_dict(self) -> dict[str, float]:
+        timings = {name: round(ms, 1) for name, ms in self._stages.items()}
+        timings["total"] = round((time.perf_counter() - self._start) * 1000, 1)
+        return timings
+
+
+def format_timings(timings: dict[str, float]) -> str:
+    return ", ".join(f"{name} {ms:g} ms" for name, ms in timings.items())
@@ -1,9 +1,23 @@
 from __future__ import annotations
 
+import contextlib
 import csv
+import fcntl
+import glob
+import io
+import json
+import os
+import re
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from collections.abc import Iterable, Iterator, Mapping, Sequence
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import UTC, datetime
 from pathlib import Path
+from typing import Protocol, TextIO
 
 VOICE_FAMILIES: dict[str, dict] = {
     "Chirp3-HD": {"rate_per_million": 30, "free_chars": 1_000_000},
@@ -49,6 +63,220 @@ class UsageSnapshot:
     month_to_date_by_family: dict[str, FamilyUsage] = field(default_factory=dict)
 
 
+# Columns added later go at the end, so rows written before them still parse.
+USAGE_FIELDS = [
+    "timestamp_utc",
+    "month",
+    "chars",
+    "voice",
+    "language",
+    "format",
+    "output_file",
+    "api_ms",
+    "write_ms",
+    "audio_bytes",
+    "profile",
+    "cache_hit",
+]
+ROLLUP_FIELDS = ["day", "voice", "language", "format", "profile", "requests", "chars"]
+USAGE_BACKENDS = ("csv", "sqlite")
+DEFAULT_USAGE_FLUSH_ROWS = 50
+DEFAULT_USAGE_FLUSH_MS = 1000
+
+# month -> voice family -> chars
+MonthTotals = dict[str, dict[str, int]]
+
+
+def billed_chars(row: Mapping[str, str | None]) -> int:
+    """Characters a logged row was billed for; cache hits were never sent to the API."""
+    return 0 if row.get("cache_hit") == "1" else int(row.get("chars") or 0)
+
+
+def totals_path(log_path: Path) -> Path:
+    """Sidecar file holding per-month, per-family totals for a usage log."""
+    return log_path.with_name(f"{log_path.name}.totals.json")
+
+
+def _scan_totals(log_path: Path) -> tuple[MonthTotals, int]:
+    """Aggregate the whole log; returns the totals and the log size they cover."""
+    data = log_path.read_bytes() if log_path.exists() else b""
+    totals: MonthTotals = {}
+    for row in csv.DictReader(io.StringIO(data.decode("utf-8"), newline="")):
+        month = row.get("month") or ""
+        family = detect_family(row.get("voice", ""))
+        by_family = totals.setdefault(month, {})
+        by_family[family] = by_family.get(family, 0) + billed_chars(row)
+    return totals, len(data)
+
+
+def _load_totals(log_path: Path, log_size: int) -> MonthTotals | None:
+    """Return the sidecar totals if they were computed for a log of exactly log_size bytes."""
+    try:
+        payload = json.loads(totals_path(log_path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(payload, dict) or payload.get("log_size") != log_size:
+        return None
+    months = payload.get("months")
+    return months if isinstance(months, dict) else None
+
+
+def _save_totals(log_path: Path, totals: MonthTotals, log_size: int) -> None:
+    path = totals_path(log_path)
+    try:
+        fd, temp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}-")
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump({"log_size": log_size, "months": totals}, handle)
+        os.replace(temp_name, path)
+    except OSError:
+        Path(temp_name).unlink(missing_ok=True)
+
+
+def usage_totals(log_path: Path) -> MonthTotals:
+    """Per-month, per-family character totals, served from the sidecar when it is current.
+
+    The sidecar records the log size it covers; if the log has grown or shrunk since (it
+    was edited, or appended to by an older version), the totals are rebuilt from the CSV.
+    """
+    try:
+        log_size = log_path.stat().st_size
+    except FileNotFoundError:
+        return {}
+    totals = _load_totals(log_path, log_size)
+    if totals is None:
+        totals, log_size = _scan_totals(log_path)
+        _save_totals(log_path, totals, log_size)
+    return totals
+
+
+@dataclass
+class UsageRow:
+    timestamp_utc: datetime
+    chars: int
+    voice: str
+    language: str
+    audio_format: str
+    output_file: Path
+    api_ms: float = 0.0
+    write_ms: float = 0.0
+    audio_bytes: int = 0
+    profile: str = ""
+    cache_hit: bool = False
+
+    @property
+    def month(self) -> str:
+        return self.timestamp_utc.strftime("%Y-%m")
+
+    @property
+    def family(self) -> str:
+        return detect_family(self.voice)
+
+    @property
+    def billed_chars(self) -> int:
+        return 0 if self.cache_hit else self.chars
+
+    def as_csv(self) -> dict[str, str]:
+        return {
+            "timestamp_utc": self.timestamp_utc.isoformat(),
+            "month": self.month,
+            "chars": str(self.chars),
+            "voice": self.voice,
+            "language": self.language,
+            "format": self.audio_format,
+            "output_file": str(self.output_file),
+            "api_ms": f"{self.api_ms:g}",
+            "write_ms": f"{self.write_ms:g}",
+            "audio_bytes": str(self.audio_bytes),
+            "profile": self.profile,
+            "cache_hit": "1" if self.cache_hit else "0",
+        }
+
+    @classmethod
+    def from_csv(cls, row: Mapping[str, str | None]) -> UsageRow:
+        """Parse a logged row; columns missing from older logs fall back to their defaults."""
+        return cls(
+            timestamp_utc=datetime.fromisoformat(row["timestamp_utc"] or ""),
+            chars=int(row["chars"] or 0),
+            voice=row.get("voice") or "",
+            language=row.get("language") or "",
+            audio_format=row.get("format") or "",
+            output_file=Path(row.get("output_file") or ""),
+            api_ms=float(row.get("api_ms") or 0),
+            write_ms=float(row.get("write_ms") or 0),
+            audio_bytes=int(row.get("audio_bytes") or 0),
+            profile=row.get("profile") or "",
+            cache_hit=row.get("cache_hit") == "1",
+        )
+
+
+@contextlib.contextmanager
+def _locked_append(log_path: Path) -> Iterator[TextIO]:
+    """Open log_path for appending under an exclusive lock.
+
+    Serializing appenders keeps the sidecar totals in step with the log. If the file was
+    compacted away while we waited for the lock, it is opened again so the row is not lost.
+    """
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    while True:
+        handle = log_path.open("a", newline="", encoding="utf-8")
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        if os.fstat(handle.fileno()).st_nlink and not _upgrade_header(log_path):
+            break
+        handle.close()
+    with handle:
+        yield handle
+
+
+def _upgrade_header(log_path: Path) -> bool:
+    """Rewrite a log whose header predates newer USAGE_FIELDS columns; True if it was replaced.
+
+    Newer columns only ever go at the end, so older rows stay valid under the longer header
+    and parse with those columns empty. The caller holds the log's lock.
+    """
+    with log_path.open("rb") as reader:
+        header = reader.readline()
+        fieldnames = next(csv.reader([header.decode("utf-8")]), [])
+        if not fieldnames or fieldnames == USAGE_FIELDS or fieldnames != USAGE_FIELDS[: len(fieldnames)]:
+            return False
+        fd, temp_name = tempfile.mkstemp(dir=log_path.parent, prefix=f".{log_path.name}-")
+        try:
+            with os.fdopen(fd, "wb") as writer:
+                writer.write((",".join(USAGE_FIELDS) + "\r\n").encode("utf-8"))
+                shutil.copyfileobj(reader, writer)
+            os.replace(temp_name, log_path)
+        except BaseException:
+            Path(temp_name).unlink(missing_ok=True)
+            raise
+    return True
+
+
+def append_usage_rows(log_path: Path, rows: Sequence[UsageRow]) -> None:
+    """Append rows to the CSV log under one lock and update the sidecar totals once."""
+    if not rows:
+        return
+    with _locked_append(log_path) as handle:
+        size_before = os.fstat(handle.fileno()).st_size
+        has_file = size_before > 0
+        writer = csv.DictWriter(handle, fieldnames=USAGE_FIELDS)
+        if not has_file:
+            writer.writeheader()
+        writer.writerows(row.as_csv() for row in rows)
+        handle.flush()
+        size_after = os.fstat(handle.fileno()).st_size
+
+        totals = _load_totals(log_path, size_before) if has_file else {}
+        if totals is None:
+            totals, size_after = _scan_totals(log_path)
+        else:
+            for row in rows:
+                by_family = totals.setdefault(row.month, {})
+                by_family[row.family] = by_family.get(row.family, 0) + row.billed_chars
+        _save_totals(log_path, totals, size_after)
+
+
 def append_usage_row(
     log_path: Path,
     *,
@@ -58,70 +286,558 @@ def append_usage_row(
     language: str,
     audio_format: str,
     output_file: Path,
+    api_ms: float = 0.0,
+    write_ms: float = 0.0,
+    audio_bytes: int = 0,
+    profile: str = "",
+    cache_hit: bool = False,
 ) -> None:
-    log_path.parent.mkdir(parents=True, exist_ok=True)
-    has_file = log_path.exists()
-    with log_path.open("a", newline="", encoding="utf-8") as handle:
-        writer = csv.DictWriter(
-            handle,
-            fieldnames=[
-                "timestamp_utc",
-                "month",
-                "chars",
-                "voice",
-                "language",
-                "format",
-                "output_file",
-            ],
-        )
-        if not has_file:
-            writer.writeheader()
-        writer.writerow(
-            {
-                "timestamp_utc": timestamp_utc.isoformat(),
-                "month": timestamp_utc.strftime("%Y-%m"),
-                "chars": str(chars),
-                "voice": voice,
-                "language": language,
-                "format": audio_format,
-                "output_file": str(output_file),
-            }
-        )
+    row = UsageRow(
+        timestamp_utc=timestamp_utc,
+        chars=chars,
+        voice=voice,
+        language=language,
+        audio_format=audio_format,
+        output_file=output_file,
+        api_ms=api_ms,
+        write_ms=write_ms,
+        audio_bytes=audio_bytes,
+        profile=profile,
+        cache_hit=cache_hit,
+    )
+    append_usage_rows(log_path, [row])
 
 
-def month_total_chars(log_path: Path, month_key: str) -> int:
-    if not log_path.exists():
-        return 0
+def _month_rows(log_path: Path, month_key: str) -> Iterator[dict[str, str]]:
+    """Yield the log rows for one month.
 
-    total = 0
-    with log_path.open("r", newline="", encoding="utf-8") as handle:
-        reader = csv.DictReader(handle)
-        for row in reader:
+    The whole file is read: rows from several processes are not guaranteed to be in time
+    order, and the running server reads month totals from the sidecar or from a single
+    monthly partition instead.
+    """
+    if not log_path.exists():
+        return
+    with log_path.open(newline="", encoding="utf-8") as handle:
+        for row in csv.DictReader(handle):
             if row.get("month") == month_key:
-                total += int(row["chars"])
-    return total
+                yield row
+
+
+def month_total_chars(log_path: Path, month_key: str) -> int:
+    return sum(billed_chars(row) for row in _month_rows(log_path, month_key))
 
 
 def month_chars_by_family(log_path: Path, month_key: str) -> dict[str, int]:
     """Sum characters per voice family for a given month."""
-    if not log_path.exists():
-        return {}
-
     totals: dict[str, int] = {}
-    with log_path.open("r", newline="", encoding="utf-8") as handle:
-        reader = csv.DictReader(handle)
-        for row in reader:
-            if row.get("month") == month_key:
-                family = detect_family(row.get("voice", ""))
-                totals[family] = totals.get(family, 0) + int(row["chars"])
+    for row in _month_rows(log_path, month_key):
+        family = detect_family(row.get("voice", ""))
+        totals[family] = totals.get(family, 0) + billed_chars(row)
     return totals
 
 
-def create_usage_snapshot(log_path: Path, *, chars_this_request: int, voice: str, now_utc: datetime) -> UsageSnapshot:
-    month_key = now_utc.strftime("%Y-%m")
-    family = detect_family(voice)
-    by_family_chars = month_chars_by_family(log_path, month_key)
+def partition_path(log_path: Path, month_key: str) -> Path:
+    """The per-month partition of a usage log, e.g. ``usage_log-2026-10.csv``."""
+    return log_path.with_name(f"{log_path.stem}-{month_key}{log_path.suffix}")
+
+
+def rollup_path(log_path: Path) -> Path:
+    """Compacted per-day totals for the closed months of a partitioned usage log."""
+    return log_path.with_name(f"{log_path.stem}.rollup{log_path.suffix}")
+
+
+def usage_partitions(log_path: Path) -> dict[str, Path]:
+    """Existing monthly partitions of a usage log, keyed and ordered by month."""
+    pattern = re.compile(rf"{re.escape(log_path.stem)}-(\d{{4}}-\d{{2}}){re.escape(log_path.suffix)}")
+    found: dict[str, Path] = {}
+    for name in glob.glob(f"{glob.escape(log_path.stem)}-*{glob.escape(log_path.suffix)}", root_dir=log_path.parent):
+        match = pattern.fullmatch(name)
+        if match:
+            found[match.group(1)] = log_path.with_name(name)
+    return dict(sorted(found.items()))
+
+
+# (day, voice, language, format, profile) -> [requests, billed chars]
+Rollup = dict[tuple[str, str, str, str, str], list[int]]
+
+
+def _read_rollup(log_path: Path) -> Rollup:
+    rollup: Rollup = {}
+    path = rollup_path(log_path)
+    if not path.exists():
+        return rollup
+    with path.open(newline="", encoding="utf-8") as handle:
+        for row in csv.DictReader(handle):
+            key = (row["day"], row["voice"], row["language"], row["format"], row.get("profile") or "")
+            entry = rollup.setdefault(key, [0, 0])
+            entry[0] += int(row["requests"])
+            entry[1] += int(row["chars"])
+    return rollup
+
+
+def _write_rollup(log_path: Path, rollup: Rollup) -> None:
+    path = rollup_path(log_path)
+    fd, temp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}-")
+    try:
+        with os.fdopen(fd, "w", newline="", encoding="utf-8") as handle:
+            writer = csv.writer(handle)
+            writer.writerow(ROLLUP_FIELDS)
+            for key, (requests, chars) in sorted(rollup.items()):
+                writer.writerow([*key, requests, chars])
+        os.replace(temp_name, path)
+    except BaseException:
+        Path(temp_name).unlink(missing_ok=True)
+        raise
+
+
+def _add_to_rollup(rollup: Rollup, rows: Iterable[Mapping[str, str]]) -> None:
+    for row in rows:
+        # Timestamps are UTC ISO strings, so the first ten characters are the UTC day.
+        key = (
+            row["timestamp_utc"][:10],
+            row.get("voice") or "",
+            row.get("language") or "",
+            row.get("format") or "",
+            row.get("profile") or "",
+        )
+        entry = rollup.setdefault(key, [0, 0])
+        entry[0] += 1
+        entry[1] += billed_chars(row)
+
 
+def rollup_totals(log_path: Path) -> MonthTotals:
+    """Per-month, per-family character totals of the compacted months."""
+    totals: MonthTotals = {}
+    for (day, voice, *_rest), (_requests, chars) in _read_rollup(log_path).items():
+        by_family = totals.setdefault(day[:7], {})
+        family = detect_family(voice)
+        by_family[family] = by_family.get(family, 0) + chars
+    return totals
+
+
+def _split_single_file_log(log_path: Path) -> None:
+    """Move the rows of an unpartitioned usage log into monthly partitions."""
+    with _locked_append(log_path):
+        by_month: dict[str, list[UsageRow]] = {}
+        with log_path.open(newline="", encoding="utf-8") as handle:
+            for row in csv.DictReader(handle):
+                usage_row = UsageRow.from_csv(row)
+                by_month.setdefault(usage_row.month, []).append(usage_row)
+        for month_key, rows in sorted(by_month.items()):
+            append_usage_rows(partition_path(log_path, month_key), rows)
+        log_path.unlink()
+        totals_path(log_path).unlink(missing_ok=True)
+
+
+def rotate_usage_log(log_path: Path, current_month: str) -> None:
+    """Partition a usage log by month and compact months before current_month into the rollup.
+
+    An unpartitioned log left by an older version is split up first. Maintenance is
+    serialized across processes by a lock file, and each closed partition stays locked
+    until it has been folded into the rollup and removed, so no append can slip in between.
+    """
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    lock_path = log_path.with_name(f"{log_path.name}.lock")
+    with lock_path.open("a") as lock, contextlib.ExitStack() as held:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        if log_path.exists():
+            _split_single_file_log(log_path)
+        closed = [path for month_key, path in usage_partitions(log_path).items() if month_key < current_month]
+        if not closed:
+            return
+        rollup = _read_rollup(log_path)
+        for path in closed:
+            held.enter_context(_locked_append(path))
+            with path.open(newline="", encoding="utf-8") as handle:
+                _add_to_rollup(rollup, csv.DictReader(handle))
+        _write_rollup(log_path, rollup)
+        for path in closed:
+            path.unlink()
+            totals_path(path).unlink(missing_ok=True)
+
+
+class UsageStore(Protocol):
+    path: Path
+
+    def append(self, row: UsageRow) -> None:
+        """Record one billed request."""
+
+    def append_rows(self, rows: Sequence[UsageRow]) -> None:
+        """Record several billed requests in one write."""
+
+    def month_chars_by_family(self, month_key: str) -> dict[str, int]:
+        """Sum characters per voice family for a given month."""
+
+
+class CsvUsageStore:
+    """Usage rows in monthly CSV partitions next to path, e.g. ``usage_log-2026-10.csv``.
+
+    Once a later month has rows, earlier partitions are compacted into a rollup of per-day
+    totals by voice, language and format, so raw rows (with their output paths) are only
+    kept for the current month. Current-month totals read only that month's partition.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._rotated_through = ""
+
+    def append(self, row: UsageRow) -> None:
+        self.append_rows([row])
+
+    def append_rows(self, rows: Sequence[UsageRow]) -> None:
+        by_month: dict[str, list[UsageRow]] = {}
+        for row in rows:
+            by_month.setdefault(row.month, []).append(row)
+        for month_key, month_rows in sorted(by_month.items()):
+            append_usage_rows(partition_path(self.path, month_key), month_rows)
+        latest = max(by_month, default="")
+        if latest > self._rotated_through:
+            self.rotate(latest)
+
+    def rotate(self, current_month: str) -> None:
+        rotate_usage_log(self.path, current_month)
+        self._rotated_through = current_month
+
+    def month_chars_by_family(self, month_key: str) -> dict[str, int]:
+        totals = dict(usage_totals(partition_path(self.path, month_key)).get(month_key, {}))
+        if month_key < datetime.now(UTC).strftime("%Y-%m"):
+            for family, chars in rollup_totals(self.path).get(month_key, {}).items():
+                totals[family] = totals.get(family, 0) + chars
+        return totals
+
+    def rows(self) -> Iterator[dict[str, str]]:
+        """Every recorded row in the usage log format.
+
+        Compacted days come back as one row per request in their rollup entry, with the
+        entry's billed characters spread over them, so request counts and character totals
+        both survive an import into another store.
+        """
+        rollup = sorted(_read_rollup(self.path).items())
+        for (day, voice, language, audio_format, profile), (requests, chars) in rollup:
+            count = max(requests, 1)
+            share, extra = divmod(chars, count)
+            for index in range(count):
+                yield {
+                    "timestamp_utc": f"{day}T00:00:00+00:00",
+                    "month": day[:7],
+                    "chars": str(share + (index < extra)),
+                    "voice": voice,
+                    "language": language,
+                    "format": audio_format,
+                    "output_file": "",
+                    "profile": profile,
+                }
+        for path in [self.path, *usage_partitions(self.path).values()]:
+            if path.exists():
+                with path.open(newline="", encoding="utf-8") as handle:
+                    yield from csv.DictReader(handle)
+
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS usage (
+    id INTEGER PRIMARY KEY,
+    timestamp_utc TEXT NOT NULL,
+    month TEXT NOT NULL,
+    family TEXT NOT NULL,
+    chars INTEGER NOT NULL,
+    voice TEXT NOT NULL,
+    language TEXT NOT NULL,
+    format TEXT NOT NULL,
+    output_file TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS usage_month_family ON usage (month, family);
+CREATE INDEX IF NOT EXISTS usage_family ON usage (family);
+"""
+
+# Columns added after the first schema; older databases gain them on open.
+_SQLITE_ADDED_COLUMNS = {
+    "api_ms": "REAL NOT NULL DEFAULT 0",
+    "write_ms": "REAL NOT NULL DEFAULT 0",
+    "audio_bytes": "INTEGER NOT NULL DEFAULT 0",
+    "profile": "TEXT NOT NULL DEFAULT ''",
+    "cache_hit": "INTEGER NOT NULL DEFAULT 0",
+}
+
+SQLITE_BUSY_TIMEOUT = 5.0
+
+
+class SqliteUsageStore:
+    """Usage rows in a SQLite database, safe to share between several server processes.
+
+    The database runs in WAL mode, so readers never block the writer and concurrent
+    appenders from other processes wait on the busy timeout instead of failing. Totals
+    are computed with indexed aggregate queries. The CSV log format remains available
+    through export_csv and import_csv.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            self.path, timeout=SQLITE_BUSY_TIMEOUT, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._conn.executescript(_SQLITE_SCHEMA)
+        self._add_columns()
+
+    def _add_columns(self) -> None:
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            existing = {row[1] for row in self._conn.execute("PRAGMA table_info(usage)")}
+            for name, definition in _SQLITE_ADDED_COLUMNS.items():
+                if name not in existing:
+                    self._conn.execute(f"ALTER TABLE usage ADD COLUMN {name} {definition}")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def append(self, row: UsageRow) -> None:
+        self.append_rows([row])
+
+    def append_rows(self, rows: Sequence[UsageRow]) -> None:
+        self._insert(
+            (
+                row.timestamp_utc.isoformat(),
+                row.month,
+                row.family,
+                row.chars,
+                row.voice,
+                row.language,
+                row.audio_format,
+                str(row.output_file),
+                row.api_ms,
+                row.write_ms,
+                row.audio_bytes,
+                row.profile,
+                int(row.cache_hit),
+            )
+            for row in rows
+        )
+
+    def _insert(self, values: Iterable[tuple[object, ...]]) -> None:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO usage (timestamp_utc, month, family, chars, voice, language, format, output_file,"
+                    " api_ms, write_ms, audio_bytes, profile, cache_hit)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    values,
+                )
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def month_chars_by_family(self, month_key: str) -> dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT family, SUM(chars) FROM usage WHERE month = ? AND cache_hit = 0 GROUP BY family", (month_key,)
+            ).fetchall()
+        return {family: int(chars) for family, chars in rows}
+
+    def month_total_chars(self, month_key: str) -> int:
+        with self._lock:
+            (total,) = self._conn.execute(
+                "SELECT COALESCE(SUM(chars), 0) FROM usage WHERE month = ? AND cache_hit = 0", (month_key,)
+            ).fetchone()
+        return int(total)
+
+    def export_csv(self, csv_path: Path) -> int:
+        """Write every row to csv_path in the usage log format; returns the row count."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT timestamp_utc, month, chars, voice, language, format, output_file,"
+                " api_ms, write_ms, audio_bytes, profile, cache_hit FROM usage ORDER BY id"
+            ).fetchall()
+        csv_path.parent.mkdir(parents=True, exist_ok=True)
+        with csv_path.open("w", newline="", encoding="utf-8") as handle:
+            writer = csv.DictWriter(handle, fieldnames=USAGE_FIELDS)
+            writer.writeheader()
+            for row in rows:
+                record = {name: str(value) for name, value in zip(USAGE_FIELDS, row, strict=True)}
+                writer.writerow(UsageRow.from_csv(record).as_csv())
+        return len(rows)
+
+    def import_csv(self, csv_path: Path) -> int:
+        """Append the rows of a CSV usage log in one transaction; returns the row count."""
+        with csv_path.open(newline="", encoding="utf-8") as handle:
+            return self.import_rows(csv.DictReader(handle))
+
+    def import_rows(self, rows: Iterable[Mapping[str, str]]) -> int:
+        """Append rows in the usage log format in one transaction; returns the row count."""
+        parsed = [UsageRow.from_csv(row) for row in rows]
+        self.append_rows(parsed)
+        return len(parsed)
+
+
+def usage_db_path(log_path: Path) -> Path:
+    """Database file used by the sqlite backend for a profile's usage_log."""
+    return log_path.with_suffix(".sqlite3") if log_path.suffix == ".csv" else log_path
+
+
+def open_usage_store(log_path: Path, backend: str = "csv") -> UsageStore:
+    """Open the usage store for a profile's usage_log.
+
+    The csv backend compacts any months that closed since it last ran. With the sqlite
+    backend a ``.csv`` usage_log is swapped for a ``.sqlite3`` file next to it, and existing
+    CSV usage is imported the first time the database is created. Creating and importing
+    happen under a lock file, so servers starting together import the CSV only once.
+    """
+    if backend == "csv":
+        csv_store = CsvUsageStore(log_path)
+        csv_store.rotate(datetime.now(UTC).strftime("%Y-%m"))
+        return csv_store
+    if backend != "sqlite":
+        raise ValueError(f"Unknown usage backend: {backend}")
+    db_path = usage_db_path(log_path)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    with db_path.with_name(f"{db_path.name}.lock").open("a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        is_new = not db_path.exists()
+        store = SqliteUsageStore(db_path)
+        if is_new and db_path != log_path:
+            store.import_rows(CsvUsageStore(log_path).rows())
+    return store
+
+
+class BufferedUsageStore:
+    """Queue usage rows in memory and write them to another store in batches.
+
+    append() only queues the row and bumps the in-memory month totals, so callers never wait
+    on the log. A background thread writes the queue to the wrapped store once flush_rows
+    rows are waiting or the oldest has waited flush_ms; close() writes whatever is left.
+    Month totals are read from the wrapped store the first time a month is asked for, then
+    kept current by append() and re-read after each write so rows recorded by other
+    processes are picked up too. A failed write is kept queued and retried.
+    """
+
+    def __init__(
+        self,
+        store: UsageStore,
+        *,
+        flush_rows: int = DEFAULT_USAGE_FLUSH_ROWS,
+        flush_ms: int = DEFAULT_USAGE_FLUSH_MS,
+    ) -> None:
+        self.store = store
+        self.path = store.path
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_ms / 1000
+        self.last_error = ""
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._pending: list[UsageRow] = []
+        self._writing = 0
+        self._oldest_at = 0.0
+        self._totals: MonthTotals = {}
+        self._thread: threading.Thread | None = None
+        self._closed = False
+
+    def append(self, row: UsageRow) -> None:
+        self.append_rows([row])
+
+    def append_rows(self, rows: Sequence[UsageRow]) -> None:
+        with self._cond:
+            if not self._pending:
+                self._oldest_at = time.monotonic()
+            self._pending.extend(rows)
+            for row in rows:
+                by_family = self._totals.get(row.month)
+                if by_family is not None:
+                    by_family[row.family] = by_family.get(row.family, 0) + row.billed_chars
+            closed = self._closed
+            if not closed and (self._thread is None or not self._thread.is_alive()):
+                self._thread = threading.Thread(target=self._run, name="tts-usage-writer", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+        if closed:
+            self.flush()
+
+    def pending(self) -> int:
+        """Rows not yet written to the wrapped store, including a batch being written now."""
+        with self._cond:
+            return len(self._pending) + self._writing
+
+    def month_chars_by_family(self, month_key: str) -> dict[str, int]:
+        with self._cond:
+            by_family = self._totals.get(month_key)
+            if by_family is not None:
+                return dict(by_family)
+        with self._write_lock:
+            return dict(self._reload(month_key))
+
+    def flush(self) -> None:
+        """Write every queued row to the wrapped store now."""
+        with self._write_lock:
+            with self._cond:
+                batch, self._pending = self._pending, []
+                self._writing = len(batch)
+            if not batch:
+                return
+            try:
+                self.store.append_rows(batch)
+            except (OSError, sqlite3.Error) as exc:
+                with self._cond:
+                    self._pending[:0] = batch
+                    self._writing = 0
+                    self._oldest_at = time.monotonic()
+                    self.last_error = str(exc)
+                raise
+            with self._cond:
+                self._writing = 0
+            self.last_error = ""
+            for month_key in list(self._totals):
+                self._reload(month_key)
+
+    def close(self) -> None:
+        """Stop the writer thread and write whatever is still queued."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+        self.flush()
+
+    def _reload(self, month_key: str) -> dict[str, int]:
+        # Caller holds _write_lock, so no queued row can reach the store while it is read.
+        by_family = dict(self.store.month_chars_by_family(month_key))
+        with self._cond:
+            for row in self._pending:
+                if row.month == month_key:
+                    by_family[row.family] = by_family.get(row.family, 0) + row.billed_chars
+            self._totals[month_key] = by_family
+            return by_family
+
+    def _flush_due(self) -> bool:
+        return self._closed or not self._pending or len(self._pending) >= self.flush_rows
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._closed)
+                if self._closed:
+                    return
+                deadline = self._oldest_at + self.flush_interval
+                self._cond.wait_for(self._flush_due, max(0.0, deadline - time.monotonic()))
+                if self._closed:
+                    return
+            try:
+                self.flush()
+            except (OSError, sqlite3.Error):
+                # Back off before retrying rather than spinning on a full disk or locked database.
+                with self._cond:
+                    self._cond.wait_for(lambda: self._closed, self.flush_interval)
+
+
+def _snapshot(by_family_chars: dict[str, int], *, chars_this_request: int, voice: str, month_key: str) -> UsageSnapshot:
     by_family: dict[str, FamilyUsage] = {}
     for fam, chars in sorted(by_family_chars.items()):
         info = VOICE_FAMILIES.get(fam, {"rate_per_million": 0, "free_chars": 0})
@@ -133,7 +849,25 @@ def create_usage_snapshot(log_path: Path, *, chars_this_request: int, voice: str
 
     return UsageSnapshot(
         chars_this_request=chars_this_request,
-        voice_family=family,
+        voice_family=detect_family(voice),
         month_key=month_key,
         month_to_date_by_family=by_family,
     )
+
+
+def usage_snapshot(store: UsageStore, *, chars_this_request: int, voice: str, now_utc: datetime) -> UsageSnapshot:
+    month_key = now_utc.strftime("%Y-%m")
+    return _snapshot(
+        store.month_chars_by_family(month_key), chars_this_request=chars_this_request, voice=voice, month_key=month_key
+    )
+
+
+def create_usage_snapshot(log_path: Path, *, chars_this_request: int, voice: str, now_utc: datetime) -> UsageSnapshot:
+    """Snapshot from a single CSV log file, such as one monthly partition."""
+    month_key = now_utc.strftime("%Y-%m")
+    return _snapshot(
+        usage_totals(log_path).get(month_key, {}),
+        chars_this_request=chars_this_request,
+        voice=voice,
+        month_key=month_key,
+    )
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from typing import TYPE_CHECKING
 
-from google.cloud import texttospeech
+if TYPE_CHECKING:
+    from google.cloud import texttospeech
 
 
 @dataclass
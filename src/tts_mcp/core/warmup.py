@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import threading
+import time
+from collections.abc import Callable, Iterator
+from typing import Any
+
+from tts_mcp.core.retry import Retrier
+from tts_mcp.core.synth import SynthesisRequest, SynthesisResult, synthesize_to_file, synthesize_to_file_async
+
+WARMUP_MODES = ("off", "connect", "synthesize")
+WARMUP_TEXT = "Ready."
+
+
+class ClientWarmup:
+    """Open the synthesis clients' connections before the first request needs them.
+
+    "connect" sends a list_voices call filtered to the profile's language, which resolves
+    DNS, completes the TLS handshake and fetches the OAuth token. "synthesize" then also
+    synthesizes WARMUP_TEXT with the profile's voice, bypassing the cache, so the first
+    real request sees steady-state latency; those characters are billed, and on_result
+    receives the result so the caller can log them. Pass the retrier real requests use so
+    the warm-up synthesis gets the same deadline and retries and counts against the same
+    rate limit.
+
+    Warm whichever client will serve requests: start() warms a blocking client from a
+    thread, run_async() an asyncio client on its own event loop. Each step's state,
+    duration and error are kept for tts_doctor. A failed step is only recorded: the first
+    real request then connects as it would have without warm-up.
+    """
+
+    def __init__(self, mode: str, language: str, *, retrier: Retrier | None = None) -> None:
+        if mode not in WARMUP_MODES:
+            raise ValueError(f"warmup must be one of: {', '.join(WARMUP_MODES)}")
+        self.mode = mode
+        self.language = language
+        self.retrier = retrier
+        self._lock = threading.Lock()
+        self._steps: dict[str, dict[str, Any]] = {}
+
+    def start(
+        self,
+        client: Any,
+        request: SynthesisRequest | None = None,
+        on_result: Callable[[SynthesisResult], None] | None = None,
+    ) -> threading.Thread | None:
+        """Warm the blocking client from a daemon thread; returns None when warm-up is off."""
+        if self.mode == "off":
+            return None
+        thread = threading.Thread(
+            target=self._run,
+            args=(client, request, on_result),
+            name="tts-warmup",
+            daemon=True,
+        )
+        thread.start()
+        return thread
+
+    async def run_async(
+        self,
+        client: Any,
+        request: SynthesisRequest | None = None,
+        on_result: Callable[[SynthesisResult], None] | None = None,
+    ) -> None:
+        """Warm an asyncio client; call it from the event loop that will use the client."""
+        if self.mode == "off":
+            return
+        with self._step("connect"):
+            await client.list_voices(language_code=self.language)
+        if self.mode == "synthesize" and request is not None:
+            with self._step("synthesize"):
+                result = await synthesize_to_file_async(client, request, retrier=self.retrier)
+                if on_result is not None:
+                    on_result(result)
+
+    def as_dict(self) -> dict[str, Any]:
+        with self._lock:
+            return {"mode": self.mode, **{name: dict(step) for name, step in self._steps.items()}}
+
+    def _run(
+        self,
+        client: Any,
+        request: SynthesisRequest | None,
+        on_result: Callable[[SynthesisResult], None] | None,
+    ) -> None:
+        with self._step("connect"):
+            client.list_voices(language_code=self.language)
+        if self.mode == "synthesize" and request is not None:
+            with self._step("synthesize"):
+                result = synthesize_to_file(client, request, retrier=self.retrier)
+                if on_result is not None:
+                    on_result(result)
+
+    @contextlib.contextmanager
+    def _step(self, name: str) -> Iterator[None]:
+        with self._lock:
+            self._steps[name] = {"state": "running"}
+        start = time.perf_counter()
+        state: dict[str, Any] = {"state": "done"}
+        try:
+            yield
+        except Exception as exc:  # noqa: BLE001
+            state = {"state": "failed", "error": str(exc)}
+        state["ms"] = round((time.perf_counter() - start) * 1000, 1)
+        with self._lock:
+            self._steps[name] = state
+
+
+class Heartbeat:
+    """Keep a client's connection warm with a list_voices call once it has sat idle for interval_s.
+
+    Keepalive pings only hold the TCP connection open; a heartbeat call also keeps the
+    channel out of gRPC's idle state and the access token fresh. Requests call touch(),
+    so a busy server sends no heartbeats. list_voices is not billed.
+    """
+
+    def __init__(self, interval_s: float, language: str) -> None:
+        self.interval_s = interval_s
+        self.language = language
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._last_activity = time.monotonic()
+        self._beats = 0
+        self._last_ms: float | None = None
+        self._last_error = ""
+
+    def touch(self) -> None:
+        with self._lock:
+            self._last_activity = time.monotonic()
+
+    def start(self, client: Any) -> threading.Thread | None:
+        """Send heartbeats on the blocking client from a daemon thread; returns None when off."""
+        if not self.interval_s:
+            return None
+        thread = threading.Thread(target=self._run, args=(client,), name="tts-heartbeat", daemon=True)
+        thread.start()
+        return thread
+
+    async def run_async(self, client: Any) -> None:
+        """Send heartbeats on an asyncio client until stopped or cancelled."""
+        if not self.interval_s:
+            return
+        while not self._stop.is_set():
+            await asyncio.sleep(self._until_due())
+            if self._until_due() > 0:
+                continue
+            start = time.perf_counter()
+            try:
+                await client.list_voices(language_code=self.language)
+            except Exception as exc:  # noqa: BLE001
+                self._record(start, str(exc))
+            else:
+                self._record(start, "")
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def as_dict(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "interval_s": self.interval_s,
+                "beats": self._beats,
+                "last_ms": self._last_ms,
+                "last_error": self._last_error,
+            }
+
+    def _run(self, client: Any) -> None:
+        while not self._stop.wait(self._until_due()):
+            if self._until_due() > 0:
+                continue
+            start = time.perf_counter()
+            try:
+                client.list_voices(language_code=self.language)
+            except Exception as exc:  # noqa: BLE001
+                self._record(start, str(exc))
+            else:
+                self._record(start, "")
+
+    def _until_due(self) -> float:
+        with self._lock:
+            return max(0.0, self._last_activity + self.interval_s - time.monotonic())
+
+    def _record(self, start: float, error: str) -> None:
+        with self._lock:
+            self._last_activity = time.monotonic()
+            self._beats += 1
+            self._last_ms = round((time.perf_counter() - start) * 1000, 1)
+            self._last_error = error
@@ -3,29 +3,50 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
+import atexit
+import contextlib
 import importlib.resources
 import json
 import os
 import shutil
+from collections.abc import AsyncIterator, Awaitable
 from datetime import UTC, datetime
 from pathlib import Path
-from typing import Any
-
-from fastmcp import FastMCP
-from fastmcp.utilities.logging import configure_logging
-
-from tts_mcp.core.auth import create_tts_client
+from typing import TYPE_CHECKING, Any
+
+from tts_mcp.core.auth import create_tts_async_client, create_tts_client
+from tts_mcp.core.cache import open_cache
+from tts_mcp.core.diagnostics import PROFILE_CALLS_ENV, CallProfiler, ProfileRun, diagnostics_dir
+from tts_mcp.core.jobs import Job, JobQueue
+from tts_mcp.core.metrics import METRICS, error_status, start_metrics_server
+from tts_mcp.core.playback import PlaybackQueue, PlaybackStream
 from tts_mcp.core.profile import (
     TTSProfile,
     default_config_dir,
+    default_rate_limit_file,
     load_profile,
-    play_audio,
     resolve_profile_path,
     stop_audio,
 )
-from tts_mcp.core.synth import SynthesisRequest, read_text_input, synthesize_to_file, timestamped_output_path
-from tts_mcp.core.usage import append_usage_row, create_usage_snapshot
+from tts_mcp.core.ratelimit import RateLimiter
+from tts_mcp.core.retry import Retrier, RetryPolicy
+from tts_mcp.core.synth import (
+    SynthesisRequest,
+    SynthesisResult,
+    read_text_input,
+    synthesize_progressively,
+    synthesize_streaming_to_file,
+    synthesize_to_file_async,
+    timestamped_output_path,
+)
+from tts_mcp.core.timing import StageTimer
+from tts_mcp.core.usage import BufferedUsageStore, UsageRow, open_usage_store, usage_snapshot
 from tts_mcp.core.voices import list_voices
+from tts_mcp.core.warmup import WARMUP_TEXT, ClientWarmup, Heartbeat
+
+if TYPE_CHECKING:
+    from fastmcp import FastMCP
 
 PROFILES_ENV = "TTS_MCP_PROFILES_PATH"
 PROFILE_NAME_ENV = "TTS_MCP_PROFILE_NAME"
@@ -90,7 +111,7 @@ def parse_args() -> argparse.Namespace:
 def load_runtime(profile_file: str, profile_name: str) -> tuple[TTSProfile, Any]:
     path = resolve_profile_path(profile_file or None)
     profile = load_profile(path, profile_name)
-    client = create_tts_client()
+    client = create_tts_client(keepalive_ms=profile.keepalive_ms, idle_timeout_ms=profile.idle_timeout_ms)
     return profile, client
 
 
@@ -146,6 +167,33 @@ def doctor_report(profile_file: str, profile_name: str) -> dict[str, Any]:
             "usage_log": str(profile.usage_log),
             "autoplay": profile.autoplay,
             "player_command": profile.player_command,
+            "cache_dir": str(profile.cache_dir) if profile.cache_dir else "",
+            "cache_max_mb": profile.cache_max_mb,
+            "chunk_max_bytes": profile.chunk_max_bytes,
+            "chunk_workers": profile.chunk_workers,
+            "progressive_playback": profile.progressive_playback,
+            "backend": profile.backend,
+            "max_in_flight": profile.max_in_flight,
+            "job_workers": profile.job_workers,
+            "playback_queue_depth": profile.playback_queue_depth,
+            "player_mode": profile.player_mode,
+            "usage_backend": profile.usage_backend,
+            "usage_flush_rows": profile.usage_flush_rows,
+            "usage_flush_ms": profile.usage_flush_ms,
+            "metrics_file": str(profile.metrics_file) if profile.metrics_file else "",
+            "metrics_port": profile.metrics_port,
+            "warmup": profile.warmup,
+            "keepalive_ms": profile.keepalive_ms,
+            "idle_timeout_ms": profile.idle_timeout_ms,
+            "heartbeat_s": profile.heartbeat_s,
+            "request_timeout_s": profile.request_timeout_s,
+            "max_retries": profile.max_retries,
+            "retry_backoff_ms": profile.retry_backoff_ms,
+            "hedge_percentile": profile.hedge_percentile,
+            "rate_limit_requests_per_min": profile.rate_limit_requests_per_min,
+            "rate_limit_chars_per_min": profile.rate_limit_chars_per_min,
+            "rate_limit_max_wait_s": profile.rate_limit_max_wait_s,
+            "rate_limit_file": str(profile.rate_limit_file) if profile.rate_limit_file else "",
         }
 
         voices = list_voices(client, language=profile.language, family="", limit=0)
@@ -170,8 +218,77 @@ def doctor_report(profile_file: str, profile_name: str) -> dict[str, Any]:
     return report
 
 
+def _profile_calls_from_env() -> int:
+    value = os.getenv(PROFILE_CALLS_ENV, "").strip()
+    try:
+        return max(0, int(value)) if value else 0
+    except ValueError:
+        return 0
+
+
+def configure_logging(level: str) -> None:
+    # fastmcp takes most of a second to import, so --init, --doctor and --help never load it.
+    from fastmcp.utilities.logging import configure_logging as _configure_logging
+
+    _configure_logging(level=level)
+
+
 def create_server(profile_file: str, profile_name: str) -> FastMCP:
+    from fastmcp import FastMCP
+
     profile, client = load_runtime(profile_file, profile_name)
+    cache = open_cache(profile.cache_dir, profile.cache_max_mb)
+    async_client: Any = None
+    # Unary requests without progressive playback go through the asyncio client, the rest through `client`.
+    uses_async_client = profile.backend == "unary" and not (profile.autoplay and profile.progressive_playback)
+    heartbeat = Heartbeat(profile.heartbeat_s, profile.language)
+    limiter = RateLimiter(
+        profile.rate_limit_file or default_rate_limit_file(),
+        requests_per_min=profile.rate_limit_requests_per_min,
+        chars_per_min=profile.rate_limit_chars_per_min,
+        max_wait_s=profile.rate_limit_max_wait_s,
+    )
+    retrier = Retrier(
+        RetryPolicy(
+            timeout_s=profile.request_timeout_s,
+            max_retries=profile.max_retries,
+            backoff_ms=profile.retry_backoff_ms,
+            hedge_percentile=profile.hedge_percentile,
+        ),
+        limiter=limiter,
+    )
+    warmup = ClientWarmup(profile.warmup, profile.language, retrier=retrier)
+    warmup_request = SynthesisRequest(
+        text=WARMUP_TEXT,
+        ssml=False,
+        voice=profile.voice,
+        language=profile.language,
+        model=profile.model,
+        audio_format=profile.audio_format,
+        speaking_rate=profile.speaking_rate,
+        pitch=profile.pitch,
+        # The audio is only synthesized to warm up the voice, then discarded.
+        output_file=Path(os.devnull),
+    )
+
+    def _create_async_client() -> Any:
+        return create_tts_async_client(keepalive_ms=profile.keepalive_ms, idle_timeout_ms=profile.idle_timeout_ms)
+
+    @contextlib.asynccontextmanager
+    async def _lifespan(_server: FastMCP) -> AsyncIterator[dict[str, Any]]:
+        # The asyncio client must be created in the event loop that uses it, so it is warmed here.
+        nonlocal async_client
+        tasks = []
+        if uses_async_client and (profile.warmup != "off" or profile.heartbeat_s):
+            async_client = _create_async_client()
+            tasks.append(asyncio.create_task(warmup.run_async(async_client, warmup_request, _log_warmup)))
+            tasks.append(asyncio.create_task(heartbeat.run_async(async_client)))
+        try:
+            yield {}
+        finally:
+            heartbeat.stop()
+            for task in tasks:
+                task.cancel()
 
     mcp = FastMCP(
         name=f"GoogleTTS-{profile.name}",
@@ -179,115 +296,350 @@ def create_server(profile_file: str, profile_name: str) -> FastMCP:
             "Text-to-speech server with fixed profile settings. "
             "Use tts_speak for generating and auto-playing local audio."
         ),
+        lifespan=_lifespan,
     )
 
+    in_flight = asyncio.Semaphore(profile.max_in_flight)
+    jobs = JobQueue(workers=profile.job_workers)
+    playback = PlaybackQueue(profile, max_depth=profile.playback_queue_depth)
+    atexit.register(playback.close)
+    usage_store = BufferedUsageStore(
+        open_usage_store(profile.usage_log, profile.usage_backend),
+        flush_rows=profile.usage_flush_rows,
+        flush_ms=profile.usage_flush_ms,
+    )
+    atexit.register(usage_store.close)
+    metrics_labels = {"profile": profile.name}
+    metrics_port_error = ""
+    if profile.metrics_port:
+        try:
+            start_metrics_server(METRICS, profile.metrics_port, metrics_labels)
+        except OSError as exc:
+            # Usually another server for the same profile already holds the port; the tools still work without it.
+            metrics_port_error = f"Metrics port {profile.metrics_port} unavailable: {exc}"
+
+    def _export_metrics() -> None:
+        if profile.metrics_file is None:
+            return
+        with contextlib.suppress(OSError):
+            METRICS.write_prometheus(profile.metrics_file, metrics_labels)
+
+    _export_metrics()
+
+    def _log_warmup(result: SynthesisResult) -> None:
+        usage_store.append(
+            UsageRow(
+                timestamp_utc=datetime.now(UTC),
+                chars=result.chars,
+                voice=result.voice,
+                language=result.language,
+                audio_format=result.audio_format,
+                output_file=result.output_file,
+                api_ms=result.api_ms,
+                write_ms=result.write_ms,
+                audio_bytes=result.bytes_written,
+                profile=profile.name,
+            )
+        )
+
+    if not uses_async_client:
+        # Otherwise requests go through the asyncio client, which the lifespan warms instead.
+        warmup.start(client, warmup_request, on_result=_log_warmup)
+        heartbeat.start(client)
+    profiler = CallProfiler(
+        diagnostics_dir(profile.output_dir),
+        calls=_profile_calls_from_env(),
+        prefix=profile.name,
+    )
+
+    async def _synthesize(request: SynthesisRequest, stream: PlaybackStream | None) -> SynthesisResult:
+        nonlocal async_client
+        on_chunk = stream.add if stream is not None else None
+        heartbeat.touch()
+        async with in_flight:
+            if profile.backend == "streaming":
+                return await asyncio.to_thread(
+                    synthesize_streaming_to_file,
+                    client,
+                    request,
+                    on_chunk=on_chunk,
+                    cache=cache,
+                    max_chunk_bytes=profile.chunk_max_bytes,
+                    retrier=retrier,
+                )
+            if on_chunk is not None:
+                return await asyncio.to_thread(
+                    synthesize_progressively,
+                    client,
+                    request,
+                    on_chunk=on_chunk,
+                    cache=cache,
+                    max_chunk_bytes=profile.chunk_max_bytes,
+                    max_workers=profile.chunk_workers,
+                    retrier=retrier,
+                )
+            if async_client is None:
+                async_client = _create_async_client()
+            return await synthesize_to_file_async(
+                async_client,
+                request,
+                cache=cache,
+                max_chunk_bytes=profile.chunk_max_bytes,
+                max_workers=profile.chunk_workers,
+                retrier=retrier,
+            )
+
+    async def _profiled(run: ProfileRun | None, work: Awaitable[dict[str, Any]]) -> dict[str, Any]:
+        if run is None:
+            return await work
+        with run:
+            response = await work
+        response["diagnostics"] = run.paths()
+        return response
+
+    async def _speak(
+        request: SynthesisRequest,
+        *,
+        urgent: bool = False,
+        job: Job | None = None,
+        timer: StageTimer,
+        include_timings: bool = False,
+    ) -> dict[str, Any]:
+        if job is not None:
+            job.state = "synthesizing"
+        played = False
+        playback_error = ""
+        stream = None
+        if profile.autoplay and (profile.progressive_playback or profile.backend == "streaming"):
+            try:
+                stream = playback.stream(profile.audio_format, urgent=urgent)
+            except Exception as exc:  # noqa: BLE001
+                playback_error = str(exc)
+
+        try:
+            with timer.stage("synthesize"):
+                result = await _synthesize(request, stream)
+        except Exception as exc:
+            METRICS.inc("tts_errors_total", status=error_status(exc))
+            _export_metrics()
+            if stream is not None:
+                stream.cancel()
+            raise
+        METRICS.inc("tts_requests_total")
+        METRICS.inc("tts_chars_total", result.chars)
+        METRICS.inc("tts_audio_bytes_total", result.bytes_written)
+        if result.cache_hit:
+            METRICS.inc("tts_cache_hits_total")
+        else:
+            METRICS.inc("tts_cache_misses_total")
+            METRICS.observe("tts_api_latency_ms", result.api_ms)
+        timer.add("api", result.api_ms)
+        timer.add("write", result.write_ms)
+        if stream is not None:
+            stream.close()
+            played = True
+
+        now = datetime.now(UTC)
+        with timer.stage("usage_log"):
+            usage_store.append(
+                UsageRow(
+                    timestamp_utc=now,
+                    chars=result.chars,
+                    voice=result.voice,
+                    language=result.language,
+                    audio_format=result.audio_format,
+                    output_file=result.output_file,
+                    api_ms=result.api_ms,
+                    write_ms=result.write_ms,
+                    audio_bytes=result.bytes_written,
+                    profile=profile.name,
+                    cache_hit=result.cache_hit,
+                )
+            )
+        billed_chars = 0 if result.cache_hit else result.chars
+        with timer.stage("usage_snapshot"):
+            usage = usage_snapshot(usage_store, chars_this_request=billed_chars, voice=result.voice, now_utc=now)
+
+        if job is not None:
+            job.state = "playing"
+        if profile.autoplay and stream is None and not playback_error:
+            try:
+                with timer.stage("playback"):
+                    playback.enqueue_file(result.output_file, urgent=urgent)
+                played = True
+            except Exception as exc:  # noqa: BLE001
+                playback_error = str(exc)
+
+        response: dict[str, Any] = {
+            "ok": True,
+            "output_file": str(result.output_file),
+            "mime_type": result.mime_type,
+            "bytes": result.bytes_written,
+            "chars": result.chars,
+            "played": played,
+            "cache_hit": result.cache_hit,
+            "profile": {
+                "name": profile.name,
+                "voice": profile.voice,
+                "language": profile.language,
+                "model": profile.model,
+                "format": profile.audio_format,
+                "speaking_rate": request.speaking_rate,
+                "pitch": request.pitch,
+            },
+            "usage": {
+                "chars_this_request": usage.chars_this_request,
+                "voice_family": usage.voice_family,
+                "month_key": usage.month_key,
+                "month_to_date_by_family": {
+                    fam: {
+                        "chars": fu.chars,
+                        "free_tier": fu.free_tier,
+                        "billable_chars": fu.billable_chars,
+                        "estimated_cost_usd": fu.estimated_cost_usd,
+                    }
+                    for fam, fu in usage.month_to_date_by_family.items()
+                },
+            },
+        }
+        if playback_error:
+            response["playback_error"] = playback_error
+        timings = timer.as_dict()
+        METRICS.observe("tts_request_latency_ms", timings["total"])
+        _export_metrics()
+        if include_timings:
+            response["timings"] = timings
+        return response
+
     @mcp.tool
-    def tts_speak(
+    async def tts_speak(
         text: str = "",
         text_file: str = "",
         speaking_rate: float = profile.speaking_rate,
         pitch: float = profile.pitch,
+        background: bool = False,
+        urgent: bool = False,
+        timings: bool = False,
     ) -> dict[str, Any]:
-        """Generate speech with fixed voice/model/language/format and adjustable speaking rate and pitch."""
+        """Generate speech with fixed voice/model/language/format and adjustable speaking rate and pitch.
+
+        With background=true, return a job_id immediately and poll tts_status for the result.
+        With urgent=true, play ahead of anything already waiting in the playback queue.
+        With timings=true, add the milliseconds spent in each stage of the request.
+        """
+        timer = StageTimer()
+        run = profiler.claim("tts_speak")
         try:
-            resolved_text = read_text_input(text=text, text_file=text_file)
+            with timer.stage("read_text"):
+                resolved_text = read_text_input(text=text, text_file=text_file)
             output_file = timestamped_output_path(
                 audio_format=profile.audio_format,
                 output_dir=profile.output_dir,
                 prefix=f"{profile.name}-tts",
             )
 
-            result = synthesize_to_file(
-                client,
-                SynthesisRequest(
-                    text=resolved_text,
-                    ssml=False,
-                    voice=profile.voice,
-                    language=profile.language,
-                    model=profile.model,
-                    audio_format=profile.audio_format,
-                    speaking_rate=speaking_rate,
-                    pitch=pitch,
-                    output_file=output_file,
-                ),
-            )
-
-            now = datetime.now(UTC)
-            append_usage_row(
-                profile.usage_log,
-                timestamp_utc=now,
-                chars=result.chars,
-                voice=result.voice,
-                language=result.language,
-                audio_format=result.audio_format,
-                output_file=result.output_file,
-            )
-            usage = create_usage_snapshot(
-                profile.usage_log, chars_this_request=result.chars, voice=result.voice, now_utc=now
+            synthesis_request = SynthesisRequest(
+                text=resolved_text,
+                ssml=False,
+                voice=profile.voice,
+                language=profile.language,
+                model=profile.model,
+                audio_format=profile.audio_format,
+                speaking_rate=speaking_rate,
+                pitch=pitch,
+                output_file=output_file,
             )
 
-            played = False
-            playback_error = ""
-            try:
-                played = play_audio(profile, result.output_file)
-            except Exception as exc:  # noqa: BLE001
-                playback_error = str(exc)
-
-            response: dict[str, Any] = {
-                "ok": True,
-                "output_file": str(result.output_file),
-                "mime_type": result.mime_type,
-                "bytes": result.bytes_written,
-                "chars": result.chars,
-                "played": played,
-                "profile": {
-                    "name": profile.name,
-                    "voice": profile.voice,
-                    "language": profile.language,
-                    "model": profile.model,
-                    "format": profile.audio_format,
-                    "speaking_rate": speaking_rate,
-                    "pitch": pitch,
-                },
-                "usage": {
-                    "chars_this_request": usage.chars_this_request,
-                    "voice_family": usage.voice_family,
-                    "month_key": usage.month_key,
-                    "month_to_date_by_family": {
-                        fam: {
-                            "chars": fu.chars,
-                            "free_tier": fu.free_tier,
-                            "billable_chars": fu.billable_chars,
-                            "estimated_cost_usd": fu.estimated_cost_usd,
-                        }
-                        for fam, fu in usage.month_to_date_by_family.items()
-                    },
-                },
-            }
-            if playback_error:
-                response["playback_error"] = playback_error
-            return response
+            if background:
+                job = jobs.submit(
+                    lambda job: _profiled(
+                        run,
+                        _speak(synthesis_request, urgent=urgent, job=job, timer=timer, include_timings=timings),
+                    )
+                )
+                response = {"ok": True, "job_id": job.id, "state": job.state, "output_file": str(output_file)}
+                if run is not None:
+                    response["diagnostics"] = run.paths()
+                return response
+            return await _profiled(run, _speak(synthesis_request, urgent=urgent, timer=timer, include_timings=timings))
         except Exception as exc:  # noqa: BLE001
-            return {
+            response = {
                 "ok": False,
                 "error": str(exc),
             }
+            if run is not None:
+                run.release()
+                if run.started:
+                    response["diagnostics"] = run.paths()
+            return response
+
+    @mcp.tool
+    def tts_status(job_id: str) -> dict[str, Any]:
+        """Report the state of a background tts_speak job and, once done, its result."""
+        job = jobs.get(job_id)
+        if job is None:
+            return {"ok": False, "error": f"Unknown or expired job_id: {job_id}"}
+        response: dict[str, Any] = {"ok": True, "job_id": job.id, "state": job.state}
+        if job.result is not None:
+            response["result"] = job.result
+        if job.error:
+            response["error"] = job.error
+        return response
 
     @mcp.tool
-    def tts_doctor() -> dict[str, Any]:
-        """Return auth/profile/playback diagnostics for the active TTS profile."""
-        return doctor_report(profile_file, profile.name)
+    def tts_metrics() -> dict[str, Any]:
+        """Report this server's request, latency, cache and error metrics since it started."""
+        result = {"ok": True, "profile": profile.name, **METRICS.snapshot()}
+        if metrics_port_error:
+            result["metrics_port_error"] = metrics_port_error
+        return result
+
+    @mcp.tool
+    def tts_doctor(profile_calls: int = 0) -> dict[str, Any]:
+        """Return auth/profile/playback diagnostics for the active TTS profile.
+
+        With profile_calls=N, run the next N tts_speak/tts_doctor calls under cProfile and
+        tracemalloc; each profiled call lists its report files under diagnostics.
+        """
+        if profile_calls < 0:
+            return {"ok": False, "error": "profile_calls must be 0 or greater"}
+        run = None
+        if profile_calls:
+            profiler.arm(profile_calls)
+        else:
+            run = profiler.claim("tts_doctor")
+        if run is None:
+            report = doctor_report(profile_file, profile.name)
+        else:
+            with run:
+                report = doctor_report(profile_file, profile.name)
+            report["diagnostics"] = run.paths()
+        if profile_calls or run is not None or profiler.remaining:
+            report["profiling"] = {"remaining_calls": profiler.remaining, "directory": str(profiler.directory)}
+        if warmup.mode != "off":
+            report["warmup"] = warmup.as_dict()
+        if heartbeat.interval_s:
+            report["heartbeat"] = heartbeat.as_dict()
+        if profile.hedge_percentile:
+            report["hedging"] = retrier.hedge_state()
+        if limiter.enabled:
+            report["rate_limit"] = limiter.state()
+        if metrics_port_error:
+            report.setdefault("notes", []).append(metrics_port_error)
+        return report
 
     @mcp.tool
     def tts_stop() -> dict[str, Any]:
-        """Stop currently playing audio started by the configured player."""
+        """Stop currently playing audio and clear everything waiting in the playback queue."""
         try:
+            cleared = playback.clear()
             result = stop_audio(profile)
             return {
                 "ok": True,
                 "attempted": result.attempted,
                 "player": result.player,
                 "stopped_processes": result.stopped_processes,
+                "cleared_items": cleared,
             }
         except Exception as exc:  # noqa: BLE001
             return {
@@ -299,7 +651,6 @@ def create_server(profile_file: str, profile_name: str) -> FastMCP:
 
 
 def main() -> None:
-    configure_logging(level="ERROR")
     args = parse_args()
 
     if args.init:
@@ -316,6 +667,7 @@ def main() -> None:
         print(json.dumps(doctor_report(args.profiles, args.profile), indent=2))
         return
 
+    configure_logging(level="ERROR")
     server = create_server(args.profiles, args.profile)
     server.run(show_banner=False)
 
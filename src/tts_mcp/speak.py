@@ -8,8 +8,20 @@ from datetime import UTC, datetime
 from pathlib import Path
 
 from tts_mcp.core.auth import create_tts_client
-from tts_mcp.core.synth import AUDIO_ENCODINGS, SynthesisRequest, read_text_input, synthesize_to_file
-from tts_mcp.core.usage import append_usage_row, create_usage_snapshot
+from tts_mcp.core.cache import open_cache
+from tts_mcp.core.profile import DEFAULT_CACHE_MAX_MB, default_cache_dir, default_rate_limit_file
+from tts_mcp.core.ratelimit import DEFAULT_RATE_LIMIT_WAIT_S, RateLimiter, RateLimitError
+from tts_mcp.core.retry import Retrier
+from tts_mcp.core.synth import (
+    AUDIO_ENCODINGS,
+    DEFAULT_CHUNK_BYTES,
+    DEFAULT_CHUNK_WORKERS,
+    SynthesisRequest,
+    read_text_input,
+    synthesize_to_file,
+)
+from tts_mcp.core.timing import StageTimer, format_timings
+from tts_mcp.core.usage import CsvUsageStore, UsageRow, usage_snapshot
 
 
 def parse_args() -> argparse.Namespace:
@@ -34,7 +46,50 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         "--usage-log",
         default="usage_log.csv",
-        help="CSV log path for character usage tracking.",
+        help="CSV log path for character usage tracking; rows go to monthly partitions next to it.",
+    )
+    parser.add_argument("--cache-dir", default=str(default_cache_dir()), help="Directory for cached audio.")
+    parser.add_argument(
+        "--cache-max-mb",
+        type=int,
+        default=DEFAULT_CACHE_MAX_MB,
+        help="Size cap for the audio cache in megabytes (0 disables caching).",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Always call the API, bypassing the audio cache.")
+    parser.add_argument(
+        "--chunk-bytes",
+        type=int,
+        default=DEFAULT_CHUNK_BYTES,
+        help="Split plain text longer than this many UTF-8 bytes into chunks synthesized in parallel (0 disables).",
+    )
+    parser.add_argument(
+        "--chunk-workers",
+        type=int,
+        default=DEFAULT_CHUNK_WORKERS,
+        help="Maximum number of chunks synthesized concurrently.",
+    )
+    parser.add_argument(
+        "--requests-per-min", type=int, default=0, help="Client-side limit on API requests per minute (0 is unlimited)."
+    )
+    parser.add_argument(
+        "--chars-per-min", type=int, default=0, help="Client-side limit on characters sent per minute (0 is unlimited)."
+    )
+    parser.add_argument(
+        "--rate-limit-file",
+        default=str(default_rate_limit_file()),
+        help="Rate limiter state file, shared with tts-mcp servers and tts-batch runs using the same file.",
+    )
+    parser.add_argument(
+        "--rate-limit-wait",
+        type=float,
+        default=DEFAULT_RATE_LIMIT_WAIT_S,
+        help="Longest a request waits for the rate limiter before failing, in seconds.",
+    )
+    parser.add_argument(
+        "--verbose",
+        "-v",
+        action="store_true",
+        help="Also print the milliseconds spent in each stage of the request.",
     )
     return parser.parse_args()
 
@@ -57,9 +112,11 @@ def main() -> None:
     args = parse_args()
     if not args.text and not args.text_file:
         args.text = _read_text_fallback()
+    timer = StageTimer()
 
     try:
-        text = read_text_input(text=args.text or "", text_file=args.text_file)
+        with timer.stage("read_text"):
+            text = read_text_input(text=args.text or "", text_file=args.text_file)
     except ValueError as exc:
         raise SystemExit(str(exc)) from exc
 
@@ -67,7 +124,8 @@ def main() -> None:
         raise SystemExit("No input text provided.")
 
     try:
-        client = create_tts_client()
+        with timer.stage("client"):
+            client = create_tts_client()
     except RuntimeError as exc:
         raise SystemExit(str(exc)) from exc
 
@@ -83,27 +141,55 @@ def main() -> None:
         output_file=_resolve_output_path(args),
     )
 
+    cache = None if args.no_cache else open_cache(Path(args.cache_dir).expanduser().resolve(), args.cache_max_mb)
+    limiter = RateLimiter(
+        Path(args.rate_limit_file).expanduser().resolve(),
+        requests_per_min=args.requests_per_min,
+        chars_per_min=args.chars_per_min,
+        max_wait_s=args.rate_limit_wait,
+    )
+
     try:
-        result = synthesize_to_file(client, request)
-    except ValueError as exc:
+        with timer.stage("synthesize"):
+            result = synthesize_to_file(
+                client,
+                request,
+                cache=cache,
+                max_chunk_bytes=args.chunk_bytes,
+                max_workers=args.chunk_workers,
+                retrier=Retrier(limiter=limiter),
+            )
+    except (ValueError, RateLimitError) as exc:
         raise SystemExit(str(exc)) from exc
+    timer.add("api", result.api_ms)
+    timer.add("write", result.write_ms)
 
     now = datetime.now(UTC)
-    usage_log = Path(args.usage_log).expanduser().resolve()
-
-    append_usage_row(
-        usage_log,
-        timestamp_utc=now,
-        chars=result.chars,
-        voice=result.voice,
-        language=result.language,
-        audio_format=result.audio_format,
-        output_file=result.output_file,
-    )
-
-    snapshot = create_usage_snapshot(usage_log, chars_this_request=result.chars, voice=result.voice, now_utc=now)
+    usage_store = CsvUsageStore(Path(args.usage_log).expanduser().resolve())
+
+    with timer.stage("usage_log"):
+        usage_store.append(
+            UsageRow(
+                timestamp_utc=now,
+                chars=result.chars,
+                voice=result.voice,
+                language=result.language,
+                audio_format=result.audio_format,
+                output_file=result.output_file,
+                api_ms=result.api_ms,
+                write_ms=result.write_ms,
+                audio_bytes=result.bytes_written,
+                cache_hit=result.cache_hit,
+            )
+        )
+
+    billed_chars = 0 if result.cache_hit else result.chars
+    with timer.stage("usage_snapshot"):
+        snapshot = usage_snapshot(usage_store, chars_this_request=billed_chars, voice=result.voice, now_utc=now)
 
     print(f"Wrote audio: {result.output_file}")
+    if result.cache_hit:
+        print("Served from cache (no API call).")
     print(f"Characters this request: {result.chars}")
     print(f"Voice: {result.voice}")
     if result.model:
@@ -114,6 +200,8 @@ def main() -> None:
         print(f"Month-to-date ({fam}): {family_usage.chars:,} chars (free tier: {family_usage.free_tier:,})")
     if args.ssml:
         print("Note: SSML billing can differ slightly from plain character counting.")
+    if args.verbose:
+        print(f"Timings: {format_timings(timer.as_dict())}")
 
 
 if __name__ == "__main__":
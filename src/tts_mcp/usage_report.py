@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from collections import Counter
+from dataclasses import asdict
+from pathlib import Path
+
+from tts_mcp.core.profile import load_profile, resolve_profile_path
+from tts_mcp.core.report import (
+    REPORT_GROUPS,
+    DayAggregator,
+    DayLatency,
+    ReportRow,
+    percentile,
+    summarize,
+    usage_log_files,
+)
+from tts_mcp.core.usage import usage_db_path
+
+PROFILES_ENV = "TTS_MCP_PROFILES_PATH"
+PROFILE_NAME_ENV = "TTS_MCP_PROFILE_NAME"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Report Google TTS character usage and estimated cost",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument(
+        "--usage-log",
+        default="",
+        help="Usage log to read (CSV, or a .sqlite3 database). Defaults to the selected profile's usage_log.",
+    )
+    parser.add_argument(
+        "--profiles",
+        default=os.getenv(PROFILES_ENV, ""),
+        help="Path to TTS profile JSON file, used when --usage-log is not given.",
+    )
+    parser.add_argument(
+        "--profile",
+        default=os.getenv(PROFILE_NAME_ENV, ""),
+        help="Profile name whose usage_log to read. Falls back to default_profile in JSON.",
+    )
+    parser.add_argument("--by", choices=REPORT_GROUPS, default="month", help="How to group the report")
+    parser.add_argument("--month", default="", help="Only report this month, as YYYY-MM")
+    parser.add_argument("--format", choices=("table", "json"), default="table", help="Output format")
+    parser.add_argument(
+        "--latency",
+        action="store_true",
+        help="Add p50/p95/p99 synthesis API latency columns, from rows not yet rolled up",
+    )
+    return parser.parse_args()
+
+
+def _aggregate(args: argparse.Namespace) -> DayAggregator:
+    aggregator = DayAggregator(latency=args.latency)
+    if args.usage_log:
+        log_path = Path(args.usage_log).expanduser().resolve()
+        sqlite = log_path.suffix == ".sqlite3"
+    else:
+        profile = load_profile(resolve_profile_path(args.profiles or None), args.profile)
+        sqlite = profile.usage_backend == "sqlite"
+        log_path = usage_db_path(profile.usage_log) if sqlite else profile.usage_log
+    if sqlite:
+        if log_path.exists():
+            aggregator.add_sqlite(log_path)
+        return aggregator
+    for path in usage_log_files(log_path):
+        aggregator.add_csv(path)
+    return aggregator
+
+
+def _total(rows: list[ReportRow], latency: DayLatency | None = None, month: str = "") -> ReportRow:
+    total = ReportRow(
+        key="total",
+        requests=sum(row.requests for row in rows),
+        chars=sum(row.chars for row in rows),
+        billable_chars=sum(row.billable_chars for row in rows),
+        estimated_cost_usd=sum(row.estimated_cost_usd for row in rows),
+    )
+    if latency is not None:
+        histogram: Counter[float] = Counter()
+        for key, counts in latency.items():
+            if key[0].startswith(month):
+                histogram.update(counts)
+        total.api_ms_p50 = percentile(histogram, 0.50)
+        total.api_ms_p95 = percentile(histogram, 0.95)
+        total.api_ms_p99 = percentile(histogram, 0.99)
+    return total
+
+
+def _ms(value: float | None) -> str:
+    return "-" if value is None else f"{value:g}"
+
+
+def format_table(rows: list[ReportRow], group_by: str, total: ReportRow | None = None, *, latency: bool = False) -> str:
+    header = (group_by.upper(), "REQUESTS", "CHARS", "BILLABLE", "COST USD")
+    if latency:
+        header += ("P50 MS", "P95 MS", "P99 MS")
+    lines = []
+    for row in [*rows, total or _total(rows)]:
+        cells = (
+            row.key,
+            f"{row.requests:,}",
+            f"{row.chars:,}",
+            f"{row.billable_chars:,}",
+            f"{row.estimated_cost_usd:.2f}",
+        )
+        if latency:
+            cells += (_ms(row.api_ms_p50), _ms(row.api_ms_p95), _ms(row.api_ms_p99))
+        lines.append(cells)
+    widths = [max(len(cells[i]) for cells in [header, *lines]) for i in range(len(header))]
+
+    def _line(cells: tuple[str, ...]) -> str:
+        padded = [cell.rjust(width) for cell, width in zip(cells, widths, strict=True)]
+        return "  ".join([cells[0].ljust(widths[0]), *padded[1:]])
+
+    return "\n".join([_line(header), *(_line(cells) for cells in lines[:-1]), "", _line(lines[-1])])
+
+
+def main() -> None:
+    args = parse_args()
+
+    try:
+        aggregator = _aggregate(args)
+        latency = aggregator.latency if args.latency else None
+        rows = summarize(aggregator.totals, group_by=args.by, month=args.month, latency=latency)
+    except (OSError, ValueError) as exc:
+        raise SystemExit(str(exc)) from exc
+    total = _total(rows, latency, args.month)
+
+    if args.format == "json":
+        fields = [asdict(row) for row in [*rows, total]]
+        if not args.latency:
+            for field in fields:
+                for name in ("api_ms_p50", "api_ms_p95", "api_ms_p99"):
+                    del field[name]
+        payload = {
+            "group_by": args.by,
+            "month": args.month,
+            "rows": fields[:-1],
+            "total": fields[-1],
+        }
+        print(json.dumps(payload, indent=2))
+        return
+
+    print(format_table(rows, args.by, total, latency=args.latency))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import json
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 
@@ -16,6 +16,16 @@ def mock_tts_client():
     return client
 
 
+@pytest.fixture
+def mock_tts_async_client():
+    """A MagicMock standing in for texttospeech.TextToSpeechAsyncClient."""
+    client = MagicMock()
+    response = MagicMock()
+    response.audio_content = b"\x00" * 128
+    client.synthesize_speech = AsyncMock(return_value=response)
+    return client
+
+
 @pytest.fixture
 def sample_profile_dict(tmp_path):
     """Return a minimal profile dict and the path to its JSON file."""
@@ -33,6 +43,7 @@ def sample_profile_dict(tmp_path):
                 "usage_log": str(tmp_path / "usage.csv"),
                 "autoplay": False,
                 "player_command": ["afplay", "{file}"],
+                "cache_dir": str(tmp_path / "cache"),
             }
         },
     }
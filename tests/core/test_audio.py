@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import struct
+
+import pytest
+
+from tts_mcp.core.audio import _ogg_crc, _ogg_page, _ogg_pages, concat_audio, concat_mp3, concat_ogg, concat_wav
+
+# -- helpers --
+
+
+def _wav(samples: bytes, *, rate: int = 24000) -> bytes:
+    fmt = struct.pack("<HHIIHH", 1, 1, rate, rate * 2, 2, 16)
+    body = b"WAVE" + b"fmt " + struct.pack("<I", len(fmt)) + fmt + b"data" + struct.pack("<I", len(samples)) + samples
+    return b"RIFF" + struct.pack("<I", len(body)) + body
+
+
+def _mp3_frame(fill: int) -> bytes:
+    # MPEG-1 Layer III, 128 kbps, 44.1 kHz, no padding -> 417 bytes.
+    header = bytes([0xFF, 0xFB, 0x90, 0x00])
+    return header + bytes([fill]) * (417 - 4)
+
+
+def _opus(serial: int, packets: list[bytes], *, granule_step: int = 960) -> bytes:
+    head = b"OpusHead" + bytes(11)
+    tags = b"OpusTags" + bytes(8)
+    pages = [
+        _ogg_page(0x02, 0, serial, 0, bytes([len(head)]), head),
+        _ogg_page(0x00, 0, serial, 1, bytes([len(tags)]), tags),
+    ]
+    for index, packet in enumerate(packets):
+        header_type = 0x04 if index == len(packets) - 1 else 0x00
+        granule = 312 + granule_step * (index + 1)
+        pages.append(_ogg_page(header_type, granule, serial, index + 2, bytes([len(packet)]), packet))
+    return b"".join(pages)
+
+
+def _page_fields(data: bytes) -> list[tuple[int, int, int, int]]:
+    """Return (header_type, granule, serial, sequence) for each page and verify its CRC."""
+    fields = []
+    pos = 0
+    while pos < len(data):
+        header_type, granule, serial, sequence, crc, count = struct.unpack_from("<BqIIIB", data, pos + 5)
+        length = 27 + count + sum(data[pos + 27 : pos + 27 + count])
+        page = bytearray(data[pos : pos + length])
+        page[22:26] = bytes(4)
+        assert _ogg_crc(bytes(page)) == crc
+        fields.append((header_type, granule, serial, sequence))
+        pos += length
+    return fields
+
+
+# -- wav --
+
+
+def test_concat_wav_rewrites_riff_header():
+    joined = concat_wav([_wav(b"\x01\x00" * 10), _wav(b"\x02\x00" * 5)])
+    assert joined[:4] == b"RIFF"
+    assert struct.unpack_from("<I", joined, 4)[0] == len(joined) - 8
+    data_size = struct.unpack_from("<I", joined, 40)[0]
+    assert data_size == 30
+    assert joined[44:] == b"\x01\x00" * 10 + b"\x02\x00" * 5
+
+
+def test_concat_wav_rejects_mismatched_formats():
+    with pytest.raises(ValueError, match="different sample formats"):
+        concat_wav([_wav(b"\x00\x00", rate=24000), _wav(b"\x00\x00", rate=16000)])
+
+
+def test_concat_wav_rejects_non_riff():
+    with pytest.raises(ValueError, match="RIFF"):
+        concat_wav([b"not a wav file"])
+
+
+# -- mp3 --
+
+
+def test_concat_mp3_strips_id3_tags():
+    tag = b"ID3\x04\x00\x00\x00\x00\x00\x05" + b"xxxxx"
+    joined = concat_mp3([tag + _mp3_frame(1), tag + _mp3_frame(2)])
+    assert joined == _mp3_frame(1) + _mp3_frame(2)
+
+
+def test_concat_mp3_drops_xing_header_frame():
+    xing = bytearray(_mp3_frame(0))
+    xing[36:40] = b"Xing"
+    joined = concat_mp3([bytes(xing) + _mp3_frame(1), bytes(xing) + _mp3_frame(2)])
+    assert joined == _mp3_frame(1) + _mp3_frame(2)
+
+
+# -- ogg --
+
+
+def test_ogg_crc_matches_reference_check_value():
+    assert _ogg_crc(b"123456789") == 0x89A1897F
+
+
+def test_concat_ogg_builds_single_logical_stream():
+    joined = concat_ogg([_opus(111, [b"a" * 10, b"b" * 10]), _opus(222, [b"c" * 10])])
+    fields = _page_fields(joined)
+
+    # Two header pages from the first stream plus three audio pages.
+    assert len(fields) == 5
+    assert {serial for _, _, serial, _ in fields} == {111}
+    assert [sequence for _, _, _, sequence in fields] == [0, 1, 2, 3, 4]
+    assert [header_type & 0x02 for header_type, _, _, _ in fields] == [0x02, 0, 0, 0, 0]
+    assert [header_type & 0x04 for header_type, _, _, _ in fields] == [0, 0, 0, 0, 0x04]
+    granules = [granule for _, granule, _, _ in fields[2:]]
+    assert granules == [1272, 2232, 2232 + 1272]
+    assert [body for *_, body in _ogg_pages(joined)][2:] == [b"a" * 10, b"b" * 10, b"c" * 10]
+
+
+def test_concat_ogg_rejects_non_ogg():
+    with pytest.raises(ValueError, match="Ogg"):
+        concat_ogg([b"definitely not ogg data at all"])
+
+
+# -- concat_audio --
+
+
+def test_concat_audio_single_part_is_untouched():
+    assert concat_audio("wav", [b"raw"]) == b"raw"
+
+
+def test_concat_audio_dispatches_by_format():
+    assert concat_audio("mp3", [_mp3_frame(1), _mp3_frame(2)]) == _mp3_frame(1) + _mp3_frame(2)
+
+
+def test_concat_audio_unsupported_format():
+    with pytest.raises(ValueError, match="Unsupported format"):
+        concat_audio("aac", [b"a", b"b"])
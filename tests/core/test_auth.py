@@ -4,20 +4,62 @@ from unittest.mock import patch
 
 import pytest
 
-from tts_mcp.core.auth import create_tts_client
+from tts_mcp.core.auth import channel_options, create_tts_async_client, create_tts_client
 
 
-@patch("tts_mcp.core.auth.texttospeech.TextToSpeechClient")
+@patch("google.cloud.texttospeech.TextToSpeechClient")
 def test_create_client_success(mock_cls):
     client = create_tts_client()
     mock_cls.assert_called_once()
     assert client is mock_cls.return_value
 
 
-@patch("tts_mcp.core.auth.texttospeech.TextToSpeechClient")
+@patch("google.cloud.texttospeech.TextToSpeechClient")
 def test_create_client_raises_on_missing_credentials(mock_cls):
     from google.auth.exceptions import DefaultCredentialsError
 
     mock_cls.side_effect = DefaultCredentialsError("no creds")
     with pytest.raises(RuntimeError, match="Google credentials were not found"):
         create_tts_client()
+
+
+@patch("google.cloud.texttospeech.TextToSpeechAsyncClient")
+def test_create_async_client_raises_on_missing_credentials(mock_cls):
+    from google.auth.exceptions import DefaultCredentialsError
+
+    mock_cls.side_effect = DefaultCredentialsError("no creds")
+    with pytest.raises(RuntimeError, match="Google credentials were not found"):
+        create_tts_async_client()
+
+
+def test_channel_options():
+    assert channel_options() == []
+    assert channel_options(keepalive_ms=60_000, idle_timeout_ms=3_600_000) == [
+        ("grpc.keepalive_time_ms", 60_000),
+        ("grpc.keepalive_timeout_ms", 20_000),
+        ("grpc.keepalive_permit_without_calls", 1),
+        ("grpc.http2.max_pings_without_data", 0),
+        ("grpc.client_idle_timeout_ms", 3_600_000),
+    ]
+    assert ("grpc.keepalive_timeout_ms", 5_000) in channel_options(keepalive_ms=5_000)
+
+
+@patch("google.cloud.texttospeech_v1.services.text_to_speech.transports.TextToSpeechGrpcTransport")
+@patch("google.cloud.texttospeech.TextToSpeechClient")
+def test_create_client_passes_channel_options(mock_cls, mock_transport_cls):
+    create_tts_client(keepalive_ms=60_000)
+    transport = mock_cls.call_args.kwargs["transport"]
+    transport(host="texttospeech.googleapis.com")
+
+    channel = mock_transport_cls.call_args.kwargs["channel"]
+    assert mock_transport_cls.call_args.kwargs["host"] == "texttospeech.googleapis.com"
+    channel("texttospeech.googleapis.com", options=[("grpc.max_send_message_length", -1)])
+    options = mock_transport_cls.create_channel.call_args.kwargs["options"]
+    assert options[0] == ("grpc.max_send_message_length", -1)
+    assert ("grpc.keepalive_time_ms", 60_000) in options
+
+
+@patch("google.cloud.texttospeech.TextToSpeechClient")
+def test_create_client_without_transport_settings_uses_defaults(mock_cls):
+    create_tts_client()
+    mock_cls.assert_called_once_with()
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import fcntl
+import multiprocessing
+import os
+import time
+from pathlib import Path
+
+from tts_mcp.core.cache import LOCK_FILENAME, STALE_TEMP_SECONDS, TEMP_PREFIX, SynthesisCache, cache_key, open_cache
+
+
+def _key(**overrides) -> str:
+    params = {
+        "text": "Done.",
+        "ssml": False,
+        "voice": "en-US-Chirp3-HD-Fenrir",
+        "language": "en-US",
+        "model": "",
+        "audio_format": "mp3",
+        "speaking_rate": 1.0,
+        "pitch": 0.0,
+    }
+    params.update(overrides)
+    return cache_key(**params)
+
+
+# -- cache_key --
+
+
+def test_cache_key_is_stable():
+    assert _key() == _key()
+
+
+def test_cache_key_changes_with_every_input():
+    base = _key()
+    assert _key(text="Done!") != base
+    assert _key(ssml=True) != base
+    assert _key(voice="en-US-Neural2-D") != base
+    assert _key(language="en-GB") != base
+    assert _key(model="models/chirp3-hd") != base
+    assert _key(audio_format="wav") != base
+    assert _key(speaking_rate=1.1) != base
+    assert _key(pitch=-2.0) != base
+
+
+def test_cache_key_treats_int_and_float_rate_alike():
+    assert _key(speaking_rate=1) == _key(speaking_rate=1.0)
+
+
+# -- SynthesisCache --
+
+
+def test_cache_miss_returns_none(tmp_path):
+    cache = SynthesisCache(tmp_path, max_bytes=1024)
+    assert cache.get(_key(), "mp3") is None
+
+
+def test_cache_round_trip(tmp_path):
+    cache = SynthesisCache(tmp_path / "cache", max_bytes=1024)
+    cache.put(_key(), "mp3", b"audio")
+    assert cache.get(_key(), "mp3") == b"audio"
+    assert cache.entry_path(_key(), "mp3").name.endswith(".mp3")
+
+
+def test_cache_skips_entries_larger_than_cap(tmp_path):
+    cache = SynthesisCache(tmp_path, max_bytes=4)
+    cache.put(_key(), "mp3", b"too large")
+    assert cache.get(_key(), "mp3") is None
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = SynthesisCache(tmp_path, max_bytes=20)
+    first, second, third = _key(text="one"), _key(text="two"), _key(text="three")
+    cache.put(first, "mp3", b"x" * 8)
+    cache.put(second, "mp3", b"x" * 8)
+    os.utime(cache.entry_path(first, "mp3"), (1, 1))
+    os.utime(cache.entry_path(second, "mp3"), (2, 2))
+
+    # A hit refreshes recency, so "second" becomes the eviction candidate.
+    assert cache.get(first, "mp3") is not None
+    cache.put(third, "mp3", b"x" * 8)
+
+    assert cache.get(first, "mp3") is not None
+    assert cache.get(second, "mp3") is None
+    assert cache.get(third, "mp3") is not None
+
+
+def test_cache_put_leaves_no_temp_files(tmp_path):
+    cache = SynthesisCache(tmp_path, max_bytes=1024)
+    cache.put(_key(), "mp3", b"audio")
+    names = {path.name for path in tmp_path.iterdir()}
+    assert names == {cache.entry_path(_key(), "mp3").name, LOCK_FILENAME}
+
+
+def test_cache_eviction_skips_entries_being_read(tmp_path):
+    cache = SynthesisCache(tmp_path, max_bytes=10)
+    busy, idle = _key(text="busy"), _key(text="idle")
+    cache.put(busy, "mp3", b"x" * 5)
+    cache.put(idle, "mp3", b"x" * 5)
+    os.utime(cache.entry_path(busy, "mp3"), (1, 1))
+    os.utime(cache.entry_path(idle, "mp3"), (2, 2))
+
+    with cache.entry_path(busy, "mp3").open("rb") as reader:
+        fcntl.flock(reader, fcntl.LOCK_SH)
+        cache.put(_key(text="new"), "mp3", b"x" * 5)
+
+    assert cache.entry_path(busy, "mp3").exists()
+    assert not cache.entry_path(idle, "mp3").exists()
+
+
+def test_cache_eviction_removes_stale_temp_files(tmp_path):
+    cache = SynthesisCache(tmp_path, max_bytes=1024)
+    stale = tmp_path / f"{TEMP_PREFIX}crashed.mp3"
+    fresh = tmp_path / f"{TEMP_PREFIX}writing.mp3"
+    stale.write_bytes(b"partial")
+    fresh.write_bytes(b"partial")
+    old = time.time() - STALE_TEMP_SECONDS - 60
+    os.utime(stale, (old, old))
+
+    cache.evict()
+    assert not stale.exists()
+    assert fresh.exists()
+
+
+def _put_many(directory: str, worker: int) -> None:
+    cache = SynthesisCache(Path(directory), max_bytes=4096)
+    for i in range(50):
+        cache.put(_key(text=f"shared-{i % 10}"), "mp3", bytes([worker]) * 64)
+        cache.get(_key(text=f"shared-{(i + 3) % 10}"), "mp3")
+
+
+def test_cache_is_consistent_under_concurrent_processes(tmp_path):
+    ctx = multiprocessing.get_context("fork")
+    workers = [ctx.Process(target=_put_many, args=(str(tmp_path), n)) for n in range(4)]
+    for proc in workers:
+        proc.start()
+    for proc in workers:
+        proc.join(timeout=30)
+        assert proc.exitcode == 0
+
+    cache = SynthesisCache(tmp_path, max_bytes=4096)
+    for i in range(10):
+        audio = cache.get(_key(text=f"shared-{i}"), "mp3")
+        assert audio is not None
+        assert len(audio) == 64
+        assert len(set(audio)) == 1
+    assert not [path for path in tmp_path.iterdir() if path.name.startswith(TEMP_PREFIX)]
+
+
+def test_cache_evict_handles_missing_directory(tmp_path):
+    cache = SynthesisCache(tmp_path / "missing", max_bytes=10)
+    assert cache.evict() == 0
+
+
+# -- open_cache --
+
+
+def test_open_cache_disabled_without_dir_or_size(tmp_path):
+    assert open_cache(None, 10) is None
+    assert open_cache(tmp_path, 0) is None
+
+
+def test_open_cache_converts_megabytes(tmp_path):
+    cache = open_cache(tmp_path, 2)
+    assert cache is not None
+    assert cache.max_bytes == 2 * 1024 * 1024
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import pstats
+
+import pytest
+
+from tts_mcp.core.diagnostics import CallProfiler, diagnostics_dir
+
+
+def _work() -> list[bytes]:
+    return [bytes(1024) for _ in range(200)]
+
+
+def test_diagnostics_dir_sits_next_to_output_dir(tmp_path):
+    assert diagnostics_dir(tmp_path / "out") == tmp_path / "diagnostics"
+
+
+def test_profiler_is_off_by_default(tmp_path):
+    profiler = CallProfiler(tmp_path)
+    assert profiler.claim("tts_speak") is None
+    assert not any(tmp_path.iterdir())
+
+
+def test_profiled_call_writes_cprofile_and_allocation_reports(tmp_path):
+    profiler = CallProfiler(tmp_path / "diagnostics", calls=1, top=5, prefix="test")
+    run = profiler.claim("tts_speak")
+    assert run is not None
+    with run:
+        kept = _work()
+
+    assert len(kept) == 200
+    assert run.prof_path.name.startswith("test-tts_speak-")
+    assert run.prof_path.suffix == ".prof"
+    stats = pstats.Stats(str(run.prof_path))
+    assert any(name == "_work" for _file, _line, name in stats.stats)
+    lines = run.alloc_path.read_text().splitlines()
+    assert lines[0].startswith("# traced memory:")
+    assert 2 < len(lines) <= 7
+    assert run.paths() == {"profile": str(run.prof_path), "allocations": str(run.alloc_path)}
+
+
+def test_profiler_counts_down_and_profiles_one_call_at_a_time(tmp_path):
+    profiler = CallProfiler(tmp_path, calls=2)
+    first = profiler.claim("tts_speak")
+    assert first is not None
+    assert profiler.claim("tts_doctor") is None
+    assert profiler.remaining == 1
+
+    first.release()
+    second = profiler.claim("tts_doctor")
+    assert second is not None
+    with second:
+        pass
+    assert profiler.remaining == 0
+    assert profiler.claim("tts_speak") is None
+
+
+def test_profiler_arm_replaces_pending_count(tmp_path):
+    profiler = CallProfiler(tmp_path, calls=5)
+    profiler.arm(1)
+    assert profiler.remaining == 1
+    with pytest.raises(ValueError, match="profile_calls"):
+        profiler.arm(-1)
+
+
+def test_profiled_call_still_writes_reports_when_it_fails(tmp_path):
+    profiler = CallProfiler(tmp_path, calls=1)
+    run = profiler.claim("tts_speak")
+    assert run is not None
+
+    def _fail() -> None:
+        with run:
+            raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError, match="boom"):
+        _fail()
+    assert run.prof_path.exists()
+    assert run.alloc_path.exists()
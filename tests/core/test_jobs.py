@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import asyncio
+
+from tts_mcp.core.jobs import Job, JobQueue
+
+
+async def _wait_finished(job: Job) -> None:
+    while not job.finished:
+        await asyncio.sleep(0)
+
+
+def test_job_queue_runs_work_and_stores_result():
+    async def _run():
+        queue = JobQueue(workers=1)
+        states: list[str] = []
+
+        async def _work(job: Job):
+            states.append(job.state)
+            job.state = "synthesizing"
+            await asyncio.sleep(0)
+            return {"ok": True, "value": 42}
+
+        job = queue.submit(_work)
+        assert job.state == "queued"
+        await _wait_finished(job)
+        return job, states
+
+    job, states = asyncio.run(_run())
+    assert states == ["queued"]
+    assert job.state == "done"
+    assert job.result == {"ok": True, "value": 42}
+    assert job.finished_at is not None
+
+
+def test_job_queue_records_failures():
+    async def _run():
+        queue = JobQueue(workers=1)
+
+        async def _work(job: Job):
+            raise RuntimeError("api down")
+
+        job = queue.submit(_work)
+        await _wait_finished(job)
+        return job
+
+    job = asyncio.run(_run())
+    assert job.state == "failed"
+    assert job.error == "api down"
+    assert job.result is None
+
+
+def test_job_queue_limits_concurrency_to_worker_count():
+    async def _run():
+        queue = JobQueue(workers=2)
+        active = 0
+        peak = 0
+
+        async def _work(job: Job):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return {}
+
+        jobs = [queue.submit(_work) for _ in range(5)]
+        for job in jobs:
+            await _wait_finished(job)
+        return peak
+
+    assert asyncio.run(_run()) == 2
+
+
+def test_job_queue_forgets_oldest_finished_jobs():
+    async def _run():
+        queue = JobQueue(workers=1, max_finished=2)
+
+        async def _work(job: Job):
+            return {}
+
+        jobs = [queue.submit(_work) for _ in range(4)]
+        for job in jobs:
+            await _wait_finished(job)
+        return queue, jobs
+
+    queue, jobs = asyncio.run(_run())
+    assert queue.get(jobs[0].id) is None
+    assert queue.get(jobs[1].id) is None
+    assert queue.get(jobs[3].id) is jobs[3]
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import urllib.request
+
+import pytest
+
+from tts_mcp.core.metrics import Histogram, MetricsRegistry, error_status, start_metrics_server
+
+# -- Histogram --
+
+
+def test_histogram_quantiles_use_bucket_upper_bounds():
+    histogram = Histogram()
+    for value in [3.0] * 90 + [180.0] * 9 + [7200.0]:
+        histogram.observe(value)
+    assert histogram.count == 100
+    assert histogram.quantile(0.5) == 5.0
+    assert histogram.quantile(0.95) == 250.0
+    assert histogram.quantile(1.0) == 7200.0
+
+
+def test_histogram_quantile_never_exceeds_max_or_overflows():
+    histogram = Histogram()
+    histogram.observe(2.0)
+    assert histogram.quantile(0.99) == 2.0
+    histogram.observe(60_000.0)
+    assert histogram.quantile(1.0) == 60_000.0
+    assert Histogram().quantile(0.5) is None
+
+
+# -- MetricsRegistry --
+
+
+def test_registry_snapshot_reports_every_metric():
+    registry = MetricsRegistry()
+    registry.inc("tts_requests_total")
+    registry.inc("tts_chars_total", 42)
+    registry.inc("tts_errors_total", status="UNAVAILABLE")
+    registry.inc("tts_errors_total", status="UNAVAILABLE")
+    registry.observe("tts_api_latency_ms", 180.0)
+
+    snapshot = registry.snapshot()
+    assert snapshot["counters"]["tts_requests_total"] == 1
+    assert snapshot["counters"]["tts_chars_total"] == 42
+    assert snapshot["counters"]["tts_cache_hits_total"] == 0
+    assert snapshot["counters"]["tts_errors_total"] == {"UNAVAILABLE": 2}
+    assert snapshot["histograms"]["tts_api_latency_ms"]["count"] == 1
+    assert snapshot["histograms"]["tts_api_latency_ms"]["p50"] == 180.0
+    assert snapshot["histograms"]["tts_player_spawn_ms"]["p50"] is None
+
+
+def test_registry_rejects_unknown_metrics_and_labels():
+    registry = MetricsRegistry()
+    with pytest.raises(ValueError, match="Unknown counter"):
+        registry.inc("tts_nope_total")
+    with pytest.raises(ValueError, match="Unknown histogram"):
+        registry.observe("tts_nope_ms", 1.0)
+    with pytest.raises(ValueError, match="takes labels: status"):
+        registry.inc("tts_errors_total")
+    with pytest.raises(ValueError, match="takes labels: none"):
+        registry.inc("tts_requests_total", status="OK")
+
+
+def test_render_prometheus_text_format():
+    registry = MetricsRegistry()
+    registry.inc("tts_requests_total", 2)
+    registry.inc("tts_errors_total", status="DEADLINE_EXCEEDED")
+    registry.observe("tts_api_latency_ms", 40.0)
+    registry.observe("tts_api_latency_ms", 400.0)
+
+    lines = registry.render_prometheus({"profile": 'de"fault'}).splitlines()
+    assert "# TYPE tts_requests_total counter" in lines
+    assert 'tts_requests_total{profile="de\\"fault"} 2' in lines
+    assert 'tts_errors_total{profile="de\\"fault",status="DEADLINE_EXCEEDED"} 1' in lines
+    assert "# TYPE tts_api_latency_ms histogram" in lines
+    assert 'tts_api_latency_ms_bucket{profile="de\\"fault",le="50"} 1' in lines
+    assert 'tts_api_latency_ms_bucket{profile="de\\"fault",le="500"} 2' in lines
+    assert 'tts_api_latency_ms_bucket{profile="de\\"fault",le="+Inf"} 2' in lines
+    assert 'tts_api_latency_ms_sum{profile="de\\"fault"} 440' in lines
+    assert 'tts_api_latency_ms_count{profile="de\\"fault"} 2' in lines
+
+
+def test_write_prometheus_replaces_file(tmp_path):
+    registry = MetricsRegistry()
+    path = tmp_path / "textfile" / "tts.prom"
+    registry.write_prometheus(path)
+    registry.inc("tts_requests_total")
+    registry.write_prometheus(path)
+    assert "tts_requests_total 1" in path.read_text().splitlines()
+    assert [item.name for item in path.parent.iterdir()] == ["tts.prom"]
+
+
+def test_metrics_server_serves_registry():
+    registry = MetricsRegistry()
+    registry.inc("tts_cache_hits_total", 3)
+    server = start_metrics_server(registry, 0, {"profile": "test"})
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url, timeout=5) as response:
+            body = response.read().decode("utf-8")
+        assert 'tts_cache_hits_total{profile="test"} 3' in body.splitlines()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+# -- error_status --
+
+
+def test_error_status_uses_grpc_status_name():
+    class _StatusCode:
+        name = "UNAVAILABLE"
+
+    class _ApiError(Exception):
+        grpc_status_code = _StatusCode()
+
+    assert error_status(_ApiError()) == "UNAVAILABLE"
+    assert error_status(ValueError("bad")) == "ValueError"
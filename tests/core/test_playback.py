@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from tts_mcp.core.playback import PlaybackQueue
+from tts_mcp.core.profile import TTSProfile
+
+
+def _make_profile(player_command: list[str]) -> TTSProfile:
+    return TTSProfile(
+        name="test",
+        voice="v",
+        language="en-US",
+        model="",
+        audio_format="mp3",
+        speaking_rate=1.0,
+        pitch=0.0,
+        output_dir=Path("/tmp/out"),
+        usage_log=Path("/tmp/usage.csv"),
+        autoplay=True,
+        player_command=player_command,
+    )
+
+
+def _recording_player(log: Path, *, delay: float = 0.0) -> list[str]:
+    # Appends each played file to the log, one line per spawn.
+    return ["sh", "-c", f'sleep {delay}; cat "$1" >> "$2"; echo >> "$2"', "sh", "{file}", str(log)]
+
+
+def _gated_player(tmp_path: Path) -> list[str]:
+    # Notes each file in started.txt as soon as it starts, then only records it in played.txt
+    # once the test creates the gate file, so tests control exactly when playback finishes.
+    script = 'echo >> "$2"; while [ ! -e "$3" ]; do sleep 0.01; done; cat "$1" >> "$4"; echo >> "$4"'
+    paths = [str(tmp_path / name) for name in ("started.txt", "gate", "played.txt")]
+    return ["sh", "-c", script, "sh", "{file}", *paths]
+
+
+def _wait_for(condition) -> None:
+    deadline = time.monotonic() + 5
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def _wait_for_starts(tmp_path: Path, count: int) -> None:
+    started = tmp_path / "started.txt"
+    _wait_for(lambda: started.exists() and len(started.read_text().splitlines()) >= count)
+
+
+def _audio_file(tmp_path: Path, name: str) -> Path:
+    path = tmp_path / f"{name}.mp3"
+    path.write_text(name)
+    return path
+
+
+# -- streams --
+
+
+def test_stream_plays_parts_in_order(tmp_path):
+    log = tmp_path / "played.txt"
+    playback = PlaybackQueue(_make_profile(_recording_player(log)))
+    stream = playback.stream("mp3")
+    for part in (b"one", b"two", b"three"):
+        stream.add(part)
+    stream.close()
+    playback.join(timeout=5)
+
+    assert log.read_bytes().replace(b"\n", b"") == b"onetwothree"
+
+
+def test_stream_batches_parts_that_are_already_waiting(tmp_path):
+    playback = PlaybackQueue(_make_profile(_gated_player(tmp_path)))
+    stream = playback.stream("mp3")
+    stream.add(b"first")
+    _wait_for_starts(tmp_path, 1)
+    stream.add(b"second")
+    stream.add(b"third")
+    stream.close()
+    (tmp_path / "gate").touch()
+    playback.join(timeout=5)
+
+    assert (tmp_path / "played.txt").read_text().splitlines() == ["first", "secondthird"]
+
+
+def test_stream_cleans_up_work_directory(tmp_path, monkeypatch):
+    (tmp_path / "tmp").mkdir()
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path / "tmp"))
+    playback = PlaybackQueue(_make_profile(_recording_player(tmp_path / "log")))
+    stream = playback.stream("mp3")
+    stream.add(b"x")
+    stream.close()
+    playback.join(timeout=5)
+    assert list((tmp_path / "tmp").iterdir()) == []
+
+
+# -- queue --
+
+
+def test_queue_plays_files_one_at_a_time_in_order(tmp_path):
+    log = tmp_path / "played.txt"
+    playback = PlaybackQueue(_make_profile(_recording_player(log, delay=0.1)))
+    for name in ("a", "b", "c"):
+        playback.enqueue_file(_audio_file(tmp_path, name))
+    playback.join(timeout=5)
+
+    assert log.read_text().splitlines() == ["a", "b", "c"]
+
+
+def test_queue_waits_for_earlier_stream_before_later_file(tmp_path):
+    log = tmp_path / "played.txt"
+    playback = PlaybackQueue(_make_profile(_recording_player(log)))
+    stream = playback.stream("mp3")
+    playback.enqueue_file(_audio_file(tmp_path, "later"))
+    # The scheduler has taken the empty stream and must hold the file back until it ends.
+    _wait_for(lambda: playback._current is stream)
+    stream.add(b"earlier")
+    stream.close()
+    playback.join(timeout=5)
+
+    assert log.read_text().splitlines() == ["earlier", "later"]
+
+
+def test_queue_urgent_items_jump_ahead(tmp_path):
+    playback = PlaybackQueue(_make_profile(_gated_player(tmp_path)))
+    playback.enqueue_file(_audio_file(tmp_path, "first"))
+    _wait_for_starts(tmp_path, 1)
+    playback.enqueue_file(_audio_file(tmp_path, "regular"))
+    playback.enqueue_file(_audio_file(tmp_path, "urgent"), urgent=True)
+    (tmp_path / "gate").touch()
+    playback.join(timeout=5)
+
+    assert (tmp_path / "played.txt").read_text().splitlines() == ["first", "urgent", "regular"]
+
+
+def test_queue_drops_oldest_items_beyond_max_depth(tmp_path):
+    playback = PlaybackQueue(_make_profile(_gated_player(tmp_path)), max_depth=2)
+    playback.enqueue_file(_audio_file(tmp_path, "playing"))
+    _wait_for_starts(tmp_path, 1)
+    for name in ("stale", "fresh", "newest"):
+        playback.enqueue_file(_audio_file(tmp_path, name))
+    assert playback.pending() == 2
+    (tmp_path / "gate").touch()
+    playback.join(timeout=5)
+
+    assert (tmp_path / "played.txt").read_text().splitlines() == ["playing", "fresh", "newest"]
+
+
+def test_queue_clear_stops_playback_and_drops_waiting_items(tmp_path):
+    playback = PlaybackQueue(_make_profile(_gated_player(tmp_path)))
+    playback.enqueue_file(_audio_file(tmp_path, "long"))
+    stream = playback.stream("mp3")
+    stream.add(b"never")
+    _wait_for_starts(tmp_path, 1)
+
+    assert playback.clear() == 2
+    playback.join(timeout=5)
+    assert stream.cancelled
+    assert (tmp_path / "started.txt").read_text().splitlines() == [""]
+    assert not (tmp_path / "played.txt").exists()
+
+
+def test_queue_close_drops_items_and_closes_player(tmp_path):
+    playback = PlaybackQueue(_make_profile(_gated_player(tmp_path)))
+    player = MagicMock()
+    playback._player = player
+    playback.enqueue_file(_audio_file(tmp_path, "a"))
+
+    playback.close()
+
+    assert playback.pending() == 0
+    player.stop.assert_called_once_with()
+    player.close.assert_called_once_with()
+
+
+def test_queue_requires_available_player(tmp_path):
+    playback = PlaybackQueue(_make_profile(["definitely-missing-player", "{file}"]))
+    with pytest.raises(RuntimeError, match="not found"):
+        playback.enqueue_file(_audio_file(tmp_path, "a"))
+
+
+def test_queue_requires_player_command():
+    with pytest.raises(RuntimeError, match="player_command"):
+        PlaybackQueue(_make_profile([])).stream("mp3")
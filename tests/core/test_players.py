@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import struct
+import sys
+import time
+from pathlib import Path
+
+from tts_mcp.core.audio import pcm_wav_fmt, wav_header
+from tts_mcp.core.players import MpvIpcPlayer, PcmStdinPlayer, SpawnPlayer, create_player
+from tts_mcp.core.profile import TTSProfile
+
+FAKE_MPV = """
+import json, socket, sys
+path, log = sys.argv[1], sys.argv[2]
+with open(log, "a") as handle:
+    handle.write("started\\n")
+server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+server.bind(path)
+server.listen(1)
+conn, _ = server.accept()
+for line in conn.makefile("rb"):
+    command = json.loads(line)["command"]
+    with open(log, "a") as handle:
+        handle.write(" ".join(command[:2]) + "\\n")
+    if command[0] == "loadfile":
+        conn.sendall(b'{"event": "start-file"}\\n{"event": "end-file", "reason": "eof"}\\n')
+"""
+
+
+def _make_profile(player_command: list[str], player_mode: str) -> TTSProfile:
+    return TTSProfile(
+        name="test",
+        voice="v",
+        language="en-US",
+        model="",
+        audio_format="wav",
+        speaking_rate=1.0,
+        pitch=0.0,
+        output_dir=Path("/tmp/out"),
+        usage_log=Path("/tmp/usage.csv"),
+        autoplay=True,
+        player_command=player_command,
+        player_mode=player_mode,
+    )
+
+
+def _wav_file(path: Path, samples: bytes, *, rate: int = 24000) -> Path:
+    path.write_bytes(wav_header(pcm_wav_fmt(rate), len(samples)) + samples)
+    return path
+
+
+def _wait_for(predicate, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.02)
+
+
+def test_create_player_by_mode():
+    assert isinstance(create_player(_make_profile(["afplay", "{file}"], "spawn")), SpawnPlayer)
+    assert isinstance(create_player(_make_profile(["mpv", "{ipc}"], "mpv-ipc")), MpvIpcPlayer)
+    assert isinstance(create_player(_make_profile(["aplay"], "pcm-stdin")), PcmStdinPlayer)
+
+
+# -- mpv-ipc --
+
+
+def test_mpv_ipc_player_reuses_one_process(tmp_path):
+    script = tmp_path / "fake_mpv.py"
+    script.write_text(FAKE_MPV)
+    log = tmp_path / "mpv.log"
+    player = MpvIpcPlayer(_make_profile([sys.executable, str(script), "{ipc}", str(log)], "mpv-ipc"))
+    try:
+        player.play(tmp_path / "a.wav", lambda: False)
+        player.play(tmp_path / "b.wav", lambda: False)
+        player.stop()
+        _wait_for(lambda: log.read_text().endswith("stop\n"))
+    finally:
+        player.close()
+
+    assert log.read_text().splitlines() == [
+        "started",
+        f"loadfile {tmp_path / 'a.wav'}",
+        f"loadfile {tmp_path / 'b.wav'}",
+        "stop",
+    ]
+
+
+def test_mpv_ipc_player_close_ends_process_and_removes_socket(tmp_path):
+    script = tmp_path / "fake_mpv.py"
+    script.write_text(FAKE_MPV)
+    player = MpvIpcPlayer(_make_profile([sys.executable, str(script), "{ipc}", str(tmp_path / "mpv.log")], "mpv-ipc"))
+    player.play(tmp_path / "a.wav", lambda: False)
+    process, socket_path = player._process, player.socket_path
+    assert process is not None
+    assert socket_path is not None
+    assert socket_path.exists()
+    assert socket_path.parent.stat().st_mode & 0o077 == 0
+
+    player.close()
+
+    assert process.poll() is not None
+    assert not socket_path.parent.exists()
+    assert player._process is None
+    player.close()
+
+
+def test_mpv_ipc_player_skips_cancelled_items(tmp_path):
+    player = MpvIpcPlayer(_make_profile(["definitely-missing-player", "{ipc}"], "mpv-ipc"))
+    player.play(tmp_path / "a.wav", lambda: True)
+    assert player._process is None
+
+
+# -- pcm-stdin --
+
+
+def test_pcm_stdin_player_streams_samples_into_one_process(tmp_path):
+    out = tmp_path / "pcm.raw"
+    args = tmp_path / "args.txt"
+    command = ["sh", "-c", f'echo "{{rate}} {{channels}} {{bits}}" >> {args}; cat >> {out}']
+    player = PcmStdinPlayer(_make_profile(command, "pcm-stdin"))
+
+    player.play(_wav_file(tmp_path / "a.wav", b"\x01\x00" * 4), lambda: False)
+    player.play(_wav_file(tmp_path / "b.wav", b"\x02\x00" * 4), lambda: False)
+    player._close_locked(drain=True)
+
+    assert out.read_bytes() == b"\x01\x00" * 4 + b"\x02\x00" * 4
+    assert args.read_text().splitlines() == ["24000 1 16"]
+
+
+def test_pcm_stdin_player_restarts_on_format_change(tmp_path):
+    args = tmp_path / "args.txt"
+    command = ["sh", "-c", f'echo "{{rate}}" >> {args}; cat > /dev/null']
+    player = PcmStdinPlayer(_make_profile(command, "pcm-stdin"))
+
+    player.play(_wav_file(tmp_path / "a.wav", b"\x00\x00", rate=24000), lambda: False)
+    player.play(_wav_file(tmp_path / "b.wav", b"\x00\x00", rate=16000), lambda: False)
+    player._close_locked(drain=True)
+
+    assert args.read_text().splitlines() == ["24000", "16000"]
+
+
+def test_pcm_stdin_player_stop_kills_process(tmp_path):
+    player = PcmStdinPlayer(_make_profile(["sh", "-c", "sleep 10"], "pcm-stdin"))
+    player.play(_wav_file(tmp_path / "a.wav", struct.pack("<h", 0)), lambda: False)
+    process = player._process
+    player.stop()
+    assert process is not None
+    assert process.poll() is not None
+    assert player._process is None
@@ -1,14 +1,19 @@
 from __future__ import annotations
 
 import json
+import subprocess
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from unittest.mock import patch
 
 import pytest
 
 from tts_mcp.core.profile import (
+    DEFAULT_CACHE_MAX_MB,
+    PlayerRegistry,
     TTSProfile,
+    default_cache_dir,
     default_config_dir,
+    default_rate_limit_file,
     load_profile,
     play_audio,
     resolve_profile_path,
@@ -29,6 +34,16 @@ def test_default_config_dir_uses_home_config_when_xdg_missing(monkeypatch):
     assert default_config_dir() == expected
 
 
+def test_default_cache_dir_uses_xdg_env(monkeypatch, tmp_path):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg"))
+    assert default_cache_dir() == (tmp_path / "xdg" / "tts-mcp" / "audio")
+
+
+def test_default_cache_dir_uses_home_cache_when_xdg_missing(monkeypatch):
+    monkeypatch.delenv("XDG_CACHE_HOME", raising=False)
+    assert default_cache_dir() == Path("~/.cache").expanduser() / "tts-mcp" / "audio"
+
+
 # -- resolve_profile_path --
 
 
@@ -124,6 +139,195 @@ def test_load_profile_relative_paths(tmp_path):
     assert profile.usage_log == (tmp_path / "mylog.csv").resolve()
 
 
+def test_load_profile_cache_defaults(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg"))
+    f = tmp_path / "profiles.json"
+    f.write_text(json.dumps({"default_profile": "c", "profiles": {"c": {"voice": "v"}}}))
+    profile = load_profile(f, "")
+    assert profile.cache_dir == tmp_path / "xdg" / "tts-mcp" / "audio"
+    assert profile.cache_max_mb == DEFAULT_CACHE_MAX_MB
+
+
+def test_load_profile_cache_settings(tmp_path):
+    data = {"default_profile": "c", "profiles": {"c": {"voice": "v", "cache_dir": "./cache", "cache_max_mb": 0}}}
+    f = tmp_path / "profiles.json"
+    f.write_text(json.dumps(data))
+    profile = load_profile(f, "")
+    assert profile.cache_dir == (tmp_path / "cache").resolve()
+    assert profile.cache_max_mb == 0
+
+
+def test_load_profile_backend_defaults_to_unary(sample_profile_file):
+    assert load_profile(sample_profile_file, "").backend == "unary"
+
+
+def test_load_profile_streaming_backend_requires_wav_or_ogg(tmp_path):
+    data = {"default_profile": "s", "profiles": {"s": {"voice": "v", "format": "mp3", "backend": "streaming"}}}
+    f = tmp_path / "profiles.json"
+    f.write_text(json.dumps(data))
+    with pytest.raises(ValueError, match="wav or ogg"):
+        load_profile(f, "")
+
+
+def test_load_profile_unknown_backend(tmp_path):
+    data = {"default_profile": "s", "profiles": {"s": {"voice": "v", "backend": "grpc"}}}
+    f = tmp_path / "profiles.json"
+    f.write_text(json.dumps(data))
+    with pytest.raises(ValueError, match="must be one of"):
+        load_profile(f, "")
+
+
+def test_load_profile_mpv_ipc_requires_ipc_placeholder(tmp_path):
+    data = {"default_profile": "p", "profiles": {"p": {"voice": "v", "player_mode": "mpv-ipc"}}}
+    f = tmp_path / "profiles.json"
+    f.write_text(json.dumps(data))
+    with pytest.raises(ValueError, match="ipc"):
+        load_profile(f, "")
+
+
+def test_load_profile_pcm_stdin_requires_wav(tmp_path):
+    data = {"default_profile": "p", "profiles": {"p": {"voice": "v", "player_mode": "pcm-stdin", "format": "mp3"}}}
+    f = tmp_path / "profiles.json"
+    f.write_text(json.dumps(data))
+    with pytest.raises(ValueError, match="requires format wav"):
+        load_profile(f, "")
+
+
+def test_load_profile_usage_backend(tmp_path):
+    data = {"default_profile": "p", "profiles": {"p": {"voice": "v", "usage_backend": "sqlite"}}}
+    f = tmp_path / "profiles.json"
+    f.write_text(json.dumps(data))
+    assert load_profile(f, "").usage_backend == "sqlite"
+
+
+def test_load_profile_invalid_usage_backend(tmp_path):
+    data = {"default_profile": "p", "profiles": {"p": {"voice": "v", "usage_backend": "postgres"}}}
+    f = tmp_path / "profiles.json"
+    f.write_text(json.dumps(data))
+    with pytest.raises(ValueError, match="must be one of"):
+        load_profile(f, "")
+
+
+def test_load_profile_invalid_usage_flush_rows(tmp_path):
+    data = {"default_profile": "p", "profiles": {"p": {"voice": "v", "usage_flush_rows": 0}}}
+    f = tmp_path / "profiles.json"
+    f.write_text(json.dumps(data))
+    with pytest.raises(ValueError, match="usage_flush_rows"):
+        load_profile(f, "")
+
+
+def test_load_profile_metrics_settings(tmp_path):
+    data = {"default_profile": "p", "profiles": {"p": {"voice": "v", "metrics_file": "metrics/tts.prom"}}}
+    f = tmp_path / "profiles.json"
+    f.write_text(json.dumps(data))
+    profile = load_profile(f, "")
+    assert profile.metrics_file == (tmp_path / "metrics" / "tts.prom").resolve()
+    assert profile.metrics_port == 0
+
+
+def test_load_profile_invalid_metrics_port(tmp_path):
+    data = {"default_profile": "p", "profiles": {"p": {"voice": "v", "metrics_port": 70000}}}
+    f = tmp_path / "profiles.json"
+    f.write_text(json.dumps(data))
+    with pytest.raises(ValueError, match="metrics_port"):
+        load_profile(f, "")
+
+
+def test_load_profile_warmup(tmp_path):
+    data = {"default_profile": "p", "profiles": {"p": {"voice": "v"}, "q": {"voice": "v", "warmup": "synthesize"}}}
+    f = tmp_path / "profiles.json"
+    f.write_text(json.dumps(data))
+    assert load_profile(f, "p").warmup == "off"
+    assert load_profile(f, "q").warmup == "synthesize"
+
+
+def test_load_profile_invalid_warmup(tmp_path):
+    data = {"default_profile": "p", "profiles": {"p": {"voice": "v", "warmup": "always"}}}
+    f = tmp_path / "profiles.json"
+    f.write_text(json.dumps(data))
+    with pytest.raises(ValueError, match="warmup must be one of"):
+        load_profile(f, "")
+
+
+def test_load_profile_transport_settings(tmp_path):
+    settings = {"voice": "v", "keepalive_ms": 60000, "idle_timeout_ms": 3600000, "heartbeat_s": 240}
+    data = {"default_profile": "p", "profiles": {"p": settings}}
+    f = tmp_path / "profiles.json"
+    f.write_text(json.dumps(data))
+    profile = load_profile(f, "")
+    assert (profile.keepalive_ms, profile.idle_timeout_ms, profile.heartbeat_s) == (60000, 3600000, 240)
+
+
+@pytest.mark.parametrize("key", ["keepalive_ms", "idle_timeout_ms", "heartbeat_s"])
+def test_load_profile_invalid_transport_settings(tmp_path, key):
+    data = {"default_profile": "p", "profiles": {"p": {"voice": "v", key: -1}}}
+    f = tmp_path / "profiles.json"
+    f.write_text(json.dumps(data))
+    with pytest.raises(ValueError, match=key):
+        load_profile(f, "")
+
+
+def test_load_profile_retry_settings(tmp_path):
+    settings = {
+        "voice": "v",
+        "request_timeout_s": 8,
+        "max_retries": 4,
+        "retry_backoff_ms": 100,
+        "hedge_percentile": 0.95,
+    }
+    data = {"default_profile": "p", "profiles": {"p": {"voice": "v"}, "q": settings}}
+    f = tmp_path / "profiles.json"
+    f.write_text(json.dumps(data))
+    default = load_profile(f, "p")
+    assert (default.request_timeout_s, default.max_retries, default.retry_backoff_ms) == (0.0, 2, 250)
+    assert default.hedge_percentile == 0.0
+    profile = load_profile(f, "q")
+    assert (profile.request_timeout_s, profile.max_retries, profile.retry_backoff_ms) == (8.0, 4, 100)
+    assert profile.hedge_percentile == 0.95
+
+
+def test_load_profile_rate_limit_settings(tmp_path):
+    settings = {
+        "voice": "v",
+        "rate_limit_requests_per_min": 300,
+        "rate_limit_chars_per_min": 150000,
+        "rate_limit_max_wait_s": 10,
+        "rate_limit_file": "state/rate-limit.json",
+    }
+    data = {"default_profile": "p", "profiles": {"p": {"voice": "v"}, "q": settings}}
+    f = tmp_path / "profiles.json"
+    f.write_text(json.dumps(data))
+    default = load_profile(f, "p")
+    assert (default.rate_limit_requests_per_min, default.rate_limit_chars_per_min) == (0, 0)
+    assert default.rate_limit_max_wait_s == 30.0
+    assert default.rate_limit_file == default_rate_limit_file()
+    profile = load_profile(f, "q")
+    assert (profile.rate_limit_requests_per_min, profile.rate_limit_chars_per_min) == (300, 150000)
+    assert profile.rate_limit_max_wait_s == 10.0
+    assert profile.rate_limit_file == (tmp_path / "state" / "rate-limit.json").resolve()
+
+
+@pytest.mark.parametrize("key", ["rate_limit_requests_per_min", "rate_limit_chars_per_min", "rate_limit_max_wait_s"])
+def test_load_profile_invalid_rate_limit_settings(tmp_path, key):
+    data = {"default_profile": "p", "profiles": {"p": {"voice": "v", key: -1}}}
+    f = tmp_path / "profiles.json"
+    f.write_text(json.dumps(data))
+    with pytest.raises(ValueError, match=key):
+        load_profile(f, "")
+
+
+@pytest.mark.parametrize(
+    ("key", "value"),
+    [("request_timeout_s", -1), ("max_retries", -1), ("retry_backoff_ms", -1), ("hedge_percentile", 1.5)],
+)
+def test_load_profile_invalid_retry_settings(tmp_path, key, value):
+    data = {"default_profile": "p", "profiles": {"p": {"voice": "v", key: value}}}
+    f = tmp_path / "profiles.json"
+    f.write_text(json.dumps(data))
+    with pytest.raises(ValueError, match=key):
+        load_profile(f, "")
+
+
 def test_load_profile_invalid_player_command(tmp_path):
     data = {
         "default_profile": "bad",
@@ -200,94 +404,62 @@ def test_stop_audio_empty_player_name():
     assert result.player == ""
 
 
-@patch("tts_mcp.core.profile.shutil.which")
-@patch("tts_mcp.core.profile.subprocess.run")
-def test_stop_audio_no_running(mock_run, mock_which):
-    mock_which.side_effect = lambda x: f"/usr/bin/{x}"
-    lookup = MagicMock()
-    lookup.returncode = 1  # pgrep returns 1 when no processes found
-    lookup.stdout = ""
-    mock_run.return_value = lookup
-    profile = _make_profile()
-    result = stop_audio(profile)
+def test_stop_audio_nothing_running():
+    result = stop_audio(_make_profile(), registry=PlayerRegistry())
     assert result.attempted is True
     assert result.stopped_processes == 0
 
 
-@patch("tts_mcp.core.profile.shutil.which")
-@patch("tts_mcp.core.profile.subprocess.run")
-def test_stop_audio_kills_processes(mock_run, mock_which):
-    mock_which.side_effect = lambda x: f"/usr/bin/{x}"
+def test_stop_audio_terminates_owned_players_only():
+    registry = PlayerRegistry()
+    owned = registry.spawn(["sh", "-c", "sleep 10 & wait"])
+    foreign = subprocess.Popen(["sleep", "10"])
+    try:
+        result = stop_audio(_make_profile(player_command=["sh", "{file}"]), registry=registry)
+        assert result.stopped_processes == 1
+        assert registry.wait(owned, timeout=5) not in {None, 0}
+        assert foreign.poll() is None
+    finally:
+        foreign.kill()
+        foreign.wait()
 
-    lookup = MagicMock()
-    lookup.returncode = 0
-    lookup.stdout = "123\n456\n"
 
-    kill = MagicMock()
-    kill.returncode = 0
+# -- PlayerRegistry --
 
-    mock_run.side_effect = [lookup, kill]
-    profile = _make_profile()
-    result = stop_audio(profile)
-    assert result.attempted is True
-    assert result.stopped_processes == 2
 
+def test_player_registry_reaps_finished_players():
+    registry = PlayerRegistry()
+    process = registry.spawn(["true"])
+    assert registry.wait(process, timeout=5) == 0
+    assert registry._processes == {}
+    assert registry.running() == []
 
-@patch("tts_mcp.core.profile.shutil.which", return_value=None)
-def test_stop_audio_missing_tools(mock_which):
-    profile = _make_profile()
-    with pytest.raises(RuntimeError, match="missing"):
-        stop_audio(profile)
 
+def test_player_registry_reaps_without_waitid(monkeypatch):
+    monkeypatch.delattr("tts_mcp.core.profile.os.waitid", raising=False)
+    registry = PlayerRegistry()
+    process = registry.spawn(["true"])
+    assert registry.wait(process, timeout=5) == 0
+    assert registry._processes == {}
 
-@patch("tts_mcp.core.profile.shutil.which")
-@patch("tts_mcp.core.profile.subprocess.run")
-def test_stop_audio_lookup_failure(mock_run, mock_which):
-    mock_which.side_effect = lambda x: f"/usr/bin/{x}"
-    lookup = MagicMock()
-    lookup.returncode = 2
-    lookup.stdout = ""
-    mock_run.return_value = lookup
 
-    profile = _make_profile()
-    with pytest.raises(RuntimeError, match="Failed to inspect"):
-        stop_audio(profile)
-
-
-@patch("tts_mcp.core.profile.shutil.which")
-@patch("tts_mcp.core.profile.subprocess.run")
-def test_stop_audio_falls_back_to_killall(mock_run, mock_which):
-    def _which(name: str) -> str | None:
-        if name == "pkill":
-            return None
-        return f"/usr/bin/{name}"
-
-    mock_which.side_effect = _which
-    lookup = MagicMock()
-    lookup.returncode = 0
-    lookup.stdout = "123\n"
-    killall = MagicMock()
-    killall.returncode = 0
-    mock_run.side_effect = [lookup, killall]
-
-    profile = _make_profile()
-    result = stop_audio(profile)
-    assert result.attempted is True
-    assert result.stopped_processes == 1
-    assert mock_run.call_args_list[1].args[0] == ["/usr/bin/killall", "afplay"]
+def test_player_registry_never_signals_reaped_players(monkeypatch):
+    registry = PlayerRegistry()
+    process = registry.spawn(["true"])
+    assert registry.wait(process, timeout=5) == 0
+    signalled = []
+    monkeypatch.setattr("tts_mcp.core.profile.os.killpg", lambda pid, signum: signalled.append(pid))
 
+    registry.terminate(process)
+    assert registry.terminate_all() == 0
+    assert signalled == []
 
-@patch("tts_mcp.core.profile.shutil.which")
-@patch("tts_mcp.core.profile.subprocess.run")
-def test_stop_audio_stop_command_failure(mock_run, mock_which):
-    mock_which.side_effect = lambda x: f"/usr/bin/{x}"
-    lookup = MagicMock()
-    lookup.returncode = 0
-    lookup.stdout = "123\n"
-    stop = MagicMock()
-    stop.returncode = 1
-    mock_run.side_effect = [lookup, stop]
 
-    profile = _make_profile()
-    with pytest.raises(RuntimeError, match="Failed to stop active playback"):
-        stop_audio(profile)
+def test_player_registry_wait_times_out_while_running():
+    registry = PlayerRegistry()
+    process = registry.spawn(["sleep", "10"])
+    try:
+        assert registry.wait(process, timeout=0.05) is None
+    finally:
+        registry.terminate(process)
+    assert registry.wait(process, timeout=5) not in {None, 0}
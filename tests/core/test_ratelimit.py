@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+
+from tts_mcp.core import ratelimit
+from tts_mcp.core.ratelimit import RateLimiter, RateLimitError
+from tts_mcp.core.retry import Retrier
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1_000_000.0
+        self.sleeps: list[float] = []
+
+    def time(self) -> float:
+        return self.now
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(ratelimit, "time", fake)
+    return fake
+
+
+def test_disabled_limiter_touches_nothing(tmp_path):
+    limiter = RateLimiter(tmp_path / "rate-limit.json")
+    assert not limiter.enabled
+    assert limiter.acquire(5000) == 0.0
+    assert not (tmp_path / "rate-limit.json").exists()
+
+
+def test_bursts_up_to_the_limit_without_waiting(tmp_path, clock):
+    limiter = RateLimiter(tmp_path / "rate-limit.json", requests_per_min=3)
+    assert [limiter.acquire(10) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert clock.sleeps == []
+    assert limiter.state()["requests_available"] == 0.0
+
+
+def test_waits_for_the_bucket_to_refill(tmp_path, clock):
+    limiter = RateLimiter(tmp_path / "rate-limit.json", requests_per_min=60, chars_per_min=600)
+    limiter.acquire(600)
+    # The chars bucket is empty and refills at 10 per second.
+    assert limiter.acquire(100) == pytest.approx(10.0)
+    assert clock.sleeps == [pytest.approx(10.0)]
+    state = limiter.state()
+    assert state["waits"] == 1
+    assert state["waited_s"] == pytest.approx(10.0)
+
+
+def test_oversized_call_only_waits_for_a_full_bucket(tmp_path, clock):
+    limiter = RateLimiter(tmp_path / "rate-limit.json", chars_per_min=100, max_wait_s=120)
+    limiter.acquire(50)
+    assert limiter.acquire(5000) == pytest.approx(30.0)
+
+
+def test_rejects_calls_that_would_wait_too_long(tmp_path, clock):
+    limiter = RateLimiter(tmp_path / "rate-limit.json", requests_per_min=1, max_wait_s=5)
+    limiter.acquire(0)
+    with pytest.raises(RateLimitError, match="wait limit"):
+        limiter.acquire(0)
+    assert clock.sleeps == []
+    assert limiter.state()["rejected"] == 1
+
+
+def test_limiters_on_one_file_share_a_budget(tmp_path, clock):
+    state_file = tmp_path / "rate-limit.json"
+    first = RateLimiter(state_file, requests_per_min=2, max_wait_s=0)
+    second = RateLimiter(state_file, requests_per_min=2, max_wait_s=0)
+    first.acquire(0)
+    second.acquire(0)
+    with pytest.raises(RateLimitError):
+        first.acquire(0)
+    assert json.loads(state_file.read_text(encoding="utf-8"))["requests"]["tokens"] == 0.0
+
+
+def test_corrupt_state_file_starts_full(tmp_path, clock):
+    state_file = tmp_path / "rate-limit.json"
+    state_file.write_text('{"requests": "oops"', encoding="utf-8")
+    limiter = RateLimiter(state_file, requests_per_min=5)
+    assert limiter.acquire(0) == 0.0
+    assert limiter.state()["requests_available"] == 4.0
+
+
+def test_state_reports_limits_and_availability(tmp_path, clock):
+    limiter = RateLimiter(tmp_path / "rate-limit.json", chars_per_min=1000, max_wait_s=10)
+    limiter.acquire(250)
+    assert limiter.state() == {
+        "requests_per_min": 0,
+        "chars_per_min": 1000,
+        "max_wait_s": 10,
+        "state_file": str(tmp_path / "rate-limit.json"),
+        "requests_available": None,
+        "chars_available": 750.0,
+        "waits": 0,
+        "waited_s": 0.0,
+        "rejected": 0,
+    }
+
+
+def test_retrier_charges_every_attempt(tmp_path, clock):
+    limiter = RateLimiter(tmp_path / "rate-limit.json", chars_per_min=1000)
+    retrier = Retrier(limiter=limiter)
+    assert retrier.call(lambda **kwargs: kwargs, chars=300, request="r") == {"request": "r"}
+    asyncio.run(retrier.call_async(_echo, chars=200, request="r"))
+    retrier.limit(100)
+    assert limiter.state()["chars_available"] == 400.0
+
+
+async def _echo(**kwargs):
+    return kwargs
@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+from collections import Counter
+from datetime import UTC, datetime
+from pathlib import Path
+
+import pytest
+
+from tts_mcp.core import report
+from tts_mcp.core.report import DayAggregator, percentile, summarize, usage_log_files
+from tts_mcp.core.usage import CsvUsageStore, SqliteUsageStore, UsageRow, append_usage_row
+
+
+def _row(chars, *, voice="en-US-Neural2-D", language="en-US", when=None):
+    return UsageRow(
+        timestamp_utc=when or datetime(2025, 6, 15, 12, 0, 0, tzinfo=UTC),
+        chars=chars,
+        voice=voice,
+        language=language,
+        audio_format="mp3",
+        output_file=Path("out.mp3"),
+    )
+
+
+def _fields(row):
+    return {
+        "timestamp_utc": row.timestamp_utc,
+        "chars": row.chars,
+        "voice": row.voice,
+        "language": row.language,
+        "audio_format": row.audio_format,
+        "output_file": row.output_file,
+        "api_ms": row.api_ms,
+        "profile": row.profile,
+        "cache_hit": row.cache_hit,
+    }
+
+
+def _aggregate(*paths):
+    aggregator = DayAggregator()
+    for path in paths:
+        aggregator.add_csv(path)
+    return aggregator.totals
+
+
+# -- DayAggregator --
+
+
+def test_aggregator_matches_row_by_row_totals_across_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr(report, "READ_CHUNK_BYTES", 97)
+    log = tmp_path / "usage.csv"
+    voices = ["en-US-Neural2-D", "en-US-Chirp3-HD-Fenrir", "de-DE-Wavenet-A"]
+    expected: dict[tuple[str, str, str, str], list[int]] = {}
+    for index in range(300):
+        voice = voices[index % 3]
+        when = datetime(2025, 5 + index % 2, 1 + index % 5, tzinfo=UTC)
+        chars = index * 13 % 90 + 1
+        append_usage_row(
+            log,
+            timestamp_utc=when,
+            chars=chars,
+            voice=voice,
+            language=voice[:5],
+            audio_format="mp3",
+            output_file=tmp_path / f"{index}.mp3",
+        )
+        family = {"en-US-Neural2-D": "Neural2", "en-US-Chirp3-HD-Fenrir": "Chirp3-HD"}.get(voice, "Wavenet")
+        entry = expected.setdefault((when.strftime("%Y-%m-%d"), family, voice[:5], "unknown"), [0, 0])
+        entry[0] += 1
+        entry[1] += chars
+
+    assert _aggregate(log) == expected
+
+
+def test_aggregator_handles_quoted_fields(tmp_path):
+    log = tmp_path / "usage.csv"
+    log.write_text(
+        "timestamp_utc,month,chars,voice,language,format,output_file\n"
+        '2025-06-01T00:00:00+00:00,2025-06,10,en-US-Neural2-D,en-US,mp3,"/tmp/a,b.mp3"\n'
+        "2025-06-01T01:00:00+00:00,2025-06,5,en-US-Neural2-D,en-US,mp3,/tmp/c.mp3\n",
+        encoding="utf-8",
+    )
+    assert _aggregate(log) == {("2025-06-01", "Neural2", "en-US", "unknown"): [2, 15]}
+
+
+def test_aggregator_reads_rollup_and_partitions(tmp_path):
+    log = tmp_path / "usage_log.csv"
+    store = CsvUsageStore(log)
+    store.append(_row(10, when=datetime(2025, 5, 2, tzinfo=UTC)))
+    store.append(_row(4, when=datetime(2025, 5, 2, 8, tzinfo=UTC)))
+    store.append(_row(7))
+
+    files = usage_log_files(log)
+    assert [path.name for path in files] == ["usage_log.rollup.csv", "usage_log-2025-06.csv"]
+    assert _aggregate(*files) == {
+        ("2025-05-02", "Neural2", "en-US", "unknown"): [2, 14],
+        ("2025-06-15", "Neural2", "en-US", "unknown"): [1, 7],
+    }
+
+
+def test_aggregator_reads_sqlite(tmp_path):
+    store = SqliteUsageStore(tmp_path / "usage.sqlite3")
+    store.append_rows([_row(10), _row(5), _row(3, voice="en-US-Chirp3-HD-Fenrir")])
+    store.close()
+
+    aggregator = DayAggregator()
+    aggregator.add_sqlite(tmp_path / "usage.sqlite3")
+    assert aggregator.totals == {
+        ("2025-06-15", "Neural2", "en-US", "unknown"): [2, 15],
+        ("2025-06-15", "Chirp3-HD", "en-US", "unknown"): [1, 3],
+    }
+
+
+# -- summarize --
+
+
+def test_summarize_uses_free_tier_in_date_order():
+    totals = {
+        ("2025-06-01", "Neural2", "en-US", "unknown"): [1, 600_000],
+        ("2025-06-02", "Neural2", "en-US", "unknown"): [1, 600_000],
+        ("2025-07-01", "Neural2", "en-US", "unknown"): [1, 100],
+    }
+    by_day = summarize(totals, group_by="day")
+    assert [(row.key, row.billable_chars) for row in by_day] == [
+        ("2025-06-01", 0),
+        ("2025-06-02", 200_000),
+        ("2025-07-01", 0),
+    ]
+    assert by_day[1].estimated_cost_usd == pytest.approx(3.2)
+
+    by_month = summarize(totals, group_by="month")
+    assert [(row.key, row.requests, row.chars, row.billable_chars) for row in by_month] == [
+        ("2025-06", 2, 1_200_000, 200_000),
+        ("2025-07", 1, 100, 0),
+    ]
+
+
+def test_summarize_splits_billable_chars_on_the_day_the_free_tier_runs_out():
+    totals = {
+        ("2025-06-01", "Neural2", "de-DE", "unknown"): [1, 300_000],
+        ("2025-06-01", "Neural2", "en-US", "unknown"): [1, 900_000],
+    }
+    rows = summarize(totals, group_by="language")
+    assert [(row.key, row.billable_chars) for row in rows] == [("de-DE", 50_000), ("en-US", 150_000)]
+
+
+def test_summarize_filters_month_and_groups_by_family():
+    totals = {
+        ("2025-06-01", "Neural2", "en-US", "unknown"): [1, 10],
+        ("2025-06-01", "Chirp3-HD", "en-US", "unknown"): [1, 20],
+        ("2025-07-01", "Neural2", "en-US", "unknown"): [1, 30],
+    }
+    rows = summarize(totals, group_by="family", month="2025-06")
+    assert [(row.key, row.chars) for row in rows] == [("Chirp3-HD", 20), ("Neural2", 10)]
+
+
+def test_summarize_rejects_unknown_group():
+    with pytest.raises(ValueError, match="group_by"):
+        summarize({}, group_by="voice")
+
+
+# -- latency --
+
+
+def test_aggregator_collects_latency_and_skips_cache_hits(tmp_path):
+    log = tmp_path / "usage.csv"
+    log.write_text(
+        "timestamp_utc,month,chars,voice,language,format,output_file\n"
+        "2025-06-01T00:00:00+00:00,2025-06,10,en-US-Neural2-D,en-US,mp3,old.mp3\n",
+        encoding="utf-8",
+    )
+    for index in range(100):
+        row = _row(10, when=datetime(2025, 6, 1, tzinfo=UTC))
+        row.api_ms, row.profile = float(index + 1), "default"
+        append_usage_row(log, **_fields(row))
+    hit = _row(10, when=datetime(2025, 6, 1, tzinfo=UTC))
+    hit.profile, hit.cache_hit = "default", True
+    append_usage_row(log, **_fields(hit))
+
+    aggregator = DayAggregator(latency=True)
+    aggregator.add_csv(log)
+    assert aggregator.totals == {
+        ("2025-06-01", "Neural2", "en-US", "unknown"): [1, 10],
+        ("2025-06-01", "Neural2", "en-US", "default"): [101, 1000],
+    }
+    assert sum(aggregator.latency[("2025-06-01", "Neural2", "en-US", "default")].values()) == 100
+
+    rows = summarize(aggregator.totals, group_by="profile", latency=aggregator.latency)
+    assert [(row.key, row.api_ms_p50, row.api_ms_p95, row.api_ms_p99) for row in rows] == [
+        ("default", 50.0, 95.0, 99.0),
+        ("unknown", None, None, None),
+    ]
+
+
+def test_aggregator_reads_sqlite_latency(tmp_path):
+    rows = [_row(10), _row(5), _row(3)]
+    rows[0].api_ms, rows[1].api_ms, rows[2].cache_hit = 120.0, 80.0, True
+    store = SqliteUsageStore(tmp_path / "usage.sqlite3")
+    store.append_rows(rows)
+    store.close()
+
+    aggregator = DayAggregator(latency=True)
+    aggregator.add_sqlite(tmp_path / "usage.sqlite3")
+    assert aggregator.totals == {("2025-06-15", "Neural2", "en-US", "unknown"): [3, 15]}
+    assert aggregator.latency == {("2025-06-15", "Neural2", "en-US", "unknown"): {80.0: 1, 120.0: 1}}
+
+
+def test_percentile_uses_nearest_rank():
+    assert percentile(Counter({10.0: 98, 500.0: 2}), 0.95) == 10.0
+    assert percentile(Counter({10.0: 98, 500.0: 2}), 0.99) == 500.0
+    assert percentile(Counter(), 0.5) is None
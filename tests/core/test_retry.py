@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+from google.api_core.exceptions import InvalidArgument, ResourceExhausted, ServiceUnavailable
+
+from tts_mcp.core.metrics import METRICS
+from tts_mcp.core.retry import HEDGE_MIN_SAMPLES, Retrier, RetryPolicy
+
+
+def _counter(name: str) -> float:
+    return METRICS.snapshot()["counters"][name]
+
+
+def _learn(retrier: Retrier) -> None:
+    for _ in range(HEDGE_MIN_SAMPLES):
+        retrier.call(lambda: "ok")
+
+
+# -- deadlines and retries --
+
+
+def test_retries_transient_errors_then_succeeds():
+    fn = MagicMock(side_effect=[ServiceUnavailable("down"), ResourceExhausted("quota"), "audio"])
+    before = _counter("tts_retries_total")
+    retrier = Retrier(RetryPolicy(max_retries=2, backoff_ms=0))
+
+    assert retrier.call(fn, request="r") == "audio"
+    assert fn.call_count == 3
+    fn.assert_called_with(request="r")
+    assert _counter("tts_retries_total") == before + 2
+
+
+def test_gives_up_after_max_retries():
+    fn = MagicMock(side_effect=ServiceUnavailable("down"))
+    retrier = Retrier(RetryPolicy(max_retries=1, backoff_ms=0))
+    with pytest.raises(ServiceUnavailable):
+        retrier.call(fn)
+    assert fn.call_count == 2
+
+
+def test_does_not_retry_other_errors():
+    fn = MagicMock(side_effect=InvalidArgument("bad voice"))
+    with pytest.raises(InvalidArgument):
+        Retrier(RetryPolicy(max_retries=3, backoff_ms=0)).call(fn)
+    assert fn.call_count == 1
+
+
+def test_passes_the_deadline_only_when_set():
+    fn = MagicMock(return_value="audio")
+    Retrier().call(fn, request="r")
+    fn.assert_called_once_with(request="r")
+
+    fn.reset_mock()
+    Retrier(RetryPolicy(timeout_s=2.5)).call(fn, request="r")
+    fn.assert_called_once_with(request="r", timeout=2.5)
+
+
+def test_backoff_is_jittered_and_capped():
+    retrier = Retrier(RetryPolicy(backoff_ms=250))
+    assert all(0 <= retrier.backoff_s(0) <= 0.25 for _ in range(50))
+    assert all(0 <= retrier.backoff_s(2) <= 1.0 for _ in range(50))
+    assert all(0 <= retrier.backoff_s(10) <= 8.0 for _ in range(50))
+
+
+def test_call_async_retries():
+    async def _run() -> str:
+        calls = []
+
+        async def _fn(**kwargs):
+            calls.append(kwargs)
+            if len(calls) == 1:
+                raise ServiceUnavailable("down")
+            return "audio"
+
+        result = await Retrier(RetryPolicy(timeout_s=1.0, backoff_ms=0)).call_async(_fn, request="r")
+        assert calls == [{"request": "r", "timeout": 1.0}] * 2
+        return result
+
+    assert asyncio.run(_run()) == "audio"
+
+
+# -- hedging --
+
+
+def test_hedge_delay_is_learned_from_recent_calls():
+    assert Retrier().hedge_delay_s() is None
+    retrier = Retrier(RetryPolicy(hedge_percentile=0.95))
+    assert retrier.hedge_delay_s() is None
+    _learn(retrier)
+    delay = retrier.hedge_delay_s()
+    assert delay is not None
+    assert delay < 1.0
+    state = retrier.hedge_state()
+    assert state["percentile"] == 0.95
+    assert state["latency_samples"] == HEDGE_MIN_SAMPLES
+
+
+def test_slow_call_is_hedged():
+    retrier = Retrier(RetryPolicy(hedge_percentile=0.5))
+    _learn(retrier)
+    before = _counter("tts_hedges_total")
+    release = threading.Event()
+    calls = []
+
+    def _fn():
+        calls.append(1)
+        if len(calls) == 1:
+            release.wait(5)
+            return "slow"
+        return "fast"
+
+    try:
+        assert retrier.call(_fn) == "fast"
+    finally:
+        release.set()
+    assert len(calls) == 2
+    assert _counter("tts_hedges_total") == before + 1
+
+
+def test_slow_async_call_is_hedged_and_the_loser_cancelled():
+    retrier = Retrier(RetryPolicy(hedge_percentile=0.5))
+    _learn(retrier)
+    cancelled = []
+
+    async def _run() -> str:
+        calls = []
+
+        async def _fn():
+            calls.append(1)
+            if len(calls) == 1:
+                try:
+                    await asyncio.sleep(5)
+                except asyncio.CancelledError:
+                    cancelled.append(True)
+                    raise
+                return "slow"
+            return "fast"
+
+        result = await retrier.call_async(_fn)
+        await asyncio.sleep(0)
+        return result
+
+    assert asyncio.run(_run()) == "fast"
+    assert cancelled == [True]
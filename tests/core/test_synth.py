@@ -1,14 +1,24 @@
 from __future__ import annotations
 
+import asyncio
 import re
+import struct
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 
+from tts_mcp.core.cache import SynthesisCache
+from tts_mcp.core.retry import Retrier, RetryPolicy
 from tts_mcp.core.synth import (
     SynthesisRequest,
     read_text_input,
     sanitize_filename,
+    split_progressive,
+    split_text,
+    synthesize_progressively,
+    synthesize_streaming_to_file,
     synthesize_to_file,
+    synthesize_to_file_async,
     timestamped_output_path,
 )
 
@@ -49,6 +59,11 @@ def test_timestamped_output_path_format(tmp_path):
     assert result.parent == tmp_path
 
 
+def test_timestamped_output_path_unique_within_same_millisecond(tmp_path):
+    paths = {timestamped_output_path(audio_format="mp3", output_dir=tmp_path) for _ in range(50)}
+    assert len(paths) == 50
+
+
 def test_timestamped_output_path_mp3(tmp_path):
     result = timestamped_output_path(audio_format="mp3", output_dir=tmp_path)
     assert result.suffix == ".mp3"
@@ -342,3 +357,369 @@ def test_synthesize_requires_voice_or_language_when_whitespace_only(mock_tts_cli
     )
     with pytest.raises(ValueError, match="Either voice or language"):
         synthesize_to_file(mock_tts_client, req)
+
+
+# -- synthesize_to_file with cache --
+
+
+def _cached_request(output):
+    return SynthesisRequest(
+        text="Tests passed.",
+        ssml=False,
+        voice="en-US-Chirp3-HD-Fenrir",
+        language="en-US",
+        model="",
+        audio_format="mp3",
+        speaking_rate=1.0,
+        pitch=0.0,
+        output_file=output,
+    )
+
+
+def test_synthesize_populates_cache_on_miss(mock_tts_client, tmp_path):
+    cache = SynthesisCache(tmp_path / "cache", max_bytes=1024)
+    result = synthesize_to_file(mock_tts_client, _cached_request(tmp_path / "a.mp3"), cache=cache)
+    assert result.cache_hit is False
+    assert mock_tts_client.synthesize_speech.call_count == 1
+    assert len(list((tmp_path / "cache").glob("*.mp3"))) == 1
+
+
+def test_synthesize_serves_cache_hit_without_api_call(mock_tts_client, tmp_path):
+    cache = SynthesisCache(tmp_path / "cache", max_bytes=1024)
+    synthesize_to_file(mock_tts_client, _cached_request(tmp_path / "a.mp3"), cache=cache)
+    result = synthesize_to_file(mock_tts_client, _cached_request(tmp_path / "b.mp3"), cache=cache)
+
+    assert result.cache_hit is True
+    assert result.bytes_written == 128
+    assert result.api_ms == 0.0
+    assert result.write_ms >= 0.0
+    assert mock_tts_client.synthesize_speech.call_count == 1
+    assert (tmp_path / "b.mp3").read_bytes() == b"\x00" * 128
+
+
+def test_synthesize_without_cache_reports_miss(mock_tts_client, tmp_path):
+    result = synthesize_to_file(mock_tts_client, _cached_request(tmp_path / "a.mp3"))
+    assert result.cache_hit is False
+    assert result.api_ms >= 0.0
+
+
+# -- split_text --
+
+
+def test_split_text_short_text_is_single_chunk():
+    assert split_text("  Hello there.  ", 100) == ["Hello there."]
+
+
+def test_split_text_prefers_sentence_boundaries():
+    text = "First sentence here. Second sentence here. Third one."
+    assert split_text(text, 45) == ["First sentence here. Second sentence here.", "Third one."]
+
+
+def test_split_text_keeps_paragraphs_apart_when_they_do_not_fit():
+    text = "Paragraph one is here.\n\nParagraph two is here."
+    assert split_text(text, 30) == ["Paragraph one is here.", "Paragraph two is here."]
+
+
+def test_split_text_measures_utf8_bytes():
+    text = "é" * 10
+    chunks = split_text(text, 8)
+    assert all(len(chunk.encode("utf-8")) <= 8 for chunk in chunks)
+    assert "".join(chunks) == text
+
+
+def test_split_text_falls_back_to_words():
+    text = "alpha beta gamma delta epsilon"
+    chunks = split_text(text, 12)
+    assert all(len(chunk.encode("utf-8")) <= 12 for chunk in chunks)
+    assert " ".join(chunks) == text
+
+
+def test_split_text_rejects_non_positive_limit():
+    with pytest.raises(ValueError, match="positive"):
+        split_text("hello", 0)
+
+
+# -- synthesize_to_file chunked --
+
+
+def _wav_bytes(samples: bytes) -> bytes:
+    fmt = struct.pack("<HHIIHH", 1, 1, 24000, 48000, 2, 16)
+    body = b"WAVE" + b"fmt " + struct.pack("<I", len(fmt)) + fmt + b"data" + struct.pack("<I", len(samples)) + samples
+    return b"RIFF" + struct.pack("<I", len(body)) + body
+
+
+def _chunked_request(text, output):
+    return SynthesisRequest(
+        text=text,
+        ssml=False,
+        voice="en-US-Neural2-D",
+        language="en-US",
+        model="",
+        audio_format="wav",
+        speaking_rate=1.0,
+        pitch=0.0,
+        output_file=output,
+    )
+
+
+def test_synthesize_chunked_stitches_parts_in_order(tmp_path):
+    client = MagicMock()
+
+    def _synthesize(request):
+        text = request["input"].text
+        response = MagicMock()
+        response.audio_content = _wav_bytes(text[0].encode("ascii") * 4)
+        return response
+
+    client.synthesize_speech.side_effect = _synthesize
+    output = tmp_path / "long.wav"
+    text = "Alpha one two. Bravo three four. Charlie five six."
+    result = synthesize_to_file(client, _chunked_request(text, output), max_chunk_bytes=18, max_workers=3)
+
+    assert client.synthesize_speech.call_count == 3
+    audio = output.read_bytes()
+    assert audio[44:] == b"AAAABBBBCCCC"
+    assert result.bytes_written == len(audio)
+    assert result.chars == len(text)
+
+
+def test_synthesize_chunked_skips_split_when_text_fits(mock_tts_client, tmp_path):
+    synthesize_to_file(mock_tts_client, _chunked_request("Short.", tmp_path / "a.wav"), max_chunk_bytes=100)
+    assert mock_tts_client.synthesize_speech.call_count == 1
+
+
+def test_synthesize_chunked_never_splits_ssml(mock_tts_client, tmp_path):
+    request = _chunked_request("<speak>One. Two. Three.</speak>", tmp_path / "a.wav")
+    request.ssml = True
+    synthesize_to_file(mock_tts_client, request, max_chunk_bytes=8)
+    assert mock_tts_client.synthesize_speech.call_count == 1
+
+
+def test_synthesize_chunked_reports_cache_hit_only_when_all_chunks_hit(tmp_path):
+    client = MagicMock()
+    response = MagicMock()
+    response.audio_content = _wav_bytes(b"\x00\x00")
+    client.synthesize_speech.return_value = response
+    cache = SynthesisCache(tmp_path / "cache", max_bytes=1024)
+    text = "One two three. Four five six."
+
+    first = synthesize_to_file(client, _chunked_request(text, tmp_path / "a.wav"), cache=cache, max_chunk_bytes=16)
+    second = synthesize_to_file(client, _chunked_request(text, tmp_path / "b.wav"), cache=cache, max_chunk_bytes=16)
+
+    assert first.cache_hit is False
+    assert second.cache_hit is True
+    assert client.synthesize_speech.call_count == 2
+
+
+def test_synthesize_retries_transient_errors_with_deadline(mock_tts_client, tmp_path):
+    from google.api_core.exceptions import ServiceUnavailable
+
+    response = mock_tts_client.synthesize_speech.return_value
+    mock_tts_client.synthesize_speech.side_effect = [ServiceUnavailable("down"), response]
+    retrier = Retrier(RetryPolicy(timeout_s=10.0, backoff_ms=0))
+
+    result = synthesize_to_file(mock_tts_client, _chunked_request("hello", tmp_path / "a.wav"), retrier=retrier)
+
+    assert result.bytes_written == 128
+    assert mock_tts_client.synthesize_speech.call_count == 2
+    assert mock_tts_client.synthesize_speech.call_args.kwargs["timeout"] == 10.0
+
+
+# -- synthesize_to_file_async --
+
+
+def test_synthesize_async_writes_file(mock_tts_async_client, tmp_path):
+    output = tmp_path / "async.wav"
+    result = asyncio.run(synthesize_to_file_async(mock_tts_async_client, _chunked_request("hello", output)))
+    assert output.read_bytes() == b"\x00" * 128
+    assert result.bytes_written == 128
+    mock_tts_async_client.synthesize_speech.assert_awaited_once()
+
+
+def test_synthesize_async_retries_transient_errors(mock_tts_async_client, tmp_path):
+    from google.api_core.exceptions import DeadlineExceeded
+
+    response = mock_tts_async_client.synthesize_speech.return_value
+    mock_tts_async_client.synthesize_speech = AsyncMock(side_effect=[DeadlineExceeded("slow"), response])
+    retrier = Retrier(RetryPolicy(backoff_ms=0))
+
+    result = asyncio.run(
+        synthesize_to_file_async(mock_tts_async_client, _chunked_request("hello", tmp_path / "a.wav"), retrier=retrier)
+    )
+
+    assert result.bytes_written == 128
+    assert mock_tts_async_client.synthesize_speech.await_count == 2
+
+
+def test_synthesize_async_overlaps_chunks_up_to_max_workers(tmp_path):
+    active = 0
+    peak = 0
+
+    async def _synthesize(request):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        response = MagicMock()
+        response.audio_content = _wav_bytes(request["input"].text[0].encode("ascii") * 2)
+        return response
+
+    client = MagicMock()
+    client.synthesize_speech = AsyncMock(side_effect=_synthesize)
+    output = tmp_path / "long.wav"
+    text = "Alpha one two. Bravo three four. Charlie five six."
+    asyncio.run(synthesize_to_file_async(client, _chunked_request(text, output), max_chunk_bytes=18, max_workers=2))
+
+    assert peak == 2
+    assert output.read_bytes()[44:] == b"AABBCC"
+
+
+def test_synthesize_async_uses_cache(mock_tts_async_client, tmp_path):
+    cache = SynthesisCache(tmp_path / "cache", max_bytes=1024)
+    first = asyncio.run(
+        synthesize_to_file_async(mock_tts_async_client, _chunked_request("hello", tmp_path / "a.wav"), cache=cache)
+    )
+    second = asyncio.run(
+        synthesize_to_file_async(mock_tts_async_client, _chunked_request("hello", tmp_path / "b.wav"), cache=cache)
+    )
+    assert (first.cache_hit, second.cache_hit) == (False, True)
+    assert mock_tts_async_client.synthesize_speech.await_count == 1
+
+
+# -- synthesize_progressively --
+
+
+def test_split_progressive_isolates_first_sentence():
+    text = "Build finished. All tests passed. Coverage is ninety percent."
+    assert split_progressive(text, 4500) == ["Build finished.", "All tests passed. Coverage is ninety percent."]
+
+
+def test_split_progressive_single_sentence():
+    assert split_progressive("Done.", 4500) == ["Done."]
+
+
+def test_synthesize_progressively_hands_chunks_over_in_order(tmp_path):
+    client = MagicMock()
+
+    def _synthesize(request):
+        response = MagicMock()
+        response.audio_content = _wav_bytes(request["input"].text[0].encode("ascii") * 2)
+        return response
+
+    client.synthesize_speech.side_effect = _synthesize
+    received: list[bytes] = []
+    output = tmp_path / "progressive.wav"
+    text = "Alpha first. Bravo second one. Charlie third one."
+
+    result = synthesize_progressively(
+        client, _chunked_request(text, output), on_chunk=received.append, max_chunk_bytes=18
+    )
+
+    assert [part[44:] for part in received] == [b"AA", b"BB", b"CC"]
+    assert output.read_bytes()[44:] == b"AABBCC"
+    assert result.bytes_written == len(output.read_bytes())
+
+
+def test_synthesize_progressively_keeps_ssml_whole(mock_tts_client, tmp_path):
+    request = _chunked_request("<speak>One. Two.</speak>", tmp_path / "a.wav")
+    request.ssml = True
+    received: list[bytes] = []
+    synthesize_progressively(mock_tts_client, request, on_chunk=received.append)
+    assert len(received) == 1
+    assert mock_tts_client.synthesize_speech.call_count == 1
+
+
+# -- synthesize_streaming_to_file --
+
+
+def _streaming_client(*responses: bytes) -> MagicMock:
+    client = MagicMock()
+    client.sent = []
+
+    def _stream(requests):
+        client.sent.extend(requests)
+        for audio in responses:
+            response = MagicMock()
+            response.audio_content = audio
+            yield response
+
+    client.streaming_synthesize.side_effect = _stream
+    return client
+
+
+def _streaming_request(text, output, audio_format="wav"):
+    request = _chunked_request(text, output)
+    request.voice = "en-US-Chirp3-HD-Charon"
+    request.audio_format = audio_format
+    return request
+
+
+def test_synthesize_streaming_writes_valid_wav(tmp_path):
+    client = _streaming_client(b"\x01\x00" * 3, b"", b"\x02\x00" * 2)
+    output = tmp_path / "stream.wav"
+    received: list[bytes] = []
+
+    result = synthesize_streaming_to_file(
+        client, _streaming_request("Hello there. Bye now.", output), on_chunk=received.append, max_chunk_bytes=13
+    )
+
+    audio = output.read_bytes()
+    assert audio[:4] == b"RIFF"
+    assert struct.unpack_from("<I", audio, 4)[0] == len(audio) - 8
+    assert struct.unpack_from("<I", audio, 40)[0] == 10
+    assert audio[44:] == b"\x01\x00" * 3 + b"\x02\x00" * 2
+    assert [part[44:] for part in received] == [b"\x01\x00" * 3, b"\x02\x00" * 2]
+    assert result.bytes_written == len(audio)
+
+    config, *inputs = client.sent
+    assert config.streaming_config.streaming_audio_config.sample_rate_hertz == 24000
+    assert [item.input.text for item in inputs] == ["Hello there.", "Bye now."]
+
+
+def test_synthesize_streaming_ogg_delivers_whole_file(tmp_path):
+    client = _streaming_client(b"OggS-one", b"OggS-two")
+    received: list[bytes] = []
+    synthesize_streaming_to_file(client, _streaming_request("Hi.", tmp_path / "a.ogg", "ogg"), on_chunk=received.append)
+    assert received == [b"OggS-oneOggS-two"]
+
+
+def test_synthesize_streaming_takes_deadline_and_rate_limit_from_retrier(tmp_path):
+    client = _streaming_client(b"OggS")
+    stream = client.streaming_synthesize.side_effect
+    client.streaming_synthesize.side_effect = lambda requests, **_kwargs: stream(requests)
+    limiter = MagicMock()
+    retrier = Retrier(RetryPolicy(timeout_s=30.0), limiter=limiter)
+
+    synthesize_streaming_to_file(client, _streaming_request("Hello.", tmp_path / "a.ogg", "ogg"), retrier=retrier)
+
+    assert client.streaming_synthesize.call_args.kwargs == {"timeout": 30.0}
+    limiter.acquire.assert_called_once_with(len("Hello."))
+
+
+def test_synthesize_streaming_rejects_unsupported_requests(tmp_path):
+    client = _streaming_client()
+    with pytest.raises(ValueError, match="wav and ogg"):
+        synthesize_streaming_to_file(client, _streaming_request("Hi.", tmp_path / "a.mp3", "mp3"))
+    request = _streaming_request("<speak>Hi.</speak>", tmp_path / "a.wav")
+    request.ssml = True
+    with pytest.raises(ValueError, match="SSML"):
+        synthesize_streaming_to_file(client, request)
+    client.streaming_synthesize.assert_not_called()
+
+
+def test_synthesize_streaming_uses_cache(tmp_path):
+    client = _streaming_client(b"\x05\x00" * 4)
+    cache = SynthesisCache(tmp_path / "cache", max_bytes=1024)
+
+    first = synthesize_streaming_to_file(client, _streaming_request("Hi.", tmp_path / "a.wav"), cache=cache)
+    received: list[bytes] = []
+    second = synthesize_streaming_to_file(
+        client, _streaming_request("Hi.", tmp_path / "b.wav"), cache=cache, on_chunk=received.append
+    )
+
+    assert first.cache_hit is False
+    assert second.cache_hit is True
+    assert client.streaming_synthesize.call_count == 1
+    assert received == [(tmp_path / "a.wav").read_bytes()]
+    assert (tmp_path / "b.wav").read_bytes() == (tmp_path / "a.wav").read_bytes()
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import pytest
+
+from tts_mcp.core import timing
+from tts_mcp.core.timing import StageTimer, format_timings
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(timing.time, "perf_counter", lambda: now[0])
+    return now
+
+
+def test_stage_timer_records_stages_in_order(clock):
+    timer = StageTimer()
+    with timer.stage("read_text"):
+        clock[0] += 0.0012
+    with timer.stage("synthesize"):
+        clock[0] += 0.25
+    timer.add("api", 240.04)
+    clock[0] += 0.01
+
+    assert timer.as_dict() == {"read_text": 1.2, "synthesize": 250.0, "api": 240.0, "total": 261.2}
+
+
+def test_stage_timer_adds_repeated_stages_and_records_failures(clock):
+    timer = StageTimer()
+    with timer.stage("write"):
+        clock[0] += 0.002
+
+    def _fail() -> None:
+        with timer.stage("write"):
+            clock[0] += 0.003
+            raise OSError("disk full")
+
+    with pytest.raises(OSError, match="disk full"):
+        _fail()
+
+    assert timer.as_dict()["write"] == 5.0
+
+
+def test_format_timings():
+    assert format_timings({"api": 180.5, "total": 200.0}) == "api 180.5 ms, total 200 ms"
@@ -1,14 +1,37 @@
 from __future__ import annotations
 
 import csv
+import json
+import multiprocessing
+import sqlite3
+import threading
+import time
 from datetime import UTC, datetime
+from pathlib import Path
 
+import pytest
+
+from tts_mcp.core import usage
+from tts_mcp.core.report import DayAggregator
 from tts_mcp.core.usage import (
+    BufferedUsageStore,
+    CsvUsageStore,
+    SqliteUsageStore,
+    UsageRow,
     append_usage_row,
     create_usage_snapshot,
     detect_family,
     month_chars_by_family,
     month_total_chars,
+    open_usage_store,
+    partition_path,
+    rollup_path,
+    rotate_usage_log,
+    totals_path,
+    usage_db_path,
+    usage_partitions,
+    usage_snapshot,
+    usage_totals,
 )
 
 
@@ -210,3 +233,510 @@ def test_create_usage_snapshot_multiple_families(tmp_path):
     assert wavenet.chars == 100
     assert wavenet.billable_chars == 0
     assert wavenet.estimated_cost_usd == 0.0
+
+
+# -- usage_totals --
+
+
+def _append(log, *, chars, voice="en-US-Neural2-D", when=None):
+    append_usage_row(
+        log,
+        timestamp_utc=when or datetime(2025, 6, 15, 12, 0, 0, tzinfo=UTC),
+        chars=chars,
+        voice=voice,
+        language="en-US",
+        audio_format="mp3",
+        output_file=log.parent / "test.mp3",
+    )
+
+
+def test_usage_totals_maintained_by_append(tmp_path):
+    log = tmp_path / "usage.csv"
+    _append(log, chars=10)
+    _append(log, chars=5, voice="en-US-Chirp3-HD-Fenrir")
+    _append(log, chars=7, when=datetime(2025, 7, 1, tzinfo=UTC))
+
+    sidecar = json.loads(totals_path(log).read_text())
+    assert sidecar["log_size"] == log.stat().st_size
+    assert sidecar["months"] == {"2025-06": {"Neural2": 10, "Chirp3-HD": 5}, "2025-07": {"Neural2": 7}}
+
+
+def test_create_usage_snapshot_reads_sidecar_without_parsing_csv(tmp_path, monkeypatch):
+    log = tmp_path / "usage.csv"
+    _append(log, chars=10)
+
+    def _no_csv(*args, **kwargs):
+        raise AssertionError("CSV should not be parsed while the sidecar is current")
+
+    monkeypatch.setattr(usage.csv, "DictReader", _no_csv)
+    snapshot = create_usage_snapshot(
+        log, chars_this_request=10, voice="en-US-Neural2-D", now_utc=datetime(2025, 6, 20, tzinfo=UTC)
+    )
+    assert snapshot.month_to_date_by_family["Neural2"].chars == 10
+
+
+def test_usage_totals_rebuilds_when_sidecar_missing(tmp_path):
+    log = tmp_path / "usage.csv"
+    _append(log, chars=10)
+    totals_path(log).unlink()
+    assert usage_totals(log) == {"2025-06": {"Neural2": 10}}
+    assert totals_path(log).exists()
+
+
+def test_usage_totals_rebuilds_when_log_changed_externally(tmp_path):
+    log = tmp_path / "usage.csv"
+    _append(log, chars=10)
+    with log.open("a", encoding="utf-8") as handle:
+        handle.write("2025-06-16T00:00:00+00:00,2025-06,90,en-US-Neural2-D,en-US,mp3,x.mp3\n")
+
+    assert usage_totals(log) == {"2025-06": {"Neural2": 100}}
+    _append(log, chars=1)
+    assert usage_totals(log) == {"2025-06": {"Neural2": 101}}
+
+
+def test_usage_totals_rebuilds_when_sidecar_corrupt(tmp_path):
+    log = tmp_path / "usage.csv"
+    _append(log, chars=10)
+    totals_path(log).write_text("{not json")
+    assert usage_totals(log) == {"2025-06": {"Neural2": 10}}
+
+
+def test_usage_totals_missing_log(tmp_path):
+    assert usage_totals(tmp_path / "missing.csv") == {}
+
+
+# -- month seeking --
+
+
+def _write_log(path, rows):
+    lines = ["timestamp_utc,month,chars,voice,language,format,output_file"]
+    lines += [f"{month}-01T00:00:00+00:00,{month},{chars},en-US-Neural2-D,en-US,mp3,out.mp3" for month, chars in rows]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def test_month_queries_match_full_scan_across_many_months(tmp_path):
+    months = [f"{year}-{month:02d}" for year in (2024, 2025) for month in range(1, 13)]
+    # Uneven, sometimes empty months so probes land on every kind of boundary.
+    rows = [(month, index * 37 % 500 + 1) for index, month in enumerate(months) for _ in range(index * 7 % 31)]
+    log = tmp_path / "usage.csv"
+    _write_log(log, rows)
+
+    for month in [*months, "2023-12", "2026-01"]:
+        expected = sum(chars for row_month, chars in rows if row_month == month)
+        assert month_total_chars(log, month) == expected
+        assert month_chars_by_family(log, month) == ({"Neural2": expected} if expected else {})
+
+
+def test_month_queries_count_rows_written_out_of_order(tmp_path):
+    log = tmp_path / "usage.csv"
+    _write_log(log, [("2025-06", 10), ("2025-07", 3), ("2025-06", 5), ("2025-05", 1), ("2025-06", 2)])
+    assert month_total_chars(log, "2025-06") == 17
+    assert month_chars_by_family(log, "2025-06") == {"Neural2": 17}
+
+
+def test_month_queries_handle_other_column_layouts(tmp_path):
+    log = tmp_path / "usage.csv"
+    log.write_text("month,chars,voice\n2025-07,3,en-US-Neural2-D\n2025-06,4,en-US-Neural2-D\n", encoding="utf-8")
+    assert month_total_chars(log, "2025-06") == 4
+
+
+# -- usage stores --
+
+
+def _row(*, chars, voice="en-US-Neural2-D", when=None, output_file=Path("test.mp3")):
+    return UsageRow(
+        timestamp_utc=when or datetime(2025, 6, 15, 12, 0, 0, tzinfo=UTC),
+        chars=chars,
+        voice=voice,
+        language="en-US",
+        audio_format="mp3",
+        output_file=output_file,
+    )
+
+
+def _store_append(store, *, chars, voice="en-US-Neural2-D", when=None):
+    store.append(_row(chars=chars, voice=voice, when=when, output_file=store.path.parent / "test.mp3"))
+
+
+def test_sqlite_store_aggregates_by_month_and_family(tmp_path):
+    store = SqliteUsageStore(tmp_path / "usage.sqlite3")
+    _store_append(store, chars=10)
+    _store_append(store, chars=5, voice="en-US-Chirp3-HD-Fenrir")
+    _store_append(store, chars=20)
+    _store_append(store, chars=7, when=datetime(2025, 7, 1, tzinfo=UTC))
+
+    assert store.month_chars_by_family("2025-06") == {"Neural2": 30, "Chirp3-HD": 5}
+    assert store.month_chars_by_family("2025-07") == {"Neural2": 7}
+    assert store.month_chars_by_family("2025-08") == {}
+    assert store.month_total_chars("2025-06") == 35
+    assert store.month_total_chars("2025-08") == 0
+
+
+def test_sqlite_store_uses_wal_and_indexes(tmp_path):
+    store = SqliteUsageStore(tmp_path / "usage.sqlite3")
+    store.close()
+    conn = sqlite3.connect(tmp_path / "usage.sqlite3")
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    plan = conn.execute(
+        "EXPLAIN QUERY PLAN SELECT family, SUM(chars) FROM usage WHERE month = '2025-06' GROUP BY family"
+    ).fetchall()
+    assert "usage_month_family" in str(plan)
+    conn.close()
+
+
+def test_sqlite_store_csv_round_trip(tmp_path):
+    source = tmp_path / "usage.csv"
+    _append(source, chars=10)
+    _append(source, chars=5, voice="en-US-Chirp3-HD-Fenrir")
+
+    store = SqliteUsageStore(tmp_path / "usage.sqlite3")
+    assert store.import_csv(source) == 2
+    assert store.month_chars_by_family("2025-06") == {"Neural2": 10, "Chirp3-HD": 5}
+
+    exported = tmp_path / "export.csv"
+    assert store.export_csv(exported) == 2
+    assert exported.read_text() == source.read_text()
+
+
+def test_snapshot_matches_between_stores(tmp_path):
+    now = datetime(2025, 6, 20, tzinfo=UTC)
+    stores = [CsvUsageStore(tmp_path / "usage.csv"), SqliteUsageStore(tmp_path / "usage.sqlite3")]
+    for store in stores:
+        _store_append(store, chars=100)
+        _store_append(store, chars=50, voice="en-US-Chirp3-HD-Fenrir")
+
+    csv_snap, sqlite_snap = (
+        usage_snapshot(store, chars_this_request=50, voice="en-US-Chirp3-HD-Fenrir", now_utc=now) for store in stores
+    )
+    assert csv_snap == sqlite_snap
+
+
+def test_open_usage_store_sqlite_imports_existing_csv_once(tmp_path):
+    log = tmp_path / "usage_log.csv"
+    _append(log, chars=10)
+
+    store = open_usage_store(log, "sqlite")
+    assert isinstance(store, SqliteUsageStore)
+    assert store.path == tmp_path / "usage_log.sqlite3"
+    assert store.month_chars_by_family("2025-06") == {"Neural2": 10}
+    store.close()
+
+    reopened = open_usage_store(log, "sqlite")
+    assert reopened.month_chars_by_family("2025-06") == {"Neural2": 10}
+
+
+class _SlowSqliteUsageStore(SqliteUsageStore):
+    # Widens the gap between checking for the database and creating it.
+    def __init__(self, path: Path) -> None:
+        time.sleep(0.2)
+        super().__init__(path)
+
+
+def _open_sqlite_store(log_path: str, start) -> None:
+    usage.SqliteUsageStore = _SlowSqliteUsageStore
+    start.wait()
+    open_usage_store(Path(log_path), "sqlite").close()
+
+
+def test_open_usage_store_sqlite_imports_once_when_servers_start_together(tmp_path):
+    log = tmp_path / "usage_log.csv"
+    _append(log, chars=10)
+    ctx = multiprocessing.get_context("fork")
+    start = ctx.Barrier(4)
+    workers = [ctx.Process(target=_open_sqlite_store, args=(str(log), start)) for _ in range(4)]
+    for proc in workers:
+        proc.start()
+    for proc in workers:
+        proc.join(timeout=30)
+        assert proc.exitcode == 0
+
+    assert SqliteUsageStore(usage_db_path(log)).month_chars_by_family("2025-06") == {"Neural2": 10}
+
+
+def test_open_usage_store_csv(tmp_path):
+    store = open_usage_store(tmp_path / "usage.csv", "csv")
+    assert isinstance(store, CsvUsageStore)
+
+
+def _append_many(db_path: str, worker: int) -> None:
+    store = SqliteUsageStore(Path(db_path))
+    for _ in range(50):
+        _store_append(store, chars=worker + 1)
+
+
+def test_sqlite_store_handles_concurrent_processes(tmp_path):
+    db_path = tmp_path / "usage.sqlite3"
+    SqliteUsageStore(db_path).close()
+    ctx = multiprocessing.get_context("fork")
+    workers = [ctx.Process(target=_append_many, args=(str(db_path), n)) for n in range(4)]
+    for proc in workers:
+        proc.start()
+    for proc in workers:
+        proc.join(timeout=30)
+        assert proc.exitcode == 0
+
+    assert SqliteUsageStore(db_path).month_total_chars("2025-06") == 50 * (1 + 2 + 3 + 4)
+
+
+# -- BufferedUsageStore --
+
+
+def test_buffered_store_queues_rows_until_flush(tmp_path):
+    log = tmp_path / "usage.csv"
+    store = BufferedUsageStore(CsvUsageStore(log), flush_rows=100, flush_ms=60_000)
+    store.append(_row(chars=10))
+    store.append(_row(chars=5, voice="en-US-Chirp3-HD-Fenrir"))
+
+    assert not partition_path(log, "2025-06").exists()
+    assert store.pending() == 2
+    assert store.month_chars_by_family("2025-06") == {"Neural2": 10, "Chirp3-HD": 5}
+
+    store.flush()
+    assert store.pending() == 0
+    assert month_chars_by_family(partition_path(log, "2025-06"), "2025-06") == {"Neural2": 10, "Chirp3-HD": 5}
+    assert store.month_chars_by_family("2025-06") == {"Neural2": 10, "Chirp3-HD": 5}
+    store.close()
+
+
+def test_buffered_store_counters_include_existing_log(tmp_path):
+    log = tmp_path / "usage.csv"
+    _append(partition_path(log, "2025-06"), chars=100)
+    store = BufferedUsageStore(CsvUsageStore(log), flush_rows=100, flush_ms=60_000)
+
+    assert store.month_chars_by_family("2025-06") == {"Neural2": 100}
+    store.append(_row(chars=7))
+    assert store.month_chars_by_family("2025-06") == {"Neural2": 107}
+    store.close()
+    assert month_total_chars(partition_path(log, "2025-06"), "2025-06") == 107
+
+
+def test_buffered_store_flushes_when_batch_is_full(tmp_path):
+    log = tmp_path / "usage.csv"
+    store = BufferedUsageStore(CsvUsageStore(log), flush_rows=3, flush_ms=60_000)
+    for _ in range(3):
+        store.append(_row(chars=1))
+    deadline = time.monotonic() + 5
+    while store.pending() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert month_total_chars(partition_path(log, "2025-06"), "2025-06") == 3
+    store.close()
+
+
+def test_buffered_store_flushes_after_interval(tmp_path):
+    log = tmp_path / "usage.csv"
+    written = threading.Event()
+
+    class _SignallingStore(CsvUsageStore):
+        def append_rows(self, rows):
+            super().append_rows(rows)
+            written.set()
+
+    store = BufferedUsageStore(_SignallingStore(log), flush_rows=100, flush_ms=20)
+    store.append(_row(chars=4))
+    assert written.wait(5)
+    store.flush()
+    assert store.pending() == 0
+    assert month_total_chars(partition_path(log, "2025-06"), "2025-06") == 4
+    store.close()
+
+
+def test_buffered_store_close_flushes_and_later_appends_write_through(tmp_path):
+    log = tmp_path / "usage.csv"
+    store = BufferedUsageStore(CsvUsageStore(log), flush_rows=100, flush_ms=60_000)
+    store.append(_row(chars=2))
+    store.close()
+    assert month_total_chars(partition_path(log, "2025-06"), "2025-06") == 2
+
+    store.append(_row(chars=3))
+    assert month_total_chars(partition_path(log, "2025-06"), "2025-06") == 5
+
+
+def test_buffered_store_keeps_rows_when_write_fails(tmp_path):
+    blocker = tmp_path / "not-a-dir"
+    blocker.write_text("")
+    store = BufferedUsageStore(CsvUsageStore(blocker / "usage.csv"), flush_rows=100, flush_ms=60_000)
+    store.append(_row(chars=2))
+
+    with pytest.raises(OSError, match="not-a-dir"):
+        store.flush()
+    assert store.pending() == 1
+    assert store.last_error
+
+
+# -- monthly partitions --
+
+
+def test_csv_store_writes_monthly_partitions(tmp_path):
+    log = tmp_path / "usage_log.csv"
+    store = CsvUsageStore(log)
+    store.append(_row(chars=10))
+
+    assert not log.exists()
+    assert usage_partitions(log) == {"2025-06": tmp_path / "usage_log-2025-06.csv"}
+    assert month_total_chars(partition_path(log, "2025-06"), "2025-06") == 10
+
+
+def test_csv_store_compacts_closed_months_into_rollup(tmp_path):
+    log = tmp_path / "usage_log.csv"
+    store = CsvUsageStore(log)
+    store.append(_row(chars=10, when=datetime(2025, 6, 1, 9, tzinfo=UTC)))
+    store.append(_row(chars=5, when=datetime(2025, 6, 1, 17, tzinfo=UTC)))
+    store.append(_row(chars=7, voice="en-US-Chirp3-HD-Fenrir", when=datetime(2025, 6, 2, tzinfo=UTC)))
+    store.append(_row(chars=3, when=datetime(2025, 7, 1, tzinfo=UTC)))
+
+    assert list(usage_partitions(log)) == ["2025-07"]
+    assert not totals_path(partition_path(log, "2025-06")).exists()
+    assert rollup_path(log).read_text().splitlines() == [
+        "day,voice,language,format,profile,requests,chars",
+        "2025-06-01,en-US-Neural2-D,en-US,mp3,,2,15",
+        "2025-06-02,en-US-Chirp3-HD-Fenrir,en-US,mp3,,1,7",
+    ]
+    assert store.month_chars_by_family("2025-06") == {"Neural2": 15, "Chirp3-HD": 7}
+    assert store.month_chars_by_family("2025-07") == {"Neural2": 3}
+
+
+def test_csv_store_merges_late_rows_into_existing_rollup(tmp_path):
+    log = tmp_path / "usage_log.csv"
+    store = CsvUsageStore(log)
+    store.append(_row(chars=10))
+    store.append(_row(chars=1, when=datetime(2025, 7, 1, tzinfo=UTC)))
+    store.append(_row(chars=5))
+    rotate_usage_log(log, "2025-07")
+
+    assert list(usage_partitions(log)) == ["2025-07"]
+    assert store.month_chars_by_family("2025-06") == {"Neural2": 15}
+
+
+def test_csv_store_current_month_reads_only_its_partition(tmp_path, monkeypatch):
+    log = tmp_path / "usage_log.csv"
+    store = CsvUsageStore(log)
+    now = datetime.now(UTC)
+    store.append(_row(chars=9, when=now))
+
+    def _no_rollup(*args, **kwargs):
+        raise AssertionError("the rollup should not be read for the current month")
+
+    monkeypatch.setattr(usage, "_read_rollup", _no_rollup)
+    snapshot = usage_snapshot(store, chars_this_request=9, voice="en-US-Neural2-D", now_utc=now)
+    assert snapshot.month_to_date_by_family["Neural2"].chars == 9
+
+
+def test_rotate_splits_single_file_log(tmp_path):
+    log = tmp_path / "usage_log.csv"
+    _write_log(log, [("2025-05", 4), ("2025-06", 6), ("2025-06", 1)])
+    _append(log, chars=2)
+
+    rotate_usage_log(log, "2025-06")
+
+    assert not log.exists()
+    assert not totals_path(log).exists()
+    assert list(usage_partitions(log)) == ["2025-06"]
+    store = CsvUsageStore(log)
+    assert store.month_chars_by_family("2025-05") == {"Neural2": 4}
+    assert store.month_chars_by_family("2025-06") == {"Neural2": 9}
+
+
+def test_open_usage_store_sqlite_imports_partitions_and_rollup(tmp_path):
+    log = tmp_path / "usage_log.csv"
+    csv_store = CsvUsageStore(log)
+    csv_store.append(_row(chars=10))
+    csv_store.append(_row(chars=3, when=datetime(2025, 7, 1, tzinfo=UTC)))
+
+    store = open_usage_store(log, "sqlite")
+    assert store.month_chars_by_family("2025-06") == {"Neural2": 10}
+    assert store.month_chars_by_family("2025-07") == {"Neural2": 3}
+
+
+def test_open_usage_store_sqlite_keeps_rollup_request_counts(tmp_path):
+    log = tmp_path / "usage_log.csv"
+    csv_store = CsvUsageStore(log)
+    csv_store.append_rows([_row(chars=10), _row(chars=4), _row(chars=3)])
+    csv_store.append(_row(chars=1, when=datetime(2025, 7, 1, tzinfo=UTC)))
+    assert rollup_path(log).exists()
+    assert "2025-06" not in usage_partitions(log)
+
+    store = open_usage_store(log, "sqlite")
+    assert store.month_chars_by_family("2025-06") == {"Neural2": 17}
+    store.close()
+    aggregator = DayAggregator()
+    aggregator.add_sqlite(usage_db_path(log))
+    assert aggregator.totals[("2025-06-15", "Neural2", "en-US", "unknown")] == [3, 17]
+
+
+# -- latency, audio size, profile and cache-hit columns --
+
+
+def test_append_upgrades_old_header_and_keeps_old_rows(tmp_path):
+    log = tmp_path / "usage.csv"
+    _write_log(log, [("2025-06", 10)])
+    append_usage_row(
+        log,
+        timestamp_utc=datetime(2025, 6, 15, tzinfo=UTC),
+        chars=5,
+        voice="en-US-Neural2-D",
+        language="en-US",
+        audio_format="mp3",
+        output_file=tmp_path / "test.mp3",
+        api_ms=182.4,
+        write_ms=0.6,
+        audio_bytes=2048,
+        profile="default",
+    )
+
+    with log.open(newline="", encoding="utf-8") as handle:
+        rows = list(csv.DictReader(handle))
+    assert [row["chars"] for row in rows] == ["10", "5"]
+    assert (rows[1]["api_ms"], rows[1]["write_ms"], rows[1]["audio_bytes"]) == ("182.4", "0.6", "2048")
+    assert (rows[1]["profile"], rows[1]["cache_hit"]) == ("default", "0")
+    old = UsageRow.from_csv(rows[0])
+    assert (old.api_ms, old.audio_bytes, old.profile, old.cache_hit) == (0.0, 0, "", False)
+    assert month_total_chars(log, "2025-06") == 15
+
+
+def test_cache_hits_are_logged_but_not_billed(tmp_path):
+    hit = UsageRow(
+        timestamp_utc=datetime(2025, 6, 15, tzinfo=UTC),
+        chars=40,
+        voice="en-US-Neural2-D",
+        language="en-US",
+        audio_format="mp3",
+        output_file=tmp_path / "test.mp3",
+        cache_hit=True,
+    )
+    stores = [CsvUsageStore(tmp_path / "usage.csv"), SqliteUsageStore(tmp_path / "usage.sqlite3")]
+    for store in stores:
+        _store_append(store, chars=10)
+        store.append(hit)
+        assert store.month_chars_by_family("2025-06") == {"Neural2": 10}
+
+    buffered = BufferedUsageStore(CsvUsageStore(tmp_path / "buffered.csv"), flush_rows=100, flush_ms=60_000)
+    assert buffered.month_chars_by_family("2025-06") == {}
+    buffered.append(hit)
+    assert buffered.month_chars_by_family("2025-06") == {"Neural2": 0}
+    buffered.close()
+    with partition_path(tmp_path / "buffered.csv", "2025-06").open(newline="", encoding="utf-8") as handle:
+        assert [row["cache_hit"] for row in csv.DictReader(handle)] == ["1"]
+
+
+def test_sqlite_store_adds_new_columns_to_old_database(tmp_path):
+    db_path = tmp_path / "usage.sqlite3"
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE usage (id INTEGER PRIMARY KEY, timestamp_utc TEXT NOT NULL, month TEXT NOT NULL,"
+        " family TEXT NOT NULL, chars INTEGER NOT NULL, voice TEXT NOT NULL, language TEXT NOT NULL,"
+        " format TEXT NOT NULL, output_file TEXT NOT NULL)"
+    )
+    conn.execute(
+        "INSERT INTO usage (timestamp_utc, month, family, chars, voice, language, format, output_file)"
+        " VALUES ('2025-06-01T00:00:00+00:00', '2025-06', 'Neural2', 10, 'en-US-Neural2-D', 'en-US', 'mp3', 'a.mp3')"
+    )
+    conn.commit()
+    conn.close()
+
+    store = SqliteUsageStore(db_path)
+    _store_append(store, chars=5)
+    assert store.month_chars_by_family("2025-06") == {"Neural2": 15}
+    exported = tmp_path / "export.csv"
+    assert store.export_csv(exported) == 2
+    with exported.open(newline="", encoding="utf-8") as handle:
+        assert [row["cache_hit"] for row in csv.DictReader(handle)] == ["0", "0"]
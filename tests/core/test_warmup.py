@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from tts_mcp.core.ratelimit import RateLimiter
+from tts_mcp.core.retry import Retrier
+from tts_mcp.core.synth import SynthesisRequest
+from tts_mcp.core.warmup import WARMUP_TEXT, ClientWarmup, Heartbeat
+
+
+def _request(tmp_path) -> SynthesisRequest:
+    return SynthesisRequest(
+        text=WARMUP_TEXT,
+        ssml=False,
+        voice="en-US-Chirp3-HD-Fenrir",
+        language="en-US",
+        model="",
+        audio_format="mp3",
+        speaking_rate=1.0,
+        pitch=0.0,
+        output_file=tmp_path / "warmup.mp3",
+    )
+
+
+def test_warmup_off_does_nothing(mock_tts_client, tmp_path):
+    warmup = ClientWarmup("off", "en-US")
+    assert warmup.start(mock_tts_client, _request(tmp_path)) is None
+    asyncio.run(warmup.run_async(mock_tts_client))
+    mock_tts_client.list_voices.assert_not_called()
+    assert warmup.as_dict() == {"mode": "off"}
+
+
+def test_warmup_connect_lists_voices_in_background(mock_tts_client, tmp_path):
+    warmup = ClientWarmup("connect", "en-GB")
+    thread = warmup.start(mock_tts_client, _request(tmp_path))
+    assert thread is not None
+    thread.join(timeout=5)
+
+    mock_tts_client.list_voices.assert_called_once_with(language_code="en-GB")
+    mock_tts_client.synthesize_speech.assert_not_called()
+    state = warmup.as_dict()
+    assert state["mode"] == "connect"
+    assert state["connect"]["state"] == "done"
+    assert state["connect"]["ms"] >= 0.0
+
+
+def test_warmup_synthesize_reports_result(mock_tts_client, tmp_path):
+    results = []
+    warmup = ClientWarmup("synthesize", "en-US")
+    thread = warmup.start(mock_tts_client, _request(tmp_path), on_result=results.append)
+    assert thread is not None
+    thread.join(timeout=5)
+
+    mock_tts_client.synthesize_speech.assert_called_once()
+    assert [result.chars for result in results] == [len(WARMUP_TEXT)]
+    assert results[0].cache_hit is False
+    state = warmup.as_dict()
+    assert state["connect"]["state"] == "done"
+    assert state["synthesize"]["state"] == "done"
+
+
+def test_warmup_records_failures(tmp_path):
+    client = MagicMock()
+    client.list_voices.side_effect = RuntimeError("unreachable")
+    client.synthesize_speech.side_effect = RuntimeError("unreachable")
+    warmup = ClientWarmup("synthesize", "en-US")
+    thread = warmup.start(client, _request(tmp_path))
+    assert thread is not None
+    thread.join(timeout=5)
+
+    state = warmup.as_dict()
+    assert state["connect"]["state"] == "failed"
+    assert state["connect"]["error"] == "unreachable"
+    assert state["synthesize"]["state"] == "failed"
+
+
+def test_warmup_connect_async():
+    client = MagicMock()
+    client.list_voices = AsyncMock()
+    warmup = ClientWarmup("connect", "en-US")
+    asyncio.run(warmup.run_async(client))
+    client.list_voices.assert_awaited_once_with(language_code="en-US")
+    assert warmup.as_dict()["connect"]["state"] == "done"
+
+
+def test_warmup_synthesize_async_reports_result(mock_tts_async_client, tmp_path):
+    results = []
+    mock_tts_async_client.list_voices = AsyncMock()
+    warmup = ClientWarmup("synthesize", "en-US")
+    asyncio.run(warmup.run_async(mock_tts_async_client, _request(tmp_path), on_result=results.append))
+
+    mock_tts_async_client.synthesize_speech.assert_awaited_once()
+    assert [result.chars for result in results] == [len(WARMUP_TEXT)]
+    state = warmup.as_dict()
+    assert state["connect"]["state"] == "done"
+    assert state["synthesize"]["state"] == "done"
+
+
+def test_warmup_synthesize_goes_through_the_retrier(mock_tts_client, mock_tts_async_client, tmp_path):
+    limiter = RateLimiter(tmp_path / "rate-limit.json", chars_per_min=1000)
+    warmup = ClientWarmup("synthesize", "en-US", retrier=Retrier(limiter=limiter))
+    thread = warmup.start(mock_tts_client, _request(tmp_path))
+    assert thread is not None
+    thread.join(timeout=5)
+    mock_tts_async_client.list_voices = AsyncMock()
+    asyncio.run(warmup.run_async(mock_tts_async_client, _request(tmp_path)))
+
+    assert warmup.as_dict()["synthesize"]["state"] == "done"
+    assert limiter.state()["chars_available"] == pytest.approx(1000 - 2 * len(WARMUP_TEXT), abs=1)
+
+
+def test_warmup_rejects_unknown_mode():
+    with pytest.raises(ValueError, match="warmup must be one of"):
+        ClientWarmup("eager", "en-US")
+
+
+def _wait_for(condition) -> None:
+    deadline = time.monotonic() + 5
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+def test_heartbeat_off_does_nothing(mock_tts_client):
+    heartbeat = Heartbeat(0, "en-US")
+    assert heartbeat.start(mock_tts_client) is None
+    asyncio.run(heartbeat.run_async(mock_tts_client))
+    mock_tts_client.list_voices.assert_not_called()
+
+
+def test_heartbeat_lists_voices_while_idle(mock_tts_client):
+    heartbeat = Heartbeat(0.01, "en-US")
+    thread = heartbeat.start(mock_tts_client)
+    assert thread is not None
+    _wait_for(lambda: heartbeat.as_dict()["beats"] >= 2)
+    heartbeat.stop()
+    thread.join(timeout=5)
+
+    mock_tts_client.list_voices.assert_called_with(language_code="en-US")
+    state = heartbeat.as_dict()
+    assert state["interval_s"] == 0.01
+    assert state["last_error"] == ""
+    assert state["last_ms"] >= 0.0
+
+
+def test_heartbeat_waits_a_full_interval_before_the_first_beat(mock_tts_client):
+    heartbeat = Heartbeat(3600, "en-US")
+    thread = heartbeat.start(mock_tts_client)
+    heartbeat.touch()
+    heartbeat.stop()
+    assert thread is not None
+    thread.join(timeout=5)
+    assert heartbeat.as_dict()["beats"] == 0
+
+
+def test_heartbeat_async_records_errors():
+    heartbeat = Heartbeat(0.01, "en-US")
+    client = MagicMock()
+
+    async def _fail(**_kwargs):
+        heartbeat.stop()
+        raise RuntimeError("unreachable")
+
+    client.list_voices = _fail
+    asyncio.run(heartbeat.run_async(client))
+    state = heartbeat.as_dict()
+    assert state["beats"] == 1
+    assert state["last_error"] == "unreachable"
@@ -8,6 +8,7 @@ import pytest
 from tts_mcp import batch
 from tts_mcp.batch import model_tag_and_name
 from tts_mcp.batch import parse_args as parse_batch_args
+from tts_mcp.core.synth import SynthesisResult
 
 
 def test_model_tag_chirp3():
@@ -75,6 +76,13 @@ def test_main_strips_language_and_family_filters(monkeypatch, tmp_path):
         speaking_rate=1.0,
         pitch=0.0,
         limit=0,
+        cache_dir=str(tmp_path / "cache"),
+        cache_max_mb=16,
+        no_cache=False,
+        requests_per_min=60,
+        chars_per_min=0,
+        rate_limit_file=str(tmp_path / "rate-limit.json"),
+        rate_limit_wait=5.0,
     )
 
     class VoiceRow:
@@ -101,15 +109,30 @@ def test_main_strips_language_and_family_filters(monkeypatch, tmp_path):
         captured["limit"] = limit
         return selected
 
-    def _fake_synthesize_to_file(client, request):
+    def _fake_synthesize_to_file(client, request, *, cache, max_chunk_bytes, retrier):
         requests.append(request)
+        captured["limiter"] = retrier.limiter.state()
+        return SynthesisResult(
+            output_file=request.output_file,
+            mime_type="audio/mpeg",
+            bytes_written=0,
+            chars=len(request.text),
+            voice=request.voice,
+            language=request.language,
+            model=request.model,
+            audio_format=request.audio_format,
+        )
 
     monkeypatch.setattr(batch, "list_voices", _fake_list_voices)
     monkeypatch.setattr(batch, "synthesize_to_file", _fake_synthesize_to_file)
 
     batch.main()
 
+    limiter = captured.pop("limiter")
     assert captured == {"language": "en-US", "family": "", "limit": 0}
+    assert limiter["requests_per_min"] == 60
+    assert limiter["max_wait_s"] == 5.0
+    assert limiter["state_file"] == str(tmp_path / "rate-limit.json")
     assert len(requests) == 2
     assert {request.voice for request in requests} == {"en-US-Chirp3-HD-Fenrir", "en-US-Neural2-D"}
     assert all(request.language == "en-US" for request in requests)
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+
+import pytest
+
+# Cumulative import time allowed for each CLI module, in microseconds. Importing fastmcp
+# or google.cloud.texttospeech alone costs several times this.
+IMPORT_BUDGET_US = 750_000
+HEAVY_MODULES = ("fastmcp", "google.cloud.texttospeech", "grpc")
+
+
+def _import_times(module: str) -> dict[str, int]:
+    """Run `module --help` under -X importtime and return {imported module: cumulative us}."""
+    code = f"import sys; sys.argv = ['{module}', '--help']; from {module} import main; main()"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    assert proc.returncode == 0, proc.stderr
+    times: dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self, cumulative, name = line.removeprefix("import time:").split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+@pytest.mark.parametrize(
+    "module",
+    ["tts_mcp.server", "tts_mcp.speak", "tts_mcp.batch", "tts_mcp.list_voices", "tts_mcp.usage_report"],
+)
+def test_cli_help_skips_heavy_imports(module):
+    times = _import_times(module)
+    assert module in times
+    assert not [name for name in times if name.startswith(HEAVY_MODULES)]
+    assert times[module] < IMPORT_BUDGET_US
@@ -1,11 +1,20 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
+import csv
+import os
+import socket
+import time
+from datetime import UTC, datetime
+from pathlib import Path
 from typing import Any
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from tts_mcp.core.usage import partition_path
+from tts_mcp.core.warmup import WARMUP_TEXT
 from tts_mcp.server import create_server, doctor_report, init_config, load_runtime, main
 
 # -- init_config --
@@ -188,9 +197,10 @@ def test_load_runtime_resolves_profile_and_client(mock_resolve, mock_load_profil
 
 
 @patch("tts_mcp.server.load_runtime")
-@patch("tts_mcp.server.synthesize_to_file")
-@patch("tts_mcp.server.play_audio", return_value=False)
-def test_tts_speak_tool_success(mock_play, mock_synth, mock_lr, sample_profile_file, tmp_path):
+@patch("tts_mcp.server.create_tts_async_client")
+@patch("tts_mcp.server.synthesize_to_file_async")
+@patch("tts_mcp.server.PlaybackQueue")
+def test_tts_speak_tool_success(mock_queue_cls, mock_synth, mock_async_client, mock_lr, sample_profile_file, tmp_path):
     from tts_mcp.core.profile import load_profile
     from tts_mcp.core.synth import SynthesisResult
 
@@ -212,20 +222,362 @@ def test_tts_speak_tool_success(mock_play, mock_synth, mock_lr, sample_profile_f
 
     server = create_server(str(sample_profile_file), "test")
     speak_tool: Any = server._tool_manager._tools["tts_speak"]
-    result = speak_tool.fn(text="hello")
+    result = asyncio.run(speak_tool.fn(text="hello"))
     assert result["ok"] is True
     assert result["chars"] == 5
+    assert "timings" not in result
 
 
 @patch("tts_mcp.server.load_runtime")
-@patch("tts_mcp.server.synthesize_to_file")
-@patch("tts_mcp.server.play_audio", side_effect=RuntimeError("player failed"))
-def test_tts_speak_tool_reports_playback_error(mock_play, mock_synth, mock_lr, sample_profile_file, tmp_path):
+@patch("tts_mcp.server.create_tts_async_client")
+@patch("tts_mcp.server.synthesize_to_file_async")
+@patch("tts_mcp.server.PlaybackQueue")
+def test_tts_speak_tool_reports_stage_timings(
+    mock_queue_cls, mock_synth, mock_async_client, mock_lr, sample_profile_file, tmp_path
+):
     from tts_mcp.core.profile import load_profile
     from tts_mcp.core.synth import SynthesisResult
 
     profile = load_profile(sample_profile_file, "test")
     mock_lr.return_value = (profile, MagicMock())
+    mock_synth.return_value = SynthesisResult(
+        output_file=tmp_path / "test.mp3",
+        mime_type="audio/mpeg",
+        bytes_written=128,
+        chars=5,
+        voice=profile.voice,
+        language=profile.language,
+        model=profile.model,
+        audio_format=profile.audio_format,
+        api_ms=180.5,
+        write_ms=0.4,
+    )
+
+    server = create_server(str(sample_profile_file), "test")
+    speak_tool: Any = server._tool_manager._tools["tts_speak"]
+    result = asyncio.run(speak_tool.fn(text="hello", timings=True))
+
+    timings = result["timings"]
+    assert list(timings) == [
+        "read_text",
+        "synthesize",
+        "api",
+        "write",
+        "usage_log",
+        "usage_snapshot",
+        "total",
+    ]
+    assert (timings["api"], timings["write"]) == (180.5, 0.4)
+    assert timings["total"] >= timings["synthesize"]
+
+
+@patch("tts_mcp.server.atexit")
+@patch("tts_mcp.server.load_runtime")
+@patch("tts_mcp.server.create_tts_async_client")
+@patch("tts_mcp.server.PlaybackQueue")
+def test_tts_speak_tool_reports_cache_hit(
+    mock_queue_cls, mock_async_factory, mock_lr, mock_atexit, sample_profile_file, mock_tts_async_client
+):
+    from tts_mcp.core.profile import load_profile
+
+    profile = load_profile(sample_profile_file, "test")
+    mock_lr.return_value = (profile, MagicMock())
+    mock_async_factory.return_value = mock_tts_async_client
+
+    server = create_server(str(sample_profile_file), "test")
+    speak_tool: Any = server._tool_manager._tools["tts_speak"]
+    metrics_tool: Any = server._tool_manager._tools["tts_metrics"]
+    before = metrics_tool.fn()["counters"]
+    first = asyncio.run(speak_tool.fn(text="Done."))
+    second = asyncio.run(speak_tool.fn(text="Done."))
+    after = metrics_tool.fn()["counters"]
+
+    assert first["cache_hit"] is False
+    assert second["cache_hit"] is True
+    assert second["usage"]["chars_this_request"] == 0
+    assert mock_tts_async_client.synthesize_speech.await_count == 1
+    assert after["tts_requests_total"] - before["tts_requests_total"] == 2
+    assert after["tts_cache_hits_total"] - before["tts_cache_hits_total"] == 1
+    assert after["tts_cache_misses_total"] - before["tts_cache_misses_total"] == 1
+    # Both requests are logged once the buffered rows are written at shutdown; only the first is billed.
+    close_usage = mock_atexit.register.call_args.args[0]
+    close_usage()
+    partition = partition_path(profile.usage_log, datetime.now(UTC).strftime("%Y-%m"))
+    with partition.open(newline="", encoding="utf-8") as handle:
+        rows = list(csv.DictReader(handle))
+    assert [row["cache_hit"] for row in rows] == ["0", "1"]
+    assert [row["profile"] for row in rows] == ["test", "test"]
+    assert rows[1]["api_ms"] == "0"
+    assert int(rows[0]["audio_bytes"]) == first["bytes"]
+
+
+@patch("tts_mcp.server.load_runtime")
+@patch("tts_mcp.server.create_tts_async_client")
+@patch("tts_mcp.server.PlaybackQueue")
+def test_tts_metrics_tool_and_file(mock_queue_cls, mock_async_factory, mock_lr, sample_profile_file, tmp_path):
+    from tts_mcp.core.profile import load_profile
+
+    profile = load_profile(sample_profile_file, "test")
+    profile.metrics_file = tmp_path / "metrics" / "tts.prom"
+    mock_lr.return_value = (profile, MagicMock())
+    failing = MagicMock()
+    failing.synthesize_speech = AsyncMock(side_effect=RuntimeError("boom"))
+    mock_async_factory.return_value = failing
+
+    server = create_server(str(sample_profile_file), "test")
+    assert profile.metrics_file.exists()
+    tools: Any = server._tool_manager._tools
+    before = tools["tts_metrics"].fn()
+    result = asyncio.run(tools["tts_speak"].fn(text="hello"))
+    after = tools["tts_metrics"].fn()
+
+    assert result["ok"] is False
+    assert after["ok"] is True
+    assert after["profile"] == "test"
+    errors_before = before["counters"]["tts_errors_total"].get("RuntimeError", 0)
+    assert after["counters"]["tts_errors_total"]["RuntimeError"] == errors_before + 1
+    assert 'status="RuntimeError"' in profile.metrics_file.read_text()
+
+
+@patch("tts_mcp.server.load_runtime")
+@patch("tts_mcp.server.doctor_report", return_value={"ok": True, "notes": []})
+def test_metrics_port_in_use_does_not_stop_the_server(mock_doctor, mock_lr, sample_profile_file):
+    from tts_mcp.core.profile import load_profile
+
+    profile = load_profile(sample_profile_file, "test")
+    mock_lr.return_value = (profile, MagicMock())
+    with socket.socket() as taken:
+        taken.bind(("127.0.0.1", 0))
+        taken.listen()
+        profile.metrics_port = taken.getsockname()[1]
+
+        server = create_server(str(sample_profile_file), "test")
+
+    tools: Any = server._tool_manager._tools
+    assert "tts_speak" in tools
+    error = tools["tts_metrics"].fn()["metrics_port_error"]
+    assert error.startswith(f"Metrics port {profile.metrics_port} unavailable")
+    assert tools["tts_doctor"].fn()["notes"] == [error]
+
+
+@patch("tts_mcp.server.load_runtime")
+@patch("tts_mcp.server.doctor_report", return_value={"ok": True})
+@patch("tts_mcp.server.atexit")
+def test_warmup_synthesizes_logs_usage_and_shows_in_doctor(
+    mock_atexit, mock_doctor, mock_lr, sample_profile_file, mock_tts_client
+):
+    from tts_mcp.core.profile import load_profile
+
+    profile = load_profile(sample_profile_file, "test")
+    profile.warmup = "synthesize"
+    # Progressive autoplay serves requests from the blocking client, so that is the one warmed.
+    profile.autoplay = True
+    profile.progressive_playback = True
+    mock_lr.return_value = (profile, mock_tts_client)
+
+    server = create_server(str(sample_profile_file), "test")
+    doctor_tool: Any = server._tool_manager._tools["tts_doctor"]
+    deadline = time.monotonic() + 5
+    while doctor_tool.fn()["warmup"].get("synthesize", {}).get("state") != "done":
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+    mock_tts_client.list_voices.assert_called_once_with(language_code="en-US")
+    report = doctor_tool.fn()
+    assert report["warmup"]["mode"] == "synthesize"
+    assert report["warmup"]["connect"]["state"] == "done"
+
+    # The warm-up synthesis is billed, so it is logged like any other request.
+    close_usage = mock_atexit.register.call_args.args[0]
+    close_usage()
+    partition = partition_path(profile.usage_log, datetime.now(UTC).strftime("%Y-%m"))
+    with partition.open(newline="", encoding="utf-8") as handle:
+        rows = list(csv.DictReader(handle))
+    assert [(row["chars"], row["output_file"], row["profile"]) for row in rows] == [
+        (str(len(WARMUP_TEXT)), os.devnull, "test")
+    ]
+
+
+@patch("tts_mcp.server.load_runtime")
+@patch("tts_mcp.server.create_tts_async_client")
+def test_warmup_connects_async_client_in_lifespan(mock_async_factory, mock_lr, sample_profile_file):
+    from tts_mcp.core.profile import load_profile
+
+    profile = load_profile(sample_profile_file, "test")
+    profile.warmup = "connect"
+    mock_lr.return_value = (profile, MagicMock())
+    async_client = MagicMock()
+    async_client.list_voices = AsyncMock()
+    mock_async_factory.return_value = async_client
+
+    server = create_server(str(sample_profile_file), "test")
+
+    async def _start() -> None:
+        async with server._lifespan(server):
+            await asyncio.sleep(0)
+
+    asyncio.run(_start())
+    mock_async_factory.assert_called_once()
+    async_client.list_voices.assert_awaited_once_with(language_code="en-US")
+
+
+@patch("tts_mcp.server.load_runtime")
+@patch("tts_mcp.server.create_tts_async_client")
+@patch("tts_mcp.server.doctor_report", return_value={"ok": True})
+def test_warmup_synthesizes_on_the_async_client_that_serves_requests(
+    mock_doctor, mock_async_factory, mock_lr, sample_profile_file, mock_tts_client, mock_tts_async_client
+):
+    from tts_mcp.core.profile import load_profile
+
+    profile = load_profile(sample_profile_file, "test")
+    profile.warmup = "synthesize"
+    mock_lr.return_value = (profile, mock_tts_client)
+    mock_tts_async_client.list_voices = AsyncMock()
+    mock_async_factory.return_value = mock_tts_async_client
+
+    server = create_server(str(sample_profile_file), "test")
+    doctor_tool: Any = server._tool_manager._tools["tts_doctor"]
+
+    async def _start() -> None:
+        async with server._lifespan(server):
+            deadline = time.monotonic() + 5
+            while doctor_tool.fn()["warmup"].get("synthesize", {}).get("state") != "done":
+                assert time.monotonic() < deadline
+                await asyncio.sleep(0.01)
+
+    asyncio.run(_start())
+    mock_tts_async_client.list_voices.assert_awaited_once_with(language_code="en-US")
+    mock_tts_async_client.synthesize_speech.assert_awaited_once()
+    mock_tts_client.list_voices.assert_not_called()
+    mock_tts_client.synthesize_speech.assert_not_called()
+    assert doctor_tool.fn()["warmup"]["connect"]["state"] == "done"
+
+
+@patch("tts_mcp.server.load_runtime")
+@patch("tts_mcp.server.create_tts_async_client")
+def test_heartbeat_runs_on_async_client_and_shows_in_doctor(mock_async_factory, mock_lr, sample_profile_file):
+    from tts_mcp.core.profile import load_profile
+
+    profile = load_profile(sample_profile_file, "test")
+    profile.heartbeat_s = 3600
+    profile.keepalive_ms = 60000
+    mock_lr.return_value = (profile, MagicMock())
+    async_client = MagicMock()
+    async_client.list_voices = AsyncMock()
+    mock_async_factory.return_value = async_client
+
+    server = create_server(str(sample_profile_file), "test")
+
+    async def _start() -> None:
+        async with server._lifespan(server):
+            await asyncio.sleep(0)
+
+    asyncio.run(_start())
+    mock_async_factory.assert_called_once_with(keepalive_ms=60000, idle_timeout_ms=0)
+    async_client.list_voices.assert_not_awaited()
+    with patch("tts_mcp.server.doctor_report", return_value={"ok": True}):
+        report = server._tool_manager._tools["tts_doctor"].fn()
+    assert report["heartbeat"] == {"interval_s": 3600, "beats": 0, "last_ms": None, "last_error": ""}
+
+
+@patch("tts_mcp.server.load_runtime")
+@patch("tts_mcp.server.create_tts_async_client")
+@patch("tts_mcp.server.PlaybackQueue")
+def test_tts_speak_retries_and_doctor_shows_hedging(
+    mock_queue_cls, mock_async_factory, mock_lr, sample_profile_file, mock_tts_async_client
+):
+    from google.api_core.exceptions import ServiceUnavailable
+
+    from tts_mcp.core.profile import load_profile
+
+    profile = load_profile(sample_profile_file, "test")
+    profile.retry_backoff_ms = 0
+    profile.request_timeout_s = 5.0
+    profile.hedge_percentile = 0.95
+    mock_lr.return_value = (profile, MagicMock())
+    response = mock_tts_async_client.synthesize_speech.return_value
+    mock_tts_async_client.synthesize_speech = AsyncMock(side_effect=[ServiceUnavailable("down"), response])
+    mock_async_factory.return_value = mock_tts_async_client
+
+    server = create_server(str(sample_profile_file), "test")
+    tools: Any = server._tool_manager._tools
+    result = asyncio.run(tools["tts_speak"].fn(text="hello"))
+
+    assert result["ok"] is True
+    assert mock_tts_async_client.synthesize_speech.await_count == 2
+    assert mock_tts_async_client.synthesize_speech.call_args.kwargs["timeout"] == 5.0
+    with patch("tts_mcp.server.doctor_report", return_value={"ok": True}):
+        report = tools["tts_doctor"].fn()
+    assert report["hedging"] == {"percentile": 0.95, "delay_ms": None, "latency_samples": 1}
+
+
+@patch("tts_mcp.server.load_runtime")
+@patch("tts_mcp.server.create_tts_async_client")
+@patch("tts_mcp.server.PlaybackQueue")
+def test_tts_speak_is_rate_limited_and_doctor_shows_limiter(
+    mock_queue_cls, mock_async_factory, mock_lr, sample_profile_file, mock_tts_async_client, tmp_path
+):
+    from tts_mcp.core.profile import load_profile
+
+    profile = load_profile(sample_profile_file, "test")
+    profile.rate_limit_requests_per_min = 1
+    profile.rate_limit_max_wait_s = 0
+    profile.rate_limit_file = tmp_path / "rate-limit.json"
+    mock_lr.return_value = (profile, MagicMock())
+    mock_async_factory.return_value = mock_tts_async_client
+
+    server = create_server(str(sample_profile_file), "test")
+    tools: Any = server._tool_manager._tools
+    assert asyncio.run(tools["tts_speak"].fn(text="hello"))["ok"] is True
+    result = asyncio.run(tools["tts_speak"].fn(text="again"))
+
+    assert result["ok"] is False
+    assert "wait limit" in result["error"]
+    assert mock_tts_async_client.synthesize_speech.await_count == 1
+    with patch("tts_mcp.server.doctor_report", return_value={"ok": True}):
+        report = tools["tts_doctor"].fn()
+    assert report["rate_limit"]["requests_per_min"] == 1
+    assert report["rate_limit"]["state_file"] == str(tmp_path / "rate-limit.json")
+    assert report["rate_limit"]["rejected"] == 1
+
+
+@patch("tts_mcp.server.load_runtime")
+@patch("tts_mcp.server.create_tts_async_client")
+@patch("tts_mcp.server.PlaybackQueue")
+def test_tts_speak_tool_records_usage_in_sqlite(
+    mock_queue_cls, mock_async_factory, mock_lr, sample_profile_file, mock_tts_async_client
+):
+    from tts_mcp.core.profile import load_profile
+
+    profile = load_profile(sample_profile_file, "test")
+    profile.usage_backend = "sqlite"
+    mock_lr.return_value = (profile, MagicMock())
+    mock_async_factory.return_value = mock_tts_async_client
+
+    server = create_server(str(sample_profile_file), "test")
+    speak_tool: Any = server._tool_manager._tools["tts_speak"]
+    asyncio.run(speak_tool.fn(text="hello"))
+    result = asyncio.run(speak_tool.fn(text="world!"))
+
+    assert result["usage"]["month_to_date_by_family"][result["usage"]["voice_family"]]["chars"] == 11
+    assert profile.usage_log.with_suffix(".sqlite3").exists()
+    assert not profile.usage_log.exists()
+
+
+@patch("tts_mcp.server.load_runtime")
+@patch("tts_mcp.server.create_tts_async_client")
+@patch("tts_mcp.server.synthesize_to_file_async")
+@patch("tts_mcp.server.PlaybackQueue")
+def test_tts_speak_tool_reports_playback_error(
+    mock_queue_cls, mock_synth, mock_async_client, mock_lr, sample_profile_file, tmp_path
+):
+    from tts_mcp.core.profile import load_profile
+    from tts_mcp.core.synth import SynthesisResult
+
+    profile = load_profile(sample_profile_file, "test")
+    profile.autoplay = True
+    mock_lr.return_value = (profile, MagicMock())
+    mock_queue_cls.return_value.enqueue_file.side_effect = RuntimeError("player failed")
 
     output = tmp_path / "out" / "test.mp3"
     output.parent.mkdir(parents=True, exist_ok=True)
@@ -242,11 +594,198 @@ def test_tts_speak_tool_reports_playback_error(mock_play, mock_synth, mock_lr, s
 
     server = create_server(str(sample_profile_file), "test")
     speak_tool: Any = server._tool_manager._tools["tts_speak"]
-    result = speak_tool.fn(text="hello")
+    result = asyncio.run(speak_tool.fn(text="hello"))
     assert result["ok"] is True
+    assert result["played"] is False
     assert result["playback_error"] == "player failed"
 
 
+@patch("tts_mcp.server.load_runtime")
+@patch("tts_mcp.server.create_tts_async_client")
+@patch("tts_mcp.server.PlaybackQueue")
+def test_tts_speak_tool_queues_playback(
+    mock_queue_cls, mock_async_factory, mock_lr, sample_profile_file, mock_tts_async_client
+):
+    from tts_mcp.core.profile import load_profile
+
+    profile = load_profile(sample_profile_file, "test")
+    profile.autoplay = True
+    mock_lr.return_value = (profile, MagicMock())
+    mock_async_factory.return_value = mock_tts_async_client
+
+    server = create_server(str(sample_profile_file), "test")
+    speak_tool: Any = server._tool_manager._tools["tts_speak"]
+    result = asyncio.run(speak_tool.fn(text="Heads up.", urgent=True))
+
+    assert result["played"] is True
+    mock_queue_cls.return_value.enqueue_file.assert_called_once_with(Path(result["output_file"]), urgent=True)
+
+
+@patch("tts_mcp.server.load_runtime")
+@patch("tts_mcp.server.create_tts_async_client")
+@patch("tts_mcp.server.PlaybackQueue")
+def test_tts_speak_tool_limits_concurrent_calls(mock_queue_cls, mock_async_factory, mock_lr, sample_profile_file):
+    from tts_mcp.core.profile import load_profile
+
+    profile = load_profile(sample_profile_file, "test")
+    profile.max_in_flight = 2
+    mock_lr.return_value = (profile, MagicMock())
+    active = 0
+    peak = 0
+
+    async def _synthesize(request):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        response = MagicMock()
+        response.audio_content = b"\x00" * 16
+        return response
+
+    mock_async_factory.return_value.synthesize_speech = AsyncMock(side_effect=_synthesize)
+    server = create_server(str(sample_profile_file), "test")
+    speak_tool: Any = server._tool_manager._tools["tts_speak"]
+
+    async def _speak_all():
+        return await asyncio.gather(*(speak_tool.fn(text=f"Line {index}.") for index in range(5)))
+
+    results = asyncio.run(_speak_all())
+
+    assert all(result["ok"] for result in results)
+    assert len({result["output_file"] for result in results}) == 5
+    assert peak == 2
+    mock_async_factory.assert_called_once()
+
+
+@patch("tts_mcp.server.load_runtime")
+@patch("tts_mcp.server.create_tts_async_client")
+@patch("tts_mcp.server.PlaybackQueue")
+def test_tts_speak_tool_background_job(
+    mock_queue_cls, mock_async_factory, mock_lr, sample_profile_file, mock_tts_async_client
+):
+    from tts_mcp.core.profile import load_profile
+
+    profile = load_profile(sample_profile_file, "test")
+    mock_lr.return_value = (profile, MagicMock())
+    mock_async_factory.return_value = mock_tts_async_client
+
+    server = create_server(str(sample_profile_file), "test")
+    speak_tool: Any = server._tool_manager._tools["tts_speak"]
+    status_tool: Any = server._tool_manager._tools["tts_status"]
+
+    async def _speak_and_poll():
+        queued = await speak_tool.fn(text="hello", background=True)
+        status = status_tool.fn(job_id=queued["job_id"])
+        while status["state"] not in {"done", "failed"}:
+            await asyncio.sleep(0)
+            status = status_tool.fn(job_id=queued["job_id"])
+        return queued, status
+
+    queued, status = asyncio.run(_speak_and_poll())
+
+    assert queued["ok"] is True
+    assert queued["state"] == "queued"
+    assert status["state"] == "done"
+    assert status["result"]["ok"] is True
+    assert status["result"]["output_file"] == queued["output_file"]
+    assert status["result"]["chars"] == 5
+
+
+@patch("tts_mcp.server.load_runtime")
+def test_tts_status_unknown_job(mock_lr, sample_profile_file):
+    from tts_mcp.core.profile import load_profile
+
+    mock_lr.return_value = (load_profile(sample_profile_file, "test"), MagicMock())
+    server = create_server(str(sample_profile_file), "test")
+    status_tool: Any = server._tool_manager._tools["tts_status"]
+    result = status_tool.fn(job_id="nope")
+    assert result["ok"] is False
+    assert "Unknown" in result["error"]
+
+
+@patch("tts_mcp.server.load_runtime")
+@patch("tts_mcp.server.PlaybackQueue")
+def test_tts_speak_tool_progressive_playback(mock_queue_cls, mock_lr, sample_profile_file, mock_tts_client):
+    from tts_mcp.core.profile import load_profile
+
+    profile = load_profile(sample_profile_file, "test")
+    profile.autoplay = True
+    profile.progressive_playback = True
+    mock_lr.return_value = (profile, mock_tts_client)
+    playback = mock_queue_cls.return_value
+    stream = playback.stream.return_value
+
+    server = create_server(str(sample_profile_file), "test")
+    speak_tool: Any = server._tool_manager._tools["tts_speak"]
+    result = asyncio.run(speak_tool.fn(text="First sentence. Second sentence."))
+
+    assert result["ok"] is True
+    assert result["played"] is True
+    assert stream.add.call_count == 2
+    stream.close.assert_called_once()
+    playback.enqueue_file.assert_not_called()
+
+
+@patch("tts_mcp.server.load_runtime")
+@patch("tts_mcp.server.PlaybackQueue")
+def test_tts_speak_tool_progressive_cancels_stream_on_failure(
+    mock_queue_cls, mock_lr, sample_profile_file, mock_tts_client
+):
+    from tts_mcp.core.profile import load_profile
+
+    profile = load_profile(sample_profile_file, "test")
+    profile.autoplay = True
+    profile.progressive_playback = True
+    mock_tts_client.synthesize_speech.side_effect = RuntimeError("api down")
+    mock_lr.return_value = (profile, mock_tts_client)
+
+    server = create_server(str(sample_profile_file), "test")
+    speak_tool: Any = server._tool_manager._tools["tts_speak"]
+    result = asyncio.run(speak_tool.fn(text="Hello."))
+
+    assert result["ok"] is False
+    mock_queue_cls.return_value.stream.return_value.cancel.assert_called_once()
+
+
+@patch("tts_mcp.server.load_runtime")
+@patch("tts_mcp.server.PlaybackQueue")
+@patch("tts_mcp.server.synthesize_streaming_to_file")
+def test_tts_speak_tool_streaming_backend(mock_streaming, mock_queue_cls, mock_lr, sample_profile_file, tmp_path):
+    from tts_mcp.core.profile import load_profile
+    from tts_mcp.core.synth import SynthesisResult
+
+    profile = load_profile(sample_profile_file, "test")
+    profile.autoplay = True
+    profile.backend = "streaming"
+    profile.audio_format = "wav"
+    mock_lr.return_value = (profile, MagicMock())
+    out = tmp_path / "out.wav"
+    out.write_bytes(b"RIFF")
+    mock_streaming.return_value = SynthesisResult(
+        output_file=out,
+        audio_format="wav",
+        mime_type="audio/wav",
+        bytes_written=4,
+        chars=5,
+        voice="en-US-Chirp3-HD-Charon",
+        language="en-US",
+        model="",
+    )
+
+    server = create_server(str(sample_profile_file), "test")
+    speak_tool: Any = server._tool_manager._tools["tts_speak"]
+    result = asyncio.run(speak_tool.fn(text="hello"))
+
+    assert result["ok"] is True
+    assert result["played"] is True
+    playback = mock_queue_cls.return_value
+    stream = playback.stream.return_value
+    assert mock_streaming.call_args.kwargs["on_chunk"] == stream.add
+    stream.close.assert_called_once()
+    playback.enqueue_file.assert_not_called()
+
+
 @patch("tts_mcp.server.load_runtime")
 @patch("tts_mcp.server.read_text_input", side_effect=ValueError("bad input"))
 def test_tts_speak_tool_error(mock_read, mock_lr, sample_profile_file):
@@ -257,25 +796,28 @@ def test_tts_speak_tool_error(mock_read, mock_lr, sample_profile_file):
 
     server = create_server(str(sample_profile_file), "test")
     speak_tool: Any = server._tool_manager._tools["tts_speak"]
-    result = speak_tool.fn(text="hello")
+    result = asyncio.run(speak_tool.fn(text="hello"))
     assert result["ok"] is False
     assert "bad input" in result["error"]
 
 
 @patch("tts_mcp.server.load_runtime")
+@patch("tts_mcp.server.PlaybackQueue")
 @patch("tts_mcp.server.stop_audio")
-def test_tts_stop_tool(mock_stop, mock_lr, sample_profile_file):
+def test_tts_stop_tool(mock_stop, mock_queue_cls, mock_lr, sample_profile_file):
     from tts_mcp.core.profile import StopAudioResult, load_profile
 
     profile = load_profile(sample_profile_file, "test")
     mock_lr.return_value = (profile, MagicMock())
     mock_stop.return_value = StopAudioResult(attempted=True, player="afplay", stopped_processes=1)
+    mock_queue_cls.return_value.clear.return_value = 3
 
     server = create_server(str(sample_profile_file), "test")
     stop_tool: Any = server._tool_manager._tools["tts_stop"]
     result = stop_tool.fn()
     assert result["ok"] is True
     assert result["stopped_processes"] == 1
+    assert result["cleared_items"] == 3
 
 
 @patch("tts_mcp.server.load_runtime")
@@ -308,6 +850,50 @@ def test_tts_doctor_tool_calls_doctor_report(mock_doctor, mock_lr, sample_profil
     mock_doctor.assert_called_once_with(str(sample_profile_file), profile.name)
 
 
+@patch("tts_mcp.server.load_runtime")
+@patch("tts_mcp.server.doctor_report", return_value={"ok": True})
+@patch("tts_mcp.server.create_tts_async_client")
+@patch("tts_mcp.server.PlaybackQueue")
+def test_tts_doctor_arms_profiling_of_next_calls(
+    mock_queue_cls, mock_async_factory, mock_doctor, mock_lr, sample_profile_file, mock_tts_async_client
+):
+    from tts_mcp.core.profile import load_profile
+
+    profile = load_profile(sample_profile_file, "test")
+    mock_lr.return_value = (profile, MagicMock())
+    mock_async_factory.return_value = mock_tts_async_client
+
+    server = create_server(str(sample_profile_file), "test")
+    tools: Any = server._tool_manager._tools
+    armed = tools["tts_doctor"].fn(profile_calls=2)
+    assert armed["profiling"]["remaining_calls"] == 2
+    assert "diagnostics" not in armed
+
+    spoken = asyncio.run(tools["tts_speak"].fn(text="hello"))
+    doctor = tools["tts_doctor"].fn()
+    after = asyncio.run(tools["tts_speak"].fn(text="again"))
+
+    for response in (spoken, doctor):
+        assert Path(response["diagnostics"]["profile"]).exists()
+        assert Path(response["diagnostics"]["allocations"]).parent == profile.output_dir.parent / "diagnostics"
+    assert doctor["profiling"]["remaining_calls"] == 0
+    assert "diagnostics" not in after
+
+
+@patch("tts_mcp.server.load_runtime")
+@patch("tts_mcp.server.doctor_report", return_value={"ok": True})
+def test_profile_calls_env_and_invalid_count(mock_doctor, mock_lr, sample_profile_file, monkeypatch):
+    from tts_mcp.core.profile import load_profile
+
+    monkeypatch.setenv("TTS_MCP_PROFILE_CALLS", "1")
+    mock_lr.return_value = (load_profile(sample_profile_file, "test"), MagicMock())
+
+    server = create_server(str(sample_profile_file), "test")
+    doctor_tool: Any = server._tool_manager._tools["tts_doctor"]
+    assert doctor_tool.fn(profile_calls=-1) == {"ok": False, "error": "profile_calls must be 0 or greater"}
+    assert "diagnostics" in doctor_tool.fn()
+
+
 # -- main --
 
 
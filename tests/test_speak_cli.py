@@ -16,6 +16,7 @@ def test_parse_defaults(monkeypatch):
     assert args.voice == ""
     assert args.language == "en-US"
     assert args.format == "mp3"
+    assert args.verbose is False
 
 
 def test_help_shows_defaults(monkeypatch, capsys):
@@ -84,3 +85,22 @@ def test_main_exits_when_fallback_input_is_empty(monkeypatch):
 
     with pytest.raises(SystemExit, match="No input text provided"):
         speak.main()
+
+
+def test_main_charges_the_shared_rate_limiter(monkeypatch, tmp_path):
+    state_file = tmp_path / "rate-limit.json"
+    argv = ["tts-speak", "--text", "hello", "--no-cache", "--chars-per-min", "5", "--rate-limit-wait", "0"]
+    monkeypatch.setattr(sys, "argv", [*argv, "--rate-limit-file", str(state_file)])
+    monkeypatch.setattr(speak, "create_tts_client", object)
+
+    def _fake_synthesize_to_file(client, request, **kwargs):
+        # Two chunks: the first spends the minute's budget, the second is rejected.
+        for _ in range(2):
+            kwargs["retrier"].call(lambda **_: None, chars=len(request.text))
+        raise AssertionError("the limiter should have rejected the second chunk")
+
+    monkeypatch.setattr(speak, "synthesize_to_file", _fake_synthesize_to_file)
+
+    with pytest.raises(SystemExit, match="wait limit"):
+        speak.main()
+    assert state_file.exists()
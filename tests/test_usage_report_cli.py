@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import json
+import sys
+from datetime import UTC, datetime
+from pathlib import Path
+
+import pytest
+
+from tts_mcp.core.usage import CsvUsageStore, UsageRow
+from tts_mcp.usage_report import main, parse_args
+
+
+def _record(log: Path, chars: int, *, voice: str = "en-US-Neural2-D", api_ms: float = 0.0) -> None:
+    CsvUsageStore(log).append(
+        UsageRow(
+            timestamp_utc=datetime(2025, 6, 15, tzinfo=UTC),
+            chars=chars,
+            voice=voice,
+            language="en-US",
+            audio_format="mp3",
+            output_file=log.parent / "out.mp3",
+            api_ms=api_ms,
+        )
+    )
+
+
+def test_parse_args_defaults(monkeypatch):
+    monkeypatch.delenv("TTS_MCP_PROFILES_PATH", raising=False)
+    monkeypatch.delenv("TTS_MCP_PROFILE_NAME", raising=False)
+    monkeypatch.setattr(sys, "argv", ["tts-usage"])
+    args = parse_args()
+    assert args.usage_log == ""
+    assert args.by == "month"
+    assert args.month == ""
+    assert args.format == "table"
+    assert args.latency is False
+
+
+def test_parse_args_rejects_unknown_group(monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["tts-usage", "--by", "voice"])
+    with pytest.raises(SystemExit):
+        parse_args()
+
+
+def test_main_json_report(tmp_path, monkeypatch, capsys):
+    log = tmp_path / "usage_log.csv"
+    _record(log, 10)
+    _record(log, 5, voice="en-US-Chirp3-HD-Fenrir")
+    monkeypatch.setattr(sys, "argv", ["tts-usage", "--usage-log", str(log), "--by", "family", "--format", "json"])
+
+    main()
+    payload = json.loads(capsys.readouterr().out)
+    assert [(row["key"], row["chars"]) for row in payload["rows"]] == [("Chirp3-HD", 5), ("Neural2", 10)]
+    assert payload["total"]["chars"] == 15
+    assert payload["total"]["requests"] == 2
+    assert "api_ms_p50" not in payload["total"]
+
+
+def test_main_latency_report(tmp_path, monkeypatch, capsys):
+    log = tmp_path / "usage_log.csv"
+    for api_ms in (100.0, 200.0, 300.0, 400.0):
+        _record(log, 10, api_ms=api_ms)
+    _record(log, 10, voice="en-US-Chirp3-HD-Fenrir", api_ms=900.0)
+    argv = ["tts-usage", "--usage-log", str(log), "--by", "family", "--latency"]
+
+    monkeypatch.setattr(sys, "argv", [*argv, "--format", "json"])
+    main()
+    payload = json.loads(capsys.readouterr().out)
+    neural2 = payload["rows"][1]
+    assert (neural2["key"], neural2["api_ms_p50"], neural2["api_ms_p99"]) == ("Neural2", 200.0, 400.0)
+    assert (payload["total"]["api_ms_p50"], payload["total"]["api_ms_p99"]) == (300.0, 900.0)
+
+    monkeypatch.setattr(sys, "argv", argv)
+    main()
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0].split()[-6:] == ["P50", "MS", "P95", "MS", "P99", "MS"]
+    assert lines[-1].split() == ["total", "5", "50", "0", "0.00", "300", "900", "900"]
+
+
+def test_main_table_report_uses_profile_usage_log(sample_profile_file, tmp_path, monkeypatch, capsys):
+    _record(tmp_path / "usage.csv", 1234)
+    monkeypatch.setattr(sys, "argv", ["tts-usage", "--profiles", str(sample_profile_file), "--profile", "test"])
+
+    main()
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0].split() == ["MONTH", "REQUESTS", "CHARS", "BILLABLE", "COST", "USD"]
+    assert lines[1].split() == ["2025-06", "1", "1,234", "0", "0.00"]
+    assert lines[-1].split() == ["total", "1", "1,234", "0", "0.00"]
+
+
+def test_main_missing_profile_file_exits(tmp_path, monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["tts-usage", "--profiles", str(tmp_path / "missing.json")])
+    with pytest.raises(SystemExit, match="not found"):
+        main()